@@ -0,0 +1,247 @@
+"""
+Client-side governor for the org's Salesforce API allowance.
+
+Every REST response carries a Sforce-Limit-Info header
+("api-usage=1234/15000") reporting the org's rolling 24-hour usage, and the
+limits/ resource reports the same figures as DailyApiRequests. The governor
+keeps the latest reading and also counts this server's own calls in a
+sliding window, in total and per tool, so that:
+
+- calls are refused once a window or per-tool budget is spent, or once the
+  org's remaining allowance drops into a reserve kept for other
+  integrations (ApiBudgetExceeded is raised before the request is sent),
+- callers can ask whether the budget is tight and prefer cached or
+  replica answers over fresh API calls.
+
+The org reading only counts for max_reading_age seconds. Usage is a rolling
+24-hour figure, so a low reading stops blocking calls once it ages out. The
+limits/ probe is never held back by the reserve, since it is the request
+that brings in a fresh reading.
+
+Calls are attributed to the tool named by attribute(), which sets a
+context variable that asyncio tasks spawned inside the tool inherit.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import re
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+LIMIT_INFO_HEADER = "Sforce-Limit-Info"
+
+_API_USAGE_RE = re.compile(r"api-usage=(\d+)/(\d+)")
+_LIMITS_PATH_RE = re.compile(r"/limits/?$")
+
+_current_tool: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_tool", default=None
+)
+
+
+class ApiBudgetExceeded(Exception):
+    """Raised instead of sending a request that would overrun a budget."""
+
+
+def parse_limit_info(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """(used, max) from a Sforce-Limit-Info header value, or None."""
+    match = _API_USAGE_RE.search(value or "")
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """Parse "sf_query=100,sf_velocity_trend=20" into a per-tool budget map."""
+    budgets: Dict[str, int] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        tool, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid tool budget '{item.strip()}', expected tool=calls.")
+        budgets[tool.strip()] = int(value)
+    return budgets
+
+
+class ApiGovernor:
+    """
+    Tracks API consumption and enforces per-window and per-tool budgets.
+
+    Budgets of 0 mean unlimited. reserve_fraction is the share of the org's
+    daily allowance this server never touches; tight_fraction is the
+    remaining share below which callers should prefer cached answers.
+    max_reading_age is how many seconds an org usage reading is trusted.
+
+    Usage:
+        governor = ApiGovernor(window=3600, window_budget=500)
+        with governor.attribute("sf_query"):
+            governor.before_request(path)    # may raise ApiBudgetExceeded
+            ...send...
+            governor.after_response(response.headers)
+    """
+
+    def __init__(
+        self,
+        window: float = 3600.0,
+        window_budget: int = 0,
+        tool_budget: int = 0,
+        tool_budgets: Optional[Dict[str, int]] = None,
+        reserve_fraction: float = 0.1,
+        tight_fraction: float = 0.25,
+        max_reading_age: float = 300.0,
+    ) -> None:
+        self.window = window
+        self.window_budget = window_budget
+        self.tool_budget = tool_budget
+        self.tool_budgets = dict(tool_budgets or {})
+        self.reserve_fraction = reserve_fraction
+        self.tight_fraction = tight_fraction
+        self.max_reading_age = max_reading_age
+        self.org_used: Optional[int] = None
+        self.org_max: Optional[int] = None
+        self.org_observed_at: Optional[float] = None
+        self.refused = 0
+        self._calls: Deque[float] = deque()
+        self._tool_calls: Dict[str, Deque[float]] = defaultdict(deque)
+        self._tool_totals: Dict[str, int] = defaultdict(int)
+
+    # -----------------------------------------------------------------
+    # Attribution
+    # -----------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def attribute(self, tool: str) -> Iterator[None]:
+        """Attribute API calls made inside the block to a tool."""
+        token = _current_tool.set(tool)
+        try:
+            yield
+        finally:
+            _current_tool.reset(token)
+
+    @staticmethod
+    def current_tool() -> Optional[str]:
+        return _current_tool.get()
+
+    # -----------------------------------------------------------------
+    # Observations
+    # -----------------------------------------------------------------
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._calls and self._calls[0] <= cutoff:
+            self._calls.popleft()
+        for calls in self._tool_calls.values():
+            while calls and calls[0] <= cutoff:
+                calls.popleft()
+
+    def observe_header(self, value: Optional[str]) -> None:
+        """Record the org usage reported by a Sforce-Limit-Info header."""
+        usage = parse_limit_info(value)
+        if usage is not None:
+            self.org_used, self.org_max = usage
+            self.org_observed_at = time.time()
+
+    def observe_limits(self, limits: Dict[str, Any]) -> None:
+        """Record the DailyApiRequests entry of a limits/ response."""
+        daily = limits.get("DailyApiRequests")
+        if daily:
+            self.org_max = int(daily["Max"])
+            self.org_used = self.org_max - int(daily["Remaining"])
+            self.org_observed_at = time.time()
+
+    def after_response(self, headers: Any) -> None:
+        """Count a completed call and read its limit header."""
+        now = time.monotonic()
+        self._calls.append(now)
+        tool = _current_tool.get()
+        if tool is not None:
+            self._tool_calls[tool].append(now)
+            self._tool_totals[tool] += 1
+        self.observe_header(headers.get(LIMIT_INFO_HEADER))
+
+    # -----------------------------------------------------------------
+    # Decisions
+    # -----------------------------------------------------------------
+
+    @property
+    def org_remaining(self) -> Optional[int]:
+        if self.org_used is None or self.org_max is None:
+            return None
+        return self.org_max - self.org_used
+
+    def _fresh_org_remaining(self) -> Optional[int]:
+        """org_remaining, or None once the reading is older than max_reading_age."""
+        if self.org_observed_at is None or time.time() - self.org_observed_at > self.max_reading_age:
+            return None
+        return self.org_remaining
+
+    def budget_for(self, tool: str) -> int:
+        return self.tool_budgets.get(tool, self.tool_budget)
+
+    def before_request(self, path: str = "") -> None:
+        """Raise ApiBudgetExceeded if the next call (to path) would overrun a budget."""
+        self._trim(time.monotonic())
+        reason = None
+        remaining = None if _LIMITS_PATH_RE.search(path) else self._fresh_org_remaining()
+        if remaining is not None and remaining <= self.org_max * self.reserve_fraction:
+            reason = (
+                f"org has {remaining} of {self.org_max} daily API calls left, "
+                f"which is inside the {self.reserve_fraction:.0%} reserve"
+            )
+        elif self.window_budget and len(self._calls) >= self.window_budget:
+            reason = f"server budget of {self.window_budget} calls per {self.window:.0f}s is spent"
+        else:
+            tool = _current_tool.get()
+            budget = self.budget_for(tool) if tool is not None else 0
+            if budget and len(self._tool_calls[tool]) >= budget:
+                reason = f"{tool} budget of {budget} calls per {self.window:.0f}s is spent"
+        if reason:
+            self.refused += 1
+            raise ApiBudgetExceeded(f"API call refused: {reason}.")
+
+    def is_tight(self) -> bool:
+        """True when callers should prefer cached or replica answers."""
+        remaining = self._fresh_org_remaining()
+        if remaining is not None and remaining <= self.org_max * self.tight_fraction:
+            return True
+        if self.window_budget:
+            self._trim(time.monotonic())
+            window_left = self.window_budget - len(self._calls)
+            if window_left <= self.window_budget * self.tight_fraction:
+                return True
+        return False
+
+    # -----------------------------------------------------------------
+    # Reporting
+    # -----------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current consumption, for display."""
+        self._trim(time.monotonic())
+        tools = {
+            tool: {
+                "window_calls": len(self._tool_calls[tool]),
+                "total_calls": total,
+                "budget": self.budget_for(tool),
+            }
+            for tool, total in sorted(self._tool_totals.items())
+        }
+        return {
+            "org_used": self.org_used,
+            "org_max": self.org_max,
+            "org_remaining": self.org_remaining,
+            "org_observed_at": self.org_observed_at,
+            "window": self.window,
+            "window_calls": len(self._calls),
+            "window_budget": self.window_budget,
+            "refused": self.refused,
+            "tight": self.is_tight(),
+            "tools": tools,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"ApiGovernor(window_calls={len(self._calls)}, "
+            f"org_remaining={self.org_remaining})"
+        )
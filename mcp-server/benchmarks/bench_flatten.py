@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: record flattening for query results.
+
+Compares the original one-level, row-by-row flatten (kept here verbatim as
+the baseline) against RecordFlattener's columnar extraction on synthetic
+Time_Entry__c records with two levels of parent relationships.
+
+Usage:
+    python benchmarks/bench_flatten.py [--records 50000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from record_flattener import RecordFlattener, flatten_relationship_fields  # noqa: E402
+
+SOQL = (
+    "SELECT Id, Name, Date__c, Hours__c, Notes__c, Work_Item__r.Name, "
+    "Work_Item__r.Status__c, Work_Item__r.Project__r.Name FROM Time_Entry__c"
+)
+
+
+def legacy_flatten(
+    records: List[Dict[str, Any]],
+    parent_key: str = "",
+) -> List[Dict[str, Any]]:
+    """The original server.py implementation (one relationship level)."""
+    flat_records: List[Dict[str, Any]] = []
+    for record in records:
+        flat: Dict[str, Any] = {}
+        for key, value in record.items():
+            full_key = f"{parent_key}.{key}" if parent_key else key
+            if isinstance(value, dict) and "attributes" in value:
+                for sub_key, sub_val in value.items():
+                    if sub_key == "attributes":
+                        continue
+                    flat[f"{full_key}.{sub_key}"] = sub_val
+            elif isinstance(value, dict) and key == "attributes":
+                continue
+            else:
+                flat[full_key] = value
+        flat_records.append(flat)
+    return flat_records
+
+
+def make_records(n: int) -> List[Dict[str, Any]]:
+    """Build n synthetic Time_Entry__c query records."""
+    return [
+        {
+            "attributes": {"type": "Time_Entry__c", "url": f"/sobjects/Time_Entry__c/a{i}"},
+            "Id": f"a0{i:016d}",
+            "Name": f"TE-{i:06d}",
+            "Date__c": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "Hours__c": 0.25 * (1 + i % 32),
+            "Notes__c": None if i % 3 else "Worked on the integration layer",
+            "Work_Item__r": {
+                "attributes": {"type": "Work_Item__c", "url": "/x"},
+                "Name": f"WI-{i % 500:04d}",
+                "Status__c": "In Progress",
+                "Project__r": {
+                    "attributes": {"type": "Project__c", "url": "/y"},
+                    "Name": f"Project {i % 7}",
+                },
+            },
+        }
+        for i in range(n)
+    ]
+
+
+def best_of(repeat: int, fn: Callable[[], pd.DataFrame]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+    RecordFlattener.for_query(SOQL)  # compile once, as the server does
+
+    cases = {
+        "legacy row-wise (1 level)": lambda: pd.DataFrame(legacy_flatten(records)).drop(
+            columns=["attributes"], errors="ignore"
+        ),
+        "recursive row-wise": lambda: pd.DataFrame(flatten_relationship_fields(records)),
+        "RecordFlattener columnar": lambda: pd.DataFrame(
+            RecordFlattener.for_query(SOQL).to_columns(records)
+        ),
+    }
+
+    print(f"Flattening {args.records} records (best of {args.repeat}):")
+    baseline = None
+    for label, fn in cases.items():
+        seconds = best_of(args.repeat, fn)
+        baseline = baseline or seconds
+        print(f"  {label:<28} {seconds * 1000:8.1f} ms  ({baseline / seconds:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
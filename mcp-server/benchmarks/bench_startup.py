@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: server startup, measured as time to the first tools/list response.
+
+Spawns server.py over stdio the way an MCP client does, sends initialize,
+notifications/initialized and tools/list, and records when each response
+arrives. The "eager imports" case pre-imports pandas and simple_salesforce
+before running the server, approximating the old top-of-module imports.
+
+The server is given a dummy access token so the background login never
+touches the network.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+LAZY_CMD = [sys.executable, "server.py"]
+EAGER_CMD = [
+    sys.executable,
+    "-c",
+    "import pandas, simple_salesforce, runpy; "
+    "runpy.run_path('server.py', run_name='__main__')",
+]
+
+
+def _send(proc: subprocess.Popen, message: Dict[str, Any]) -> None:
+    proc.stdin.write(json.dumps(message) + "\n")
+    proc.stdin.flush()
+
+
+def _wait_for(proc: subprocess.Popen, request_id: int) -> Dict[str, Any]:
+    for line in proc.stdout:
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+    raise RuntimeError("server exited before responding")
+
+
+def measure(cmd: List[str]) -> Tuple[float, float, int]:
+    """Return (seconds to initialize, seconds to tools/list, tool count)."""
+    env = dict(os.environ, SF_ACCESS_TOKEN="bench", SF_INSTANCE_URL="https://bench.invalid")
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        cmd,
+        cwd=SERVER_DIR,
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        _send(proc, {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "bench_startup", "version": "0"},
+            },
+        })
+        _wait_for(proc, 1)
+        initialized = time.perf_counter() - start
+        _send(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _send(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        tools = _wait_for(proc, 2)["result"]["tools"]
+        listed = time.perf_counter() - start
+    finally:
+        proc.kill()
+        proc.wait()
+    return initialized, listed, len(tools)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    cases = {"lazy imports (server.py)": LAZY_CMD, "eager imports": EAGER_CMD}
+    measure(LAZY_CMD)  # warm the OS page cache / .pyc files
+
+    print(f"Startup to tools/list (median of {args.repeat}):")
+    for label, cmd in cases.items():
+        runs = [measure(cmd) for _ in range(args.repeat)]
+        init = statistics.median(r[0] for r in runs)
+        listed = statistics.median(r[1] for r in runs)
+        print(
+            f"  {label:<26} initialize {init * 1000:7.1f} ms"
+            f"   tools/list {listed * 1000:7.1f} ms  ({runs[0][2]} tools)"
+        )
+
+
+if __name__ == "__main__":
+    main()
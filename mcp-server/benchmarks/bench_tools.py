@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency, peak memory and allocations of every MCP tool.
+
+For each data scale, starts benchmarks/sf_standin.py (a local HTTP stand-in
+for the Salesforce REST API, in its own process) and a fresh worker
+process that imports server.py and calls the tools through FastMCP.
+Writes the results to JSON. Pass a previous results file with --compare to
+flag regressions.
+
+Per tool and scale:
+- first_ms: the first call, which pays for the login, describes and index
+  warm-up
+- p50_ms / mean_ms / min_ms / max_ms: over --repeat further calls
+- standin_ms: the part of p50 spent inside the stand-in (its
+  X-Standin-Seconds header), i.e. what Salesforce would be doing
+- http_requests: requests per call
+- peak_kb: tracemalloc peak during one extra call
+- alloc_blocks: memory blocks still allocated after that call
+- gc_gen0: generation-0 collections during it, a proxy for the number of
+  container objects allocated
+
+Latency runs are not traced, since tracemalloc slows Python down several
+times over. Write tools run last, so reads see the generated data as is.
+
+Usage:
+    python benchmarks/bench_tools.py [--scales 1000,10000,100000] [--repeat 5]
+        [--output bench_tools.json] [--compare previous.json] [--threshold 0.25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.join(BENCH_DIR, "..")
+
+STANDIN_TIME_HEADER = "X-Standin-Seconds"
+
+
+def tool_calls() -> List[Tuple[str, str, Dict[str, Any]]]:
+    """(label, tool, arguments) for each benchmarked call; writes last."""
+    today = datetime.date.today().isoformat()
+    return [
+        ("work_items", "sf_get_my_work_items", {}),
+        ("work_items_in_progress", "sf_get_my_work_items", {"status": "In Progress"}),
+        ("project_summary", "sf_get_project_summary", {"project_name": "Project 001"}),
+        ("estimate_accuracy", "sf_estimate_accuracy", {"group_by": "type"}),
+        ("weekly_utilization", "sf_weekly_utilization", {"weeks": 2}),
+        ("velocity_trend", "sf_velocity_trend", {"weeks": 6}),
+        ("scope_estimate", "sf_scope_estimate", {"work_type": "Development", "gut_estimate": 8}),
+        ("daily_budget", "sf_daily_budget", {}),
+        ("query_time_entries", "sf_query", {
+            "soql": "SELECT Id, Name, Date__c, Hours__c, Work_Item__r.Name FROM Time_Entry__c",
+        }),
+        ("query_paginate", "sf_query", {
+            "soql": "SELECT Id, Name, Hours__c FROM Time_Entry__c WHERE Hours__c >= 2",
+            "paginate": True,
+        }),
+        ("aggregate_hours_by_day", "sf_aggregate", {
+            "object_name": "Time_Entry__c", "aggregate_function": "SUM",
+            "field": "Hours__c", "group_by": "Date__c",
+        }),
+        ("describe_object", "sf_describe_object", {"object_name": "Work_Item__c"}),
+        ("api_usage", "sf_api_usage", {"refresh": True}),
+        ("log_time", "sf_log_time", {"work_item_name": "WI-0001", "hours": 1, "date": today}),
+        ("log_time_batch_20", "sf_log_time_batch", {"entries": [
+            {"work_item_name": f"WI-{i:04d}", "hours": 1, "date": today} for i in range(1, 21)
+        ]}),
+        ("update_status", "sf_update_work_item_status", {
+            "work_item_name": "WI-0002", "new_status": "In Progress",
+        }),
+        ("update_status_batch_50", "sf_update_work_item_status_batch", {"updates": [
+            {"work_item_name": f"WI-{i:04d}", "new_status": "Blocked"} for i in range(1, 51)
+        ]}),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Worker (one process per scale)
+# ---------------------------------------------------------------------------
+
+
+def _start_standin(time_entries: int) -> Tuple[subprocess.Popen, Dict[str, Any]]:
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_DIR, "sf_standin.py"), "--time-entries", str(time_entries)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = proc.stdout.readline()
+    if not line:
+        raise RuntimeError("sf_standin.py exited before it was ready")
+    return proc, json.loads(line)
+
+
+async def _run_tools(url: str, repeat: int) -> Dict[str, Dict[str, Any]]:
+    os.environ.setdefault("SF_ACCESS_TOKEN", "bench")
+    os.environ.setdefault("SF_INSTANCE_URL", url)
+    # Repeated calls would otherwise measure query cache hits; set
+    # SF_QUERY_CACHE_TTL explicitly to benchmark with the cache on.
+    os.environ.setdefault("SF_QUERY_CACHE_TTL", "0")
+    sys.path.insert(0, SERVER_DIR)
+    import server
+    from sf_client import AsyncSalesforce
+
+    # Same client OrgContext.get_async_sf() builds, pointed at the plain-HTTP
+    # stand-in (from_sync() assumes https).
+    standin_seconds: List[float] = []
+
+    async def _standin_time(response: Any) -> None:
+        standin_seconds.append(float(response.headers.get(STANDIN_TIME_HEADER, 0)))
+
+    org = server._orgs.get()
+    org.async_sf = AsyncSalesforce(
+        url,
+        "bench",
+        max_connections=server.SF_MAX_CONNECTIONS,
+        timeout=server.SF_HTTP_READ_TIMEOUT,
+        keepalive_expiry=server.SF_HTTP_KEEPALIVE,
+        gzip=server.SF_HTTP_GZIP,
+        max_retries=0,
+        event_hooks={
+            "request": [org.before_request],
+            "response": [org.after_response, _standin_time],
+        },
+    )
+
+    async def call(tool: str, args: Dict[str, Any]) -> Tuple[float, float, int, str]:
+        standin_seconds.clear()
+        start = time.perf_counter()
+        result = await server.mcp.call_tool(tool, args)
+        elapsed = time.perf_counter() - start
+        content = result[0] if isinstance(result, tuple) else result
+        text = "".join(getattr(c, "text", "") for c in content)
+        return elapsed, sum(standin_seconds), len(standin_seconds), text
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for label, tool, args in tool_calls():
+        first, _, _, text = await call(tool, args)
+        entry: Dict[str, Any] = {"tool": tool, "first_ms": round(first * 1000, 2)}
+        if text.startswith("Error"):
+            entry["error"] = text.splitlines()[0]
+            results[label] = entry
+            continue
+
+        runs = [await call(tool, args) for _ in range(repeat)]
+        times = [r[0] * 1000 for r in runs]
+        entry.update(
+            p50_ms=round(statistics.median(times), 2),
+            mean_ms=round(statistics.fmean(times), 2),
+            min_ms=round(min(times), 2),
+            max_ms=round(max(times), 2),
+            standin_ms=round(statistics.median(r[1] * 1000 for r in runs), 2),
+            http_requests=runs[-1][2],
+            output_chars=len(runs[-1][3]),
+        )
+
+        gc.collect()
+        gen0_before = gc.get_stats()[0]["collections"]
+        blocks_before = sys.getallocatedblocks()
+        tracemalloc.start()
+        await call(tool, args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        entry.update(
+            peak_kb=round(peak / 1024, 1),
+            alloc_blocks=sys.getallocatedblocks() - blocks_before,
+            gc_gen0=gc.get_stats()[0]["collections"] - gen0_before,
+        )
+        results[label] = entry
+
+    await org.async_sf.aclose()
+    return results
+
+
+def run_scale(time_entries: int, repeat: int) -> Dict[str, Any]:
+    """Benchmark every tool against a stand-in with time_entries rows."""
+    proc, info = _start_standin(time_entries)
+    try:
+        tools = asyncio.run(_run_tools(info["url"], repeat))
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {"dataset": info["counts"], "tools": tools}
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=SERVER_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Describe every p50/peak-memory regression beyond threshold."""
+    regressions = []
+    for scale, data in current["scales"].items():
+        old_tools = baseline.get("scales", {}).get(scale, {}).get("tools", {})
+        for label, entry in data["tools"].items():
+            old = old_tools.get(label)
+            if not old or "error" in old or "error" in entry:
+                continue
+            for metric, floor in (("p50_ms", 1.0), ("peak_kb", 64.0)):
+                before, after = old[metric], entry[metric]
+                if after - before > max(floor, before * threshold):
+                    regressions.append(
+                        f"{scale} entries / {label}: {metric} {before} -> {after} "
+                        f"(+{(after - before) / before:.0%})" if before else
+                        f"{scale} entries / {label}: {metric} {before} -> {after}"
+                    )
+    return regressions
+
+
+def _print_scale(scale: str, data: Dict[str, Any]) -> None:
+    counts = ", ".join(f"{n} {k}" for k, n in data["dataset"].items())
+    print(f"\n=== {scale} time entries ({counts}) ===")
+    print(
+        f"  {'call':<24} {'first':>9} {'p50':>9} {'stand-in':>9} {'reqs':>5} "
+        f"{'peak KB':>10} {'blocks':>9} {'gc0':>5}"
+    )
+    for label, e in data["tools"].items():
+        if "error" in e:
+            print(f"  {label:<24} {e['first_ms']:>9.1f}  {e['error']}")
+            continue
+        print(
+            f"  {label:<24} {e['first_ms']:>9.1f} {e['p50_ms']:>9.1f} {e['standin_ms']:>9.1f} "
+            f"{e['http_requests']:>5} {e['peak_kb']:>10.1f} {e['alloc_blocks']:>9} {e['gc_gen0']:>5}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scales", default="1000,10000,100000",
+                        help="comma-separated Time_Entry__c counts (1000 to 1000000)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="bench_tools.json")
+    parser.add_argument("--compare", help="previous results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown / memory growth counted as a regression")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        json.dump(run_scale(args.worker, args.repeat), sys.stdout)
+        return
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "scales": {},
+    }
+    for scale in (int(s) for s in args.scales.split(",")):
+        # A fresh process per scale: no caches carried over, and peak
+        # memory is not inflated by earlier runs.
+        worker = subprocess.run(
+            [sys.executable, __file__, "--worker", str(scale), "--repeat", str(args.repeat)],
+            capture_output=True, text=True,
+        )
+        if worker.returncode != 0:
+            sys.exit(f"Benchmark worker for {scale} entries failed:\n{worker.stderr}")
+        results["scales"][str(scale)] = json.loads(worker.stdout)
+        _print_scale(str(scale), results["scales"][str(scale)])
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\nRegressions against {args.compare} (threshold {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,943 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Salesforce REST API, for offline benchmarks.
+
+Serves synthetic User / Project__c / Work_Item__c / Time_Entry__c data over
+plain HTTP and implements the part of the REST API the server uses:
+
+- query/?q=... with nextRecordsUrl paging (2000 records per batch),
+  and query/?explain=...
+- sobjects/<type>/describe/ and sobjects/<type>/deleted/
+- sobjects/<type>/ (POST create) and sobjects/<type>/<id> (PATCH update)
+- composite (with @{ref.path} references), composite/batch, and
+  composite/sobjects (POST insert, PATCH update)
+- limits/
+
+SOQL is run by a small interpreter that covers what the tools send:
+- field paths through lookups, and aggregates with aliases
+- WHERE with AND/OR/NOT, IN, LIKE, NULL and date literals
+- GROUP BY, ORDER BY, LIMIT and OFFSET
+Results are memoized per statement until the next write, much like
+Salesforce's own query cache after the first run.
+
+Work_Item__c.Completed_Date__c follows the org's trigger: it is set when
+Status__c becomes Done and cleared when Status__c changes away from Done.
+Roll-up summary fields are computed once when the data is generated and
+are not updated by later writes.
+
+Every response carries an X-Standin-Seconds header with the time spent
+building it, so benchmarks can tell client time from stand-in time.
+
+Usage:
+    python benchmarks/sf_standin.py --time-entries 100000 [--port 8765]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import gzip
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+API_VERSION = "59.0"
+BATCH_SIZE = 2000
+DAILY_API_MAX = 5_000_000
+STANDIN_TIME_HEADER = "X-Standin-Seconds"
+
+WORK_ITEM_STATUSES = ["To Do", "In Progress", "Done", "Blocked"]
+PRIORITIES = ["P1 - Critical", "P2 - High", "P3 - Medium", "P4 - Low"]
+WORK_TYPES = [
+    "Development", "Configuration", "Testing",
+    "Documentation", "Data Migration", "Integration",
+]
+PROJECT_STATUSES = ["Active", "Complete", "On Hold"]
+
+# sObject -> field -> (describe type, reference target)
+SCHEMA: Dict[str, Dict[str, Tuple[str, Optional[str]]]] = {
+    "User": {
+        "Id": ("id", None),
+        "Name": ("string", None),
+    },
+    "Project__c": {
+        "Id": ("id", None),
+        "Name": ("string", None),
+        "Status__c": ("picklist", None),
+        "Client__c": ("string", None),
+        "Start_Date__c": ("date", None),
+        "End_Date__c": ("date", None),
+        "Total_Estimated_Hours__c": ("double", None),
+        "Total_Actual_Hours__c": ("double", None),
+        "Work_Item_Count__c": ("double", None),
+        "SystemModstamp": ("datetime", None),
+    },
+    "Work_Item__c": {
+        "Id": ("id", None),
+        "Name": ("string", None),
+        "Subject__c": ("string", None),
+        "Status__c": ("picklist", None),
+        "Priority__c": ("picklist", None),
+        "Type__c": ("picklist", None),
+        "Due_Date__c": ("date", None),
+        "Completed_Date__c": ("date", None),
+        "Estimated_Hours__c": ("double", None),
+        "Actual_Hours__c": ("double", None),
+        "Project__c": ("reference", "Project__c"),
+        "Assigned_To__c": ("reference", "User"),
+        "SystemModstamp": ("datetime", None),
+    },
+    "Time_Entry__c": {
+        "Id": ("id", None),
+        "Name": ("string", None),
+        "Work_Item__c": ("reference", "Work_Item__c"),
+        "Date__c": ("date", None),
+        "Hours__c": ("double", None),
+        "Notes__c": ("string", None),
+        "SystemModstamp": ("datetime", None),
+    },
+}
+
+PICKLISTS = {
+    ("Project__c", "Status__c"): PROJECT_STATUSES,
+    ("Work_Item__c", "Status__c"): WORK_ITEM_STATUSES,
+    ("Work_Item__c", "Priority__c"): PRIORITIES,
+    ("Work_Item__c", "Type__c"): WORK_TYPES,
+}
+
+KEY_PREFIXES = {"User": "005", "Project__c": "a00", "Work_Item__c": "a01", "Time_Entry__c": "a02"}
+AUTO_NUMBERS = {"Work_Item__c": "WI-{:04d}", "Time_Entry__c": "TE-{:04d}"}
+
+Record = Dict[str, Any]
+
+
+class SoqlError(Exception):
+    """A query the stand-in cannot run; reported as MALFORMED_QUERY."""
+
+
+def _now_stamp() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+
+class DataStore:
+    """Synthetic org data, indexed by sObject and Id."""
+
+    def __init__(self, time_entries: int, seed: int = 42) -> None:
+        self.tables: Dict[str, List[Record]] = {name: [] for name in SCHEMA}
+        self.by_id: Dict[str, Record] = {}
+        self.counters = {name: 0 for name in SCHEMA}
+        self.lock = threading.Lock()
+        self._generate(time_entries, random.Random(seed))
+
+    def new_id(self, sobject: str) -> str:
+        self.counters[sobject] += 1
+        return f"{KEY_PREFIXES[sobject]}{self.counters[sobject]:012d}AAA"
+
+    def add(self, sobject: str, record: Record) -> Record:
+        record["Id"] = self.new_id(sobject)
+        if sobject in AUTO_NUMBERS:
+            record["Name"] = AUTO_NUMBERS[sobject].format(self.counters[sobject])
+        record.setdefault("SystemModstamp", _now_stamp())
+        self.tables[sobject].append(record)
+        self.by_id[record["Id"]] = record
+        return record
+
+    def _generate(self, n_entries: int, rng: random.Random) -> None:
+        today = datetime.date.today()
+        n_items = max(10, n_entries // 20)
+        n_projects = max(3, n_items // 100)
+        users = [self.add("User", {"Name": f"User {i:02d}"}) for i in range(1, 21)]
+        projects = [
+            self.add("Project__c", {
+                "Name": f"Project {i:03d}",
+                "Status__c": rng.choice(PROJECT_STATUSES),
+                "Client__c": f"Client {i % 17:02d}",
+                "Start_Date__c": (today - datetime.timedelta(days=rng.randint(60, 365))).isoformat(),
+                "End_Date__c": (today + datetime.timedelta(days=rng.randint(0, 180))).isoformat(),
+            })
+            for i in range(1, n_projects + 1)
+        ]
+        items = []
+        for i in range(1, n_items + 1):
+            status = rng.choice(WORK_ITEM_STATUSES)
+            due = today + datetime.timedelta(days=rng.randint(-60, 30))
+            items.append(self.add("Work_Item__c", {
+                "Subject__c": f"Task {i} " + rng.choice(["build", "fix", "review", "deploy"]),
+                "Status__c": status,
+                "Priority__c": rng.choice(PRIORITIES),
+                "Type__c": rng.choice(WORK_TYPES),
+                "Due_Date__c": due.isoformat(),
+                "Completed_Date__c": (
+                    (today - datetime.timedelta(days=rng.randint(0, 90))).isoformat()
+                    if status == "Done" else None
+                ),
+                "Estimated_Hours__c": float(rng.choice([1, 2, 4, 8, 16, 24])),
+                "Actual_Hours__c": 0.0,
+                "Project__c": rng.choice(projects)["Id"],
+                "Assigned_To__c": rng.choice(users)["Id"],
+            }))
+        for _ in range(n_entries):
+            item = rng.choice(items)
+            hours = rng.choice([0.5, 1.0, 1.5, 2.0, 3.0, 4.0])
+            item["Actual_Hours__c"] += hours
+            self.add("Time_Entry__c", {
+                "Work_Item__c": item["Id"],
+                "Date__c": (today - datetime.timedelta(days=rng.randint(0, 180))).isoformat(),
+                "Hours__c": hours,
+                "Notes__c": rng.choice([None, "Meeting", "Implementation work", "Code review"]),
+            })
+        rollups = {p["Id"]: p for p in projects}
+        for p in projects:
+            p.update(Total_Estimated_Hours__c=0.0, Total_Actual_Hours__c=0.0, Work_Item_Count__c=0.0)
+        for item in items:
+            p = rollups[item["Project__c"]]
+            p["Total_Estimated_Hours__c"] += item["Estimated_Hours__c"]
+            p["Total_Actual_Hours__c"] += item["Actual_Hours__c"]
+            p["Work_Item_Count__c"] += 1
+
+    def counts(self) -> Dict[str, int]:
+        return {name: len(rows) for name, rows in self.tables.items()}
+
+
+# ---------------------------------------------------------------------------
+# SOQL interpreter
+# ---------------------------------------------------------------------------
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:"
+    r"(?P<string>'(?:[^'\\]|\\.)*')"
+    r"|(?P<datetime>\d{4}-\d{2}-\d{2}T[0-9:.]+(?:Z|[+-]\d{2}:?\d{2})?)"
+    r"|(?P<date>\d{4}-\d{2}-\d{2})"
+    r"|(?P<number>-?\d+(?:\.\d+)?)"
+    r"|(?P<op>!=|<=|>=|=|<|>|\(|\)|,)"
+    r"|(?P<word>[A-Za-z_][\w.]*(?::\d+)?)"
+    r")"
+)
+
+_AGGREGATES = {"COUNT", "SUM", "AVG", "MIN", "MAX", "COUNT_DISTINCT"}
+
+
+def _tokenize(soql: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    soql = soql.strip()
+    while pos < len(soql):
+        match = _TOKEN_RE.match(soql, pos)
+        if not match or match.end() == pos:
+            raise SoqlError(f"unexpected token at: {soql[pos:pos + 20]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+def _date_range(literal: str) -> Tuple[str, str]:
+    """[start, end) ISO dates for a SOQL date literal."""
+    today = datetime.date.today()
+    name, _, n = literal.upper().partition(":")
+    day = datetime.timedelta(days=1)
+    week_start = today - datetime.timedelta(days=(today.weekday() + 1) % 7)
+    ranges = {
+        "TODAY": (today, today + day),
+        "YESTERDAY": (today - day, today),
+        "TOMORROW": (today + day, today + 2 * day),
+        "THIS_WEEK": (week_start, week_start + 7 * day),
+        "LAST_WEEK": (week_start - 7 * day, week_start),
+    }
+    if name in ranges:
+        start, end = ranges[name]
+    elif name == "LAST_N_DAYS":
+        start, end = today - int(n) * day, today + day
+    elif name == "NEXT_N_DAYS":
+        start, end = today, today + (int(n) + 1) * day
+    else:
+        raise SoqlError(f"unsupported date literal {literal}")
+    return start.isoformat(), end.isoformat()
+
+
+def _datetime_value(literal: str) -> str:
+    value = datetime.datetime.fromisoformat(literal.replace("Z", "+00:00"))
+    return value.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+
+class _Parser:
+    def __init__(self, soql: str) -> None:
+        self.tokens = _tokenize(soql)
+        self.i = 0
+
+    def peek(self, offset: int = 0) -> Tuple[str, str]:
+        j = self.i + offset
+        return self.tokens[j] if j < len(self.tokens) else ("eof", "")
+
+    def keyword(self, *words: str) -> bool:
+        """Consume the keyword sequence if it comes next."""
+        for k, word in enumerate(words):
+            kind, value = self.peek(k)
+            if kind != "word" or value.upper() != word:
+                return False
+        self.i += len(words)
+        return True
+
+    def expect(self, value: str) -> None:
+        if self.peek()[1].upper() != value:
+            raise SoqlError(f"expected {value}, got {self.peek()[1]!r}")
+        self.i += 1
+
+    def take(self) -> Tuple[str, str]:
+        token = self.peek()
+        if token[0] == "eof":
+            raise SoqlError("unexpected end of query")
+        self.i += 1
+        return token
+
+    def parse(self) -> Dict[str, Any]:
+        self.expect("SELECT")
+        select = self.select_list()
+        self.expect("FROM")
+        query: Dict[str, Any] = {"select": select, "from": self.take()[1]}
+        query["where"] = self.condition() if self.keyword("WHERE") else None
+        query["group_by"] = []
+        if self.keyword("GROUP", "BY"):
+            query["group_by"] = [self.take()[1]]
+            while self.peek()[1] == ",":
+                self.i += 1
+                query["group_by"].append(self.take()[1])
+        query["order_by"] = []
+        if self.keyword("ORDER", "BY"):
+            while True:
+                key = self.select_item()[1]
+                descending = self.keyword("DESC")
+                if not descending:
+                    self.keyword("ASC")
+                nulls_last = descending
+                if self.keyword("NULLS", "FIRST"):
+                    nulls_last = False
+                elif self.keyword("NULLS", "LAST"):
+                    nulls_last = True
+                query["order_by"].append((key, descending, nulls_last))
+                if self.peek()[1] != ",":
+                    break
+                self.i += 1
+        query["limit"] = int(self.take()[1]) if self.keyword("LIMIT") else None
+        query["offset"] = int(self.take()[1]) if self.keyword("OFFSET") else 0
+        if self.peek()[0] != "eof":
+            raise SoqlError(f"unsupported clause at {self.peek()[1]!r}")
+        return query
+
+    def select_item(self) -> Tuple[Optional[str], Any]:
+        """(aggregate function or None, field path or (function, path))."""
+        kind, value = self.take()
+        if self.peek()[1] == "(" and value.upper() in _AGGREGATES:
+            self.i += 1
+            path = None if self.peek()[1] == ")" else self.take()[1]
+            self.expect(")")
+            return value.upper(), (value.upper(), path)
+        return None, value
+
+    def select_list(self) -> List[Tuple[Optional[str], Any, Optional[str]]]:
+        items = []
+        while True:
+            function, expr = self.select_item()
+            alias = None
+            kind, value = self.peek()
+            if kind == "word" and value.upper() not in ("FROM",):
+                alias = value
+                self.i += 1
+            items.append((function, expr, alias))
+            if self.peek()[1] != ",":
+                return items
+            self.i += 1
+
+    def condition(self) -> Any:
+        terms = [self.conjunction()]
+        while self.keyword("OR"):
+            terms.append(self.conjunction())
+        return terms[0] if len(terms) == 1 else ("or", terms)
+
+    def conjunction(self) -> Any:
+        terms = [self.negation()]
+        while self.keyword("AND"):
+            terms.append(self.negation())
+        return terms[0] if len(terms) == 1 else ("and", terms)
+
+    def negation(self) -> Any:
+        if self.keyword("NOT"):
+            return ("not", self.negation())
+        if self.peek()[1] == "(":
+            self.i += 1
+            inner = self.condition()
+            self.expect(")")
+            return inner
+        path = self.take()[1]
+        if self.keyword("NOT", "IN"):
+            return ("cmp", path, "NOT IN", self.value_list())
+        if self.keyword("IN"):
+            return ("cmp", path, "IN", self.value_list())
+        if self.keyword("LIKE"):
+            return ("cmp", path, "LIKE", self.value())
+        kind, op = self.take()
+        if kind != "op":
+            raise SoqlError(f"expected an operator after {path}, got {op!r}")
+        return ("cmp", path, op, self.value())
+
+    def value_list(self) -> List[Any]:
+        self.expect("(")
+        values = [self.value()]
+        while self.peek()[1] == ",":
+            self.i += 1
+            values.append(self.value())
+        self.expect(")")
+        return values
+
+    def value(self) -> Any:
+        kind, value = self.take()
+        if kind == "string":
+            return re.sub(r"\\(.)", r"\1", value[1:-1])
+        if kind == "number":
+            return float(value)
+        if kind == "date":
+            return value
+        if kind == "datetime":
+            return _datetime_value(value)
+        upper = value.upper()
+        if upper == "NULL":
+            return None
+        if upper in ("TRUE", "FALSE"):
+            return upper == "TRUE"
+        return ("range", _date_range(value))
+
+
+class Query:
+    """A parsed SOQL statement compiled against the data store."""
+
+    def __init__(self, store: DataStore, soql: str) -> None:
+        self.store = store
+        parsed = _Parser(soql).parse()
+        self.sobject = parsed["from"]
+        if self.sobject not in SCHEMA:
+            raise SoqlError(f"sObject type '{self.sobject}' is not supported")
+        self.select = parsed["select"]
+        self.where = self._compile(parsed["where"]) if parsed["where"] else None
+        self.group_by = parsed["group_by"]
+        self.order_by = parsed["order_by"]
+        self.limit = parsed["limit"]
+        self.offset = parsed["offset"]
+        self.is_count = self.select == [("COUNT", ("COUNT", None), None)] and not self.group_by
+        self.is_aggregate = bool(self.group_by) or any(f for f, _, _ in self.select)
+        for function, expr, _ in self.select:
+            if function is None:
+                self._resolve(self.sobject, expr)
+
+    # Field access -----------------------------------------------------
+
+    def _resolve(self, sobject: str, path: str) -> List[Tuple[str, Optional[str]]]:
+        """Split a path into (field, next sObject) hops, validating each."""
+        hops = []
+        parts = path.split(".")
+        for k, part in enumerate(parts):
+            fields = SCHEMA[sobject]
+            if k < len(parts) - 1:
+                lookup = part[:-3] + "__c" if part.endswith("__r") else part + "Id"
+                if lookup not in fields or fields[lookup][1] is None:
+                    raise SoqlError(f"no relationship '{part}' on {sobject}")
+                hops.append((lookup, fields[lookup][1]))
+                sobject = fields[lookup][1]
+            else:
+                if part not in fields:
+                    raise SoqlError(f"no such column '{part}' on entity '{sobject}'")
+                hops.append((part, None))
+        return hops
+
+    def getter(self, path: str) -> Callable[[Record], Any]:
+        hops = self._resolve(self.sobject, path)
+        if len(hops) == 1:
+            field = hops[0][0]
+            return lambda r: r.get(field)
+        by_id = self.store.by_id
+
+        def get(record: Record) -> Any:
+            for field, target in hops:
+                value = record.get(field)
+                if target is None or value is None:
+                    return value
+                record = by_id[value]
+            return None
+
+        return get
+
+    # WHERE ------------------------------------------------------------
+
+    def _compile(self, node: Any) -> Callable[[Record], bool]:
+        kind = node[0]
+        if kind in ("and", "or"):
+            parts = [self._compile(n) for n in node[1]]
+            combine = all if kind == "and" else any
+            return lambda r: combine(p(r) for p in parts)
+        if kind == "not":
+            inner = self._compile(node[1])
+            return lambda r: not inner(r)
+        _, path, op, value = node
+        get = self.getter(path)
+        if isinstance(value, tuple) and value[0] == "range":
+            start, end = value[1]
+            tests = {
+                "=": lambda v: start <= v[:10] < end,
+                "!=": lambda v: not (start <= v[:10] < end),
+                "<": lambda v: v[:10] < start,
+                "<=": lambda v: v[:10] < end,
+                ">": lambda v: v[:10] >= end,
+                ">=": lambda v: v[:10] >= start,
+            }
+            test = tests[op]
+            return lambda r: (v := get(r)) is not None and test(v)
+        if op in ("IN", "NOT IN"):
+            members = set(value)
+            if op == "IN":
+                return lambda r: get(r) in members
+            return lambda r: get(r) not in members
+        if op == "LIKE":
+            pattern = re.compile(
+                "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in value),
+                re.IGNORECASE | re.DOTALL,
+            )
+            return lambda r: (v := get(r)) is not None and pattern.fullmatch(str(v)) is not None
+        if value is None:
+            if op == "=":
+                return lambda r: get(r) is None
+            return lambda r: get(r) is not None
+        compare = {
+            "=": lambda v: v == value,
+            "!=": lambda v: v != value,
+            "<": lambda v: v < value,
+            "<=": lambda v: v <= value,
+            ">": lambda v: v > value,
+            ">=": lambda v: v >= value,
+        }[op]
+        if op == "!=":
+            return lambda r: compare(get(r))
+        return lambda r: (v := get(r)) is not None and compare(v)
+
+    # Execution --------------------------------------------------------
+
+    def rows(self) -> List[Any]:
+        """Matching source records (or aggregate result rows), paged later."""
+        source: Iterable[Record] = self.store.tables[self.sobject]
+        if self.where is not None:
+            source = filter(self.where, source)
+        if self.is_count:
+            return [sum(1 for _ in source)]
+        if self.is_aggregate:
+            rows = self._aggregate(source)
+        elif not self.order_by and self.limit is not None:
+            return list(itertools.islice(source, self.offset, self.offset + self.limit))
+        else:
+            rows = list(source)
+        for key, descending, nulls_last in reversed(self.order_by):
+            get = (lambda r, k=key: r.get(k)) if self.is_aggregate else self.getter(key)
+            present = [r for r in rows if get(r) is not None]
+            missing = [r for r in rows if get(r) is None]
+            present.sort(key=get, reverse=descending)
+            rows = present + missing if nulls_last else missing + present
+        end = None if self.limit is None else self.offset + self.limit
+        return rows[self.offset:end]
+
+    def _aggregate(self, source: Iterable[Record]) -> List[Record]:
+        group_getters = [self.getter(p) for p in self.group_by]
+        groups: Dict[Tuple[Any, ...], List[Record]] = {}
+        for record in source:
+            groups.setdefault(tuple(g(record) for g in group_getters), []).append(record)
+        if not self.group_by and not groups:
+            groups[()] = []
+        out = []
+        for key, members in groups.items():
+            row: Record = {"attributes": {"type": "AggregateResult"}}
+            expr_index = 0
+            for function, expr, alias in self.select:
+                if function is None:
+                    name = alias or expr.rsplit(".", 1)[-1]
+                    row[name] = key[self.group_by.index(expr)]
+                    continue
+                name = alias or f"expr{expr_index}"
+                expr_index += 1
+                path = expr[1]
+                values = [members] if path is None else [
+                    v for v in map(self.getter(path), members) if v is not None
+                ]
+                if path is None:
+                    row[name] = len(members)
+                elif function == "COUNT":
+                    row[name] = len(values)
+                elif function == "COUNT_DISTINCT":
+                    row[name] = len(set(values))
+                elif not values:
+                    row[name] = None
+                elif function == "SUM":
+                    row[name] = sum(values)
+                elif function == "AVG":
+                    row[name] = sum(values) / len(values)
+                else:
+                    row[name] = (min if function == "MIN" else max)(values)
+            out.append(row)
+        return out
+
+    def project(self, record: Record) -> Record:
+        """Shape a source record the way the REST API returns it."""
+        if self.is_aggregate:
+            return record
+        out: Record = {"attributes": _attributes(self.sobject, record["Id"])}
+        for _, path, _ in self.select:
+            target, sobject = out, self.sobject
+            source: Optional[Record] = record
+            parts = path.split(".")
+            for k, part in enumerate(parts):
+                if k == len(parts) - 1:
+                    target[part] = source.get(part)
+                    break
+                lookup, sobject_next = self._resolve(sobject, part + ".Id")[0]
+                parent_id = source.get(lookup)
+                if parent_id is None:
+                    target[part] = None
+                    break
+                source = self.store.by_id[parent_id]
+                nested = target.get(part)
+                if nested is None:
+                    nested = target[part] = {"attributes": _attributes(sobject_next, parent_id)}
+                target, sobject = nested, sobject_next
+        return out
+
+
+def _attributes(sobject: str, record_id: str) -> Dict[str, str]:
+    return {"type": sobject, "url": f"/services/data/v{API_VERSION}/sobjects/{sobject}/{record_id}"}
+
+
+# ---------------------------------------------------------------------------
+# REST endpoints
+# ---------------------------------------------------------------------------
+
+
+class StandIn:
+    """Request routing and state shared by all handler threads."""
+
+    def __init__(self, store: DataStore) -> None:
+        self.store = store
+        self.api_usage = 0
+        self._results: "OrderedDict[str, Tuple[Query, List[Any]]]" = OrderedDict()
+        self._locators: "OrderedDict[str, Tuple[Query, List[Any]]]" = OrderedDict()
+        self._locator_ids = itertools.count(1)
+
+    def handle(self, method: str, path: str, query: Dict[str, str], body: Any) -> Tuple[int, Any]:
+        prefix = f"/services/data/v{API_VERSION}/"
+        if not path.startswith(prefix):
+            return 404, [{"errorCode": "NOT_FOUND", "message": f"unknown path {path}"}]
+        parts = [unquote(p) for p in path[len(prefix):].strip("/").split("/")]
+        try:
+            if parts[0] == "query":
+                if len(parts) == 2:
+                    return 200, self._page(parts[1])
+                if "explain" in query:
+                    return 200, self._explain(query["explain"])
+                return 200, self._query(query.get("q", ""))
+            if parts[0] == "limits":
+                return 200, {"DailyApiRequests": {"Max": DAILY_API_MAX, "Remaining": DAILY_API_MAX - self.api_usage}}
+            if parts[0] == "composite" and parts[1:] == []:
+                return 200, self._composite(body)
+            if parts[0] == "composite" and parts[1:] == ["batch"]:
+                return 200, self._composite_batch(body)
+            if parts[0] == "composite" and parts[1:] == ["sobjects"]:
+                return 200, [self._write(method, r.get("attributes", {}).get("type"), r) for r in body["records"]]
+            if parts[0] == "sobjects" and len(parts) >= 2:
+                return self._sobject(method, parts[1:], body)
+        except SoqlError as e:
+            return 400, [{"errorCode": "MALFORMED_QUERY", "message": str(e)}]
+        return 404, [{"errorCode": "NOT_FOUND", "message": f"unsupported resource {path}"}]
+
+    # Query ------------------------------------------------------------
+
+    def _compile(self, soql: str) -> Tuple[Query, List[Any]]:
+        with self.store.lock:
+            cached = self._results.get(soql)
+        if cached is not None:
+            return cached
+        query = Query(self.store, soql)
+        result = (query, query.rows())
+        with self.store.lock:
+            self._results[soql] = result
+            while len(self._results) > 256:
+                self._results.popitem(last=False)
+        return result
+
+    def _query(self, soql: str) -> Dict[str, Any]:
+        query, rows = self._compile(soql)
+        if query.is_count:
+            return {"totalSize": rows[0], "done": True, "records": []}
+        return self._batch(query, rows, 0, None)
+
+    def _batch(self, query: Query, rows: List[Any], start: int, locator: Optional[str]) -> Dict[str, Any]:
+        end = start + BATCH_SIZE
+        result = {
+            "totalSize": len(rows),
+            "done": end >= len(rows),
+            "records": [query.project(r) for r in rows[start:end]],
+        }
+        if end < len(rows):
+            if locator is None:
+                locator = f"01g{next(self._locator_ids):012d}"
+                with self.store.lock:
+                    self._locators[locator] = (query, rows)
+                    while len(self._locators) > 64:
+                        self._locators.popitem(last=False)
+            result["nextRecordsUrl"] = f"/services/data/v{API_VERSION}/query/{locator}-{end}"
+        return result
+
+    def _page(self, locator_offset: str) -> Dict[str, Any]:
+        locator, _, offset = locator_offset.rpartition("-")
+        entry = self._locators.get(locator)
+        if entry is None:
+            raise SoqlError(f"invalid query locator {locator}")
+        return self._batch(entry[0], entry[1], int(offset), locator)
+
+    def _explain(self, soql: str) -> Dict[str, Any]:
+        query = Query(self.store, soql)
+        size = len(self.store.tables[query.sobject])
+        indexed = {"Id", "Name"} | {
+            f for f, (_, target) in SCHEMA[query.sobject].items() if target
+        }
+        match = re.search(r"\bWHERE\b(.*)", soql, re.IGNORECASE | re.DOTALL)
+        where = match.group(1) if match else ""
+        hit = next((f for f in indexed if re.search(rf"\b{f}\s*(=|IN\b)", where)), None)
+        plan = {
+            "cardinality": 1 if hit else size,
+            "fields": [hit] if hit else [],
+            "leadingOperationType": "Index" if hit else "TableScan",
+            "notes": [],
+            "relativeCost": 0.01 if hit else 1 + size / 100000,
+            "sobjectCardinality": size,
+            "sobjectType": query.sobject,
+        }
+        return {"plans": [plan], "sourceQuery": soql}
+
+    def _composite_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        results = []
+        for sub in body["batchRequests"]:
+            split = urlsplit("/services/data/" + sub["url"])
+            query = {k: v[0] for k, v in parse_qs(split.query).items()}
+            status, result = self.handle(sub["method"], split.path, query, sub.get("richInput"))
+            results.append({"statusCode": status, "result": result})
+        return {"hasErrors": any(r["statusCode"] >= 300 for r in results), "results": results}
+
+    def _composite(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        bodies: Dict[str, Any] = {}
+        responses: List[Dict[str, Any]] = []
+        failed: Optional[int] = None
+        for i, sub in enumerate(body["compositeRequest"]):
+            ref = sub["referenceId"]
+            try:
+                url = _REFERENCE_RE.sub(lambda m: _resolve_reference(bodies, m), sub["url"])
+            except LookupError as e:
+                status, result = 400, [{
+                    "errorCode": "PROCESSING_HALTED",
+                    "message": f"Invalid reference specified. No value for {e} found.",
+                }]
+            else:
+                split = urlsplit(url)
+                query = {k: v[0] for k, v in parse_qs(split.query).items()}
+                status, result = self.handle(sub["method"], split.path, query, sub.get("body"))
+            bodies[ref] = result
+            responses.append({"body": result, "httpHeaders": {}, "httpStatusCode": status, "referenceId": ref})
+            if status >= 300 and body.get("allOrNone", False):
+                failed = i
+                break
+        if failed is not None:
+            # allOrNone rolls back the whole request: every other subrequest,
+            # before or after the failed one, reports PROCESSING_HALTED.
+            halted = [{
+                "errorCode": "PROCESSING_HALTED",
+                "message": "The transaction was rolled back since another operation "
+                           "in the same transaction failed.",
+            }]
+            responses = [
+                responses[i] if i == failed else {
+                    "body": halted, "httpHeaders": {}, "httpStatusCode": 400,
+                    "referenceId": sub["referenceId"],
+                }
+                for i, sub in enumerate(body["compositeRequest"])
+            ]
+        return {"compositeResponse": responses}
+
+    # sObjects ---------------------------------------------------------
+
+    def _sobject(self, method: str, parts: List[str], body: Any) -> Tuple[int, Any]:
+        sobject = parts[0]
+        if sobject not in SCHEMA:
+            return 404, [{"errorCode": "NOT_FOUND", "message": f"unknown sObject {sobject}"}]
+        if parts[1:] == ["describe"]:
+            return 200, _describe(sobject)
+        if parts[1:] == ["deleted"]:
+            now = _now_stamp()
+            return 200, {"deletedRecords": [], "earliestDateAvailable": "2000-01-01T00:00:00.000+0000", "latestDateCovered": now}
+        if method == "POST" and len(parts) == 1:
+            result = self._write("POST", sobject, body)
+            return (201 if result["success"] else 400), result
+        if method == "PATCH" and len(parts) == 2:
+            result = self._write("PATCH", sobject, dict(body, id=parts[1]))
+            return (204, None) if result["success"] else (404, result["errors"])
+        return 405, [{"errorCode": "METHOD_NOT_ALLOWED", "message": f"{method} not supported"}]
+
+    def _write(self, method: str, sobject: Optional[str], data: Record) -> Dict[str, Any]:
+        fields = {k: v for k, v in data.items() if k not in ("attributes", "id", "Id")}
+        unknown = [k for k in fields if k not in SCHEMA.get(sobject or "", {})]
+        if sobject not in SCHEMA or unknown:
+            message = f"No such column '{unknown[0]}' on {sobject}" if unknown else f"unknown sObject {sobject}"
+            return {"id": None, "success": False, "errors": [{"statusCode": "INVALID_FIELD", "message": message, "fields": unknown}]}
+        with self.store.lock:
+            self._results.clear()
+            if method == "POST":
+                record = self.store.add(sobject, fields)
+                return {"id": record["Id"], "success": True, "errors": []}
+            record_id = data.get("id") or data.get("Id")
+            record = self.store.by_id.get(record_id)
+            if record is None:
+                return {"id": record_id, "success": False, "errors": [{"statusCode": "ENTITY_IS_DELETED", "message": "entity is deleted", "fields": []}]}
+            if sobject == "Work_Item__c" and "Status__c" in fields:
+                if fields["Status__c"] == "Done" and record.get("Status__c") != "Done":
+                    fields["Completed_Date__c"] = datetime.date.today().isoformat()
+                elif fields["Status__c"] != "Done":
+                    fields["Completed_Date__c"] = None
+            record.update(fields, SystemModstamp=_now_stamp())
+            return {"id": record_id, "success": True, "errors": []}
+
+
+def _describe(sobject: str) -> Dict[str, Any]:
+    fields = []
+    for name, (ftype, target) in SCHEMA[sobject].items():
+        fields.append({
+            "name": name,
+            "label": name.replace("__c", "").replace("_", " "),
+            "type": ftype,
+            "nillable": name not in ("Id", "Name"),
+            "createable": name not in ("Id", "SystemModstamp"),
+            "updateable": name not in ("Id", "SystemModstamp", "Name"),
+            "unique": name == "Id",
+            "externalId": False,
+            "idLookup": name in ("Id", "Name"),
+            "referenceTo": [target] if target else [],
+            "relationshipName": name[:-3] + "__r" if target and name.endswith("__c") else None,
+            "picklistValues": [
+                {"value": v, "label": v, "active": True, "defaultValue": False}
+                for v in PICKLISTS.get((sobject, name), [])
+            ],
+        })
+    children = [
+        {"childSObject": child, "field": name, "relationshipName": f"{child[:-3]}s__r"}
+        for child, child_fields in SCHEMA.items()
+        for name, (_, target) in child_fields.items()
+        if target == sobject
+    ]
+    return {
+        "name": sobject,
+        "label": sobject.replace("__c", "").replace("_", " "),
+        "keyPrefix": KEY_PREFIXES[sobject],
+        "custom": sobject.endswith("__c"),
+        "createable": True,
+        "updateable": True,
+        "fields": fields,
+        "childRelationships": children,
+    }
+
+
+# ---------------------------------------------------------------------------
+# HTTP server
+# ---------------------------------------------------------------------------
+
+
+_REFERENCE_RE = re.compile(r"@\{(\w+)((?:\.\w+|\[\d+\])+)\}")
+
+
+def _resolve_reference(bodies: Dict[str, Any], match: "re.Match[str]") -> str:
+    """Value of an @{ref.path[0].Field} composite reference; LookupError if absent."""
+    value = bodies.get(match.group(1))
+    for key, index in re.findall(r"\.(\w+)|\[(\d+)\]", match.group(2)):
+        try:
+            value = value[int(index)] if index else value[key]
+        except (LookupError, TypeError):
+            raise LookupError(match.group(0)[2:-1]) from None
+    return str(value)
+
+
+def _make_handler(standin: StandIn) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; with Nagle on, every
+        # keep-alive response would wait ~40ms for a delayed ACK.
+        disable_nagle_algorithm = True
+
+        def _dispatch(self) -> None:
+            started = time.perf_counter()
+            split = urlsplit(self.path)
+            query = {k: v[0] for k, v in parse_qs(split.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length)) if length else None
+            standin.api_usage += 1
+            status, payload = standin.handle(self.command, split.path, query, body)
+            data = b"" if payload is None else json.dumps(payload).encode()
+            compress = len(data) > 1024 and "gzip" in self.headers.get("Accept-Encoding", "")
+            if compress:
+                data = gzip.compress(data, compresslevel=1)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json;charset=UTF-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Sforce-Limit-Info", f"api-usage={standin.api_usage}/{DAILY_API_MAX}")
+            if compress:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header(STANDIN_TIME_HEADER, f"{time.perf_counter() - started:.6f}")
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PATCH = do_DELETE = _dispatch
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def serve(time_entries: int, port: int = 0, seed: int = 42) -> ThreadingHTTPServer:
+    """Generate data and return a bound (not yet serving) HTTP server."""
+    standin = StandIn(DataStore(time_entries, seed))
+    server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(standin))
+    server.daemon_threads = True
+    server.standin = standin  # type: ignore[attr-defined]
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--time-entries", type=int, default=10000)
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    server = serve(args.time_entries, args.port, args.seed)
+    counts = server.standin.store.counts()  # type: ignore[attr-defined]
+    # First stdout line is machine-readable for bench_tools.py.
+    print(json.dumps({"url": f"http://127.0.0.1:{server.server_address[1]}", "counts": counts}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
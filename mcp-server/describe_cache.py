@@ -0,0 +1,232 @@
+"""
+TTL + LRU cache for Salesforce sObject describe results.
+
+Describe payloads are large (hundreds of KB for objects like User) and rarely
+change, so they are kept in memory for a configurable TTL. Once an entry goes
+stale it is revalidated with an If-Modified-Since request instead of being
+re-downloaded; a 304 response simply renews the entry. An optional on-disk
+layer (one JSON file per object) lets a fresh process start warm and is
+shared between server.py and dump_schema.py.
+
+Object names are matched case-insensitively, as Salesforce does, and must
+be plain API names: they come from the agent and name files on disk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# fetch(object_name, if_modified_since) -> describe dict, or None for "304"
+DescribeFetcher = Callable[[str, Optional[str]], Optional[Dict[str, Any]]]
+AsyncDescribeFetcher = Callable[[str, Optional[str]], Awaitable[Optional[Dict[str, Any]]]]
+
+_OBJECT_NAME_RE = re.compile(r"\w+", re.ASCII)
+
+
+def _key(object_name: str) -> str:
+    """Cache key for an sObject name. Raises ValueError for anything but an API name."""
+    if not _OBJECT_NAME_RE.fullmatch(object_name):
+        raise ValueError(f"Invalid sObject name '{object_name}'.")
+    return object_name.lower()
+
+
+@dataclass
+class DescribeEntry:
+    """A cached describe result and the time it was last validated."""
+
+    describe: Dict[str, Any]
+    validated_at: float
+
+    @property
+    def if_modified_since(self) -> str:
+        """The validation time formatted as an HTTP date."""
+        return email.utils.formatdate(self.validated_at, usegmt=True)
+
+
+class DescribeCache:
+    """
+    In-memory LRU of describe results with TTL and an optional disk layer.
+
+    Usage:
+        cache = DescribeCache(ttl=3600, max_entries=64, cache_dir=".describe")
+        desc = cache.get_or_fetch("Work_Item__c", fetch)
+        desc = await cache.aget_or_fetch("Work_Item__c", async_fetch)
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        max_entries: int = 64,
+        cache_dir: Optional[str] = None,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}.")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries: "OrderedDict[str, DescribeEntry]" = OrderedDict()
+        self._inflight: "Dict[str, asyncio.Task[Dict[str, Any]]]" = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    # -----------------------------------------------------------------
+    # Entry storage (by _key())
+    # -----------------------------------------------------------------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir or "", f"{key}.json")
+
+    def _load(self, key: str) -> Optional[DescribeEntry]:
+        """Return the entry from memory, falling back to the disk layer."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entry = DescribeEntry(data["describe"], float(data["validated_at"]))
+        except (OSError, ValueError, KeyError):
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: DescribeEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _persist(self, key: str, entry: DescribeEntry) -> None:
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._path(key) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"validated_at": entry.validated_at, "describe": entry.describe}, f
+                )
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            # The disk layer is an optimization; never fail a describe over it.
+            pass
+
+    def put(self, object_name: str, describe: Dict[str, Any]) -> None:
+        """Store a freshly fetched describe result."""
+        key = _key(object_name)
+        entry = DescribeEntry(describe, time.time())
+        self._remember(key, entry)
+        self._persist(key, entry)
+
+    def invalidate(self, object_name: Optional[str] = None) -> None:
+        """Drop one object (or everything) from memory and disk."""
+        keys = [_key(object_name)] if object_name else list(self._entries)
+        for key in keys:
+            self._entries.pop(key, None)
+            if self.cache_dir:
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+
+    def is_fresh(self, entry: DescribeEntry) -> bool:
+        return time.time() - entry.validated_at < self.ttl
+
+    # -----------------------------------------------------------------
+    # Read-through
+    # -----------------------------------------------------------------
+
+    def _apply(
+        self,
+        object_name: str,
+        entry: Optional[DescribeEntry],
+        fetched: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Record the outcome of a (conditional) fetch and return the describe."""
+        if fetched is None and entry is not None:
+            # 304 Not Modified: renew the existing entry.
+            self.revalidations += 1
+            entry.validated_at = time.time()
+            self._persist(_key(object_name), entry)
+            return entry.describe
+        if fetched is None:
+            raise ValueError(f"Describe for '{object_name}' returned no content.")
+        self.put(object_name, fetched)
+        return fetched
+
+    def _lookup(self, object_name: str, allow_stale: bool) -> tuple:
+        """(describe if it can be served from cache, else None; the cached entry)."""
+        entry = self._load(_key(object_name))
+        if entry is not None and (allow_stale or self.is_fresh(entry)):
+            self.hits += 1
+            return entry.describe, entry
+        return None, entry
+
+    def get_or_fetch(
+        self,
+        object_name: str,
+        fetch: DescribeFetcher,
+        allow_stale: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Return the describe for an object, fetching or revalidating as needed.
+        With allow_stale, any cached entry is returned without revalidation.
+        Raises ValueError if object_name is not a valid API name.
+        """
+        describe, entry = self._lookup(object_name, allow_stale)
+        if describe is not None:
+            return describe
+        self.misses += 1
+        ims = entry.if_modified_since if entry is not None else None
+        return self._apply(object_name, entry, fetch(object_name, ims))
+
+    async def aget_or_fetch(
+        self,
+        object_name: str,
+        fetch: AsyncDescribeFetcher,
+        allow_stale: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Async variant of get_or_fetch() for use with AsyncSalesforce.
+        Concurrent misses for the same object share one fetch.
+        """
+        describe, entry = self._lookup(object_name, allow_stale)
+        if describe is not None:
+            return describe
+        key = _key(object_name)
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            ims = entry.if_modified_since if entry is not None else None
+
+            async def fetch_and_apply() -> Dict[str, Any]:
+                return self._apply(object_name, entry, await fetch(object_name, ims))
+
+            task = asyncio.ensure_future(fetch_and_apply())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.hits += 1
+        # One caller giving up must not cancel the fetch the others wait on.
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return (
+            f"DescribeCache(entries={len(self._entries)}, ttl={self.ttl}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
@@ -15,10 +15,14 @@ from __future__ import annotations
 import datetime
 import os
 import sys
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
 from simple_salesforce import Salesforce
+from simple_salesforce.util import exception_handler
+
+from describe_cache import DescribeCache
+from http_transport import tuned_session
 
 load_dotenv()
 
@@ -31,6 +35,13 @@ ALL_OBJECTS = CUSTOM_OBJECTS + STANDARD_OBJECTS
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_PATH = os.path.join(SCRIPT_DIR, "..", "CLAUDE.md")
 
+# Describe cache shared with server.py through SF_DESCRIBE_CACHE_DIR
+DESCRIBE_CACHE = DescribeCache(
+    ttl=float(os.getenv("SF_DESCRIBE_CACHE_TTL", "3600")),
+    max_entries=int(os.getenv("SF_DESCRIBE_CACHE_SIZE", "64")),
+    cache_dir=os.getenv("SF_DESCRIBE_CACHE_DIR", "") or None,
+)
+
 
 def connect() -> Salesforce:
     """Create a Salesforce connection from environment variables.
@@ -41,19 +52,45 @@ def connect() -> Salesforce:
     """
     access_token = os.getenv("SF_ACCESS_TOKEN", "")
     instance_url = os.getenv("SF_INSTANCE_URL", "")
+    session = tuned_session(
+        pool_size=int(os.getenv("SF_MAX_CONNECTIONS", "20")),
+        connect_timeout=float(os.getenv("SF_HTTP_CONNECT_TIMEOUT", "10")),
+        read_timeout=float(os.getenv("SF_HTTP_READ_TIMEOUT", "60")),
+        keepalive_idle=int(os.getenv("SF_HTTP_KEEPALIVE", "120")),
+        gzip=os.getenv("SF_HTTP_GZIP", "true").lower() in ("1", "true", "yes"),
+    )
     if access_token and instance_url:
-        return Salesforce(instance_url=instance_url, session_id=access_token)
+        return Salesforce(instance_url=instance_url, session_id=access_token, session=session)
     return Salesforce(
         username=os.getenv("SF_USERNAME", ""),
         password=os.getenv("SF_PASSWORD", ""),
         security_token=os.getenv("SF_SECURITY_TOKEN", ""),
         domain=os.getenv("SF_DOMAIN", "login"),
+        session=session,
     )
 
 
 def describe_object(sf: Salesforce, object_name: str) -> Dict[str, Any]:
-    """Fetch the full describe result for a Salesforce object."""
-    return getattr(sf, object_name).describe()
+    """Fetch the full describe result for a Salesforce object.
+
+    Goes through DESCRIBE_CACHE; stale entries are revalidated with
+    If-Modified-Since rather than re-downloaded.
+    """
+
+    def fetch(name: str, if_modified_since: Optional[str]) -> Optional[Dict[str, Any]]:
+        headers = dict(sf.headers)
+        if if_modified_since:
+            headers["If-Modified-Since"] = if_modified_since
+        result = sf.session.get(
+            f"{sf.base_url}sobjects/{name}/describe/", headers=headers
+        )
+        if result.status_code == 304:
+            return None
+        if result.status_code >= 300:
+            exception_handler(result, name)
+        return result.json()
+
+    return DESCRIBE_CACHE.get_or_fetch(object_name, fetch)
 
 
 def format_field_table(fields: List[Dict[str, Any]]) -> List[str]:
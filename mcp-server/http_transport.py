@@ -0,0 +1,85 @@
+"""
+Tuned requests session for simple_salesforce clients.
+
+Salesforce(...) otherwise builds a stock requests.Session: a 10-connection
+pool, no timeouts (a stalled socket hangs the caller forever) and no TCP
+keep-alive probes, so idle pooled connections are silently dropped by
+proxies and the next call pays a fresh TLS handshake. tuned_session()
+returns a session to pass as Salesforce(session=...) with:
+
+- a connection pool sized for concurrent tool calls,
+- default connect/read timeouts for every request,
+- TCP keep-alive on pooled sockets,
+- explicit gzip negotiation, so large query responses transfer compressed.
+"""
+
+from __future__ import annotations
+
+import socket
+from typing import Any, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+def _keepalive_socket_options(idle: int) -> List[Tuple[int, int, int]]:
+    """TCP_NODELAY plus keep-alive probes after idle seconds (where supported)."""
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle))
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, idle // 4)))
+    return options
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets use TCP keep-alive."""
+
+    def __init__(self, keepalive_idle: int, **kwargs: Any) -> None:
+        self._socket_options = _keepalive_socket_options(keepalive_idle)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs["socket_options"] = self._socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+class TunedSession(requests.Session):
+    """requests.Session that applies a default timeout to every request."""
+
+    def __init__(self, timeout: Tuple[float, float]) -> None:
+        super().__init__()
+        self.default_timeout = timeout
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self.default_timeout)
+        return super().request(method, url, *args, **kwargs)
+
+
+def tuned_session(
+    pool_size: int = 20,
+    connect_timeout: float = 10.0,
+    read_timeout: float = 60.0,
+    keepalive_idle: int = 60,
+    gzip: bool = True,
+    proxies: Optional[dict] = None,
+) -> TunedSession:
+    """
+    Build a session for Salesforce(session=...).
+
+    Usage:
+        sf = Salesforce(instance_url=url, session_id=token, session=tuned_session())
+    """
+    session = TunedSession(timeout=(connect_timeout, read_timeout))
+    adapter = _KeepAliveAdapter(
+        keepalive_idle,
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept-Encoding"] = "gzip, deflate" if gzip else "identity"
+    if proxies:
+        session.proxies.update(proxies)
+    return session
@@ -0,0 +1,44 @@
+"""
+Deferred imports for heavy optional-at-startup modules.
+
+The MCP client spawns a fresh server process per session, and tools/list has
+to be answered before any tool needs pandas or simple_salesforce. LazyModule
+stands in for a module and imports it on first attribute access, so
+`pd = LazyModule("pandas")` keeps call sites (`pd.DataFrame(...)`) unchanged.
+"""
+
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule:
+    """
+    Proxy that imports the named module on first attribute access.
+
+    Usage:
+        pd = LazyModule("pandas")
+        df = pd.DataFrame(rows)    # pandas is imported here
+    """
+
+    def __init__(self, name: str) -> None:
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def load(self) -> ModuleType:
+        """Import (if needed) and return the real module."""
+        module: Optional[ModuleType] = self.__dict__["_module"]
+        if module is None:
+            # importlib's per-module locks make concurrent first use safe.
+            module = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"LazyModule({self.__dict__['_name']!r}, {state})"
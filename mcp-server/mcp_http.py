@@ -0,0 +1,109 @@
+"""
+Serving the MCP server over HTTP.
+
+Over stdio every client spawns its own server process, with its own
+Salesforce login, connection pool and caches. With the streamable HTTP
+transport (or the older SSE one), a single long-lived process serves all
+clients. Each client gets its own MCP session, while the org connections
+and caches in server.py are shared.
+
+The server holds Salesforce credentials, so it binds to 127.0.0.1 by
+default. When it has to be reachable from other machines, set an auth
+token: every request must then carry "Authorization: Bearer <token>".
+It refuses to listen on any other address without one.
+"""
+
+from __future__ import annotations
+
+import hmac
+import ipaddress
+import json
+from typing import Any, Awaitable, Callable, Dict, MutableMapping
+
+HTTP_TRANSPORTS = ("streamable-http", "sse")
+
+Scope = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def is_loopback(host: str) -> bool:
+    """True when host only accepts connections from this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def check_exposure(host: str, auth_token: str) -> None:
+    """Raise ValueError if host is reachable from other machines without an auth token."""
+    if not auth_token and not is_loopback(host):
+        raise ValueError(
+            f"Refusing to serve on {host!r} without SF_MCP_AUTH_TOKEN: the server "
+            f"holds Salesforce credentials. Set a token or bind to 127.0.0.1."
+        )
+
+
+class BearerTokenAuth:
+    """
+    ASGI middleware that rejects HTTP requests without the expected bearer
+    token. Written as plain ASGI so streamed (SSE) responses pass through
+    unbuffered.
+
+    Usage:
+        app = BearerTokenAuth(mcp.streamable_http_app(), token)
+    """
+
+    def __init__(self, app: Callable[[Scope, Receive, Send], Awaitable[None]], token: str) -> None:
+        self.app = app
+        self._expected = f"Bearer {token}".encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = dict(scope.get("headers") or [])
+            if not hmac.compare_digest(headers.get(b"authorization", b""), self._expected):
+                body = json.dumps({"error": "invalid or missing bearer token"}).encode()
+                await send({
+                    "type": "http.response.start",
+                    "status": 401,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"www-authenticate", b"Bearer"),
+                        (b"content-length", str(len(body)).encode()),
+                    ],
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)
+
+    def __repr__(self) -> str:
+        return f"BearerTokenAuth(app={self.app!r})"
+
+
+async def serve(mcp: Any, transport: str, auth_token: str = "") -> None:
+    """
+    Serve a FastMCP server over HTTP until the process is stopped.
+
+    Host, port and log level come from mcp.settings. Unlike mcp.run(), this
+    can put BearerTokenAuth in front of the app. Raises ValueError rather
+    than serve a non-loopback host without an auth token.
+    """
+    import uvicorn
+
+    check_exposure(mcp.settings.host, auth_token)
+    if transport not in HTTP_TRANSPORTS:
+        raise ValueError(
+            f"Unknown HTTP transport '{transport}'. Use one of: {', '.join(HTTP_TRANSPORTS)}."
+        )
+    app: Any = mcp.streamable_http_app() if transport == "streamable-http" else mcp.sse_app()
+    if auth_token:
+        app = BearerTokenAuth(app, auth_token)
+    config = uvicorn.Config(
+        app,
+        host=mcp.settings.host,
+        port=mcp.settings.port,
+        log_level=mcp.settings.log_level.lower(),
+    )
+    await uvicorn.Server(config).serve()
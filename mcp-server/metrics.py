@@ -0,0 +1,298 @@
+"""
+Per-tool and per-SOQL latency metrics.
+
+Each tool call gets a CallStats object held in a context variable (tasks
+spawned by the tool inherit it), which the lower layers add to as they
+work: sf_client records HTTP time, bytes and result pages, and the
+DataFrame helpers record construction time. When the call ends, every
+figure is observed into a per-tool histogram. Query helpers observe the
+same figures per SOQL statement, keyed by the statement with its literals
+replaced by "?" so that the number of series stays bounded.
+
+Histograms keep the last max_samples observations for p50/p95/p99 plus an
+all-time count and sum. ServerMetrics.to_prometheus() renders everything
+in the Prometheus text exposition format (as summaries).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import math
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_DATETIME_RE = re.compile(r"\b\d{4}-\d{2}-\d{2}(?:T[0-9:.]+(?:Z|[+-]\d{2}:?\d{2})?)?")
+_NUMBER_RE = re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class CallStats:
+    """Work done on behalf of one tool call or one SOQL statement."""
+
+    http_seconds: float = 0.0
+    http_requests: int = 0
+    bytes: int = 0
+    rows: int = 0
+    pages: int = 0
+    dataframe_seconds: float = 0.0
+    error: bool = False
+
+
+# Histogram name suffix and unit for each CallStats field that is observed.
+OBSERVED_FIELDS = {
+    "http_seconds": "HTTP time in seconds",
+    "http_requests": "HTTP requests sent",
+    "bytes": "Response bytes received",
+    "rows": "Records returned by Salesforce",
+    "pages": "Result pages fetched",
+    "dataframe_seconds": "DataFrame construction time in seconds",
+}
+
+_current_call: contextvars.ContextVar[Optional[CallStats]] = contextvars.ContextVar(
+    "current_call", default=None
+)
+
+
+def normalize_soql(soql: str, max_length: int = 300) -> str:
+    """Replace literals with ? and collapse whitespace, for use as a metric key."""
+    text = _STRING_LITERAL_RE.sub("?", soql)
+    text = _DATETIME_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return text if len(text) <= max_length else text[:max_length - 3] + "..."
+
+
+# ---------------------------------------------------------------------------
+# Recording hooks (no-ops outside a tool call)
+# ---------------------------------------------------------------------------
+
+
+def record_http(seconds: float, nbytes: int) -> None:
+    stats = _current_call.get()
+    if stats is not None:
+        stats.http_seconds += seconds
+        stats.http_requests += 1
+        stats.bytes += nbytes
+
+
+def record_page(rows: int) -> None:
+    stats = _current_call.get()
+    if stats is not None:
+        stats.pages += 1
+        stats.rows += rows
+
+
+def record_dataframe(seconds: float) -> None:
+    stats = _current_call.get()
+    if stats is not None:
+        stats.dataframe_seconds += seconds
+
+
+async def timed(iterator: AsyncIterator[T], stats: CallStats) -> AsyncIterator[T]:
+    """Yield from an async iterator, adding time spent waiting on it to stats."""
+    it = iterator.__aiter__()
+    while True:
+        start = time.perf_counter()
+        try:
+            item = await it.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            stats.http_seconds += time.perf_counter() - start
+        yield item
+
+
+# ---------------------------------------------------------------------------
+# Aggregation
+# ---------------------------------------------------------------------------
+
+
+class Histogram:
+    """Count, sum and a bounded window of recent samples for quantiles."""
+
+    def __init__(self, max_samples: int = 1024) -> None:
+        self.count = 0
+        self.total = 0.0
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self._samples.append(value)
+
+    def quantile(self, q: float) -> float:
+        """Nearest-rank quantile over the recent samples (nan when empty)."""
+        if not self._samples:
+            return math.nan
+        ordered = sorted(self._samples)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+
+class SeriesStats:
+    """Histograms for one tool or one statement."""
+
+    def __init__(self, max_samples: int) -> None:
+        self.seconds = Histogram(max_samples)
+        self.fields = {name: Histogram(max_samples) for name in OBSERVED_FIELDS}
+        self.errors = 0
+
+    def observe(self, seconds: float, stats: CallStats) -> None:
+        self.seconds.observe(seconds)
+        for name, histogram in self.fields.items():
+            histogram.observe(getattr(stats, name))
+        if stats.error:
+            self.errors += 1
+
+
+class ServerMetrics:
+    """
+    Registry of per-tool and per-statement histograms.
+
+    Usage:
+        metrics = ServerMetrics()
+        with metrics.tool_call("sf_query") as call:
+            ...                                  # lower layers record into call
+        metrics.observe_statement(soql, seconds, stats)
+        text = metrics.to_prometheus()
+    """
+
+    def __init__(self, max_samples: int = 1024, max_statements: int = 200) -> None:
+        self.max_samples = max_samples
+        self.max_statements = max_statements
+        self.started_at = time.time()
+        self.tools: Dict[str, SeriesStats] = {}
+        self.statements: "OrderedDict[str, SeriesStats]" = OrderedDict()
+
+    @contextlib.contextmanager
+    def tool_call(self, tool: str) -> Iterator[CallStats]:
+        """Collect stats for one tool call and observe them when it ends."""
+        stats = CallStats()
+        token = _current_call.set(stats)
+        start = time.perf_counter()
+        try:
+            yield stats
+        except BaseException:
+            stats.error = True
+            raise
+        finally:
+            _current_call.reset(token)
+            series = self.tools.get(tool)
+            if series is None:
+                series = self.tools[tool] = SeriesStats(self.max_samples)
+            series.observe(time.perf_counter() - start, stats)
+
+    @contextlib.contextmanager
+    def statement(self, soql: str) -> Iterator[None]:
+        """
+        Observe what the current call records inside the block as one
+        execution of soql. Not for blocks that run other queries
+        concurrently; use observe_statement() with explicit stats there.
+        """
+        call = _current_call.get() or CallStats()
+        before = replace(call)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            delta = CallStats(**{
+                name: getattr(call, name) - getattr(before, name) for name in OBSERVED_FIELDS
+            })
+            self.observe_statement(soql, time.perf_counter() - start, delta)
+
+    def observe_statement(self, soql: str, seconds: float, stats: CallStats) -> None:
+        """Record one execution of a SOQL statement."""
+        key = normalize_soql(soql)
+        series = self.statements.get(key)
+        if series is None:
+            series = self.statements[key] = SeriesStats(self.max_samples)
+            while len(self.statements) > self.max_statements:
+                self.statements.popitem(last=False)
+        else:
+            self.statements.move_to_end(key)
+        series.observe(seconds, stats)
+
+    # -----------------------------------------------------------------
+    # Export
+    # -----------------------------------------------------------------
+
+    def summary_rows(self, kind: str) -> List[Dict[str, Any]]:
+        """One dict per tool ("tools") or statement ("statements") for display."""
+        series_map = self.tools if kind == "tools" else self.statements
+        rows = []
+        for key, series in series_map.items():
+            row: Dict[str, Any] = {"calls": series.seconds.count, "errors": series.errors}
+            for q in QUANTILES:
+                row[f"p{int(q * 100)}_ms"] = round(series.seconds.quantile(q) * 1000, 1)
+            row["http_ms"] = round(series.fields["http_seconds"].mean * 1000, 1)
+            row["df_ms"] = round(series.fields["dataframe_seconds"].mean * 1000, 1)
+            row["rows"] = round(series.fields["rows"].mean, 1)
+            row["pages"] = round(series.fields["pages"].mean, 1)
+            row["kb"] = round(series.fields["bytes"].mean / 1024, 1)
+            row["total_s"] = round(series.seconds.total, 2)
+            rows.append({"key": key, **row})
+        return rows
+
+    def to_prometheus(self, prefix: str = "sf_mcp") -> str:
+        """Render all series in Prometheus text format."""
+        lines: List[str] = []
+        for kind, label, series_map in (
+            ("tool", "tool", self.tools),
+            ("statement", "soql", self.statements),
+        ):
+            metrics: List[Tuple[str, str, str]] = [("seconds", "seconds", "Wall time in seconds")]
+            metrics += [(name, name, help_text) for name, help_text in OBSERVED_FIELDS.items()]
+            for attr, suffix, help_text in metrics:
+                name = f"{prefix}_{kind}_{suffix}"
+                lines.append(f"# HELP {name} {help_text} per {kind}.")
+                lines.append(f"# TYPE {name} summary")
+                for key, series in series_map.items():
+                    histogram = series.seconds if attr == "seconds" else series.fields[attr]
+                    labels = f'{label}="{_escape_label(key)}"'
+                    for q in QUANTILES:
+                        lines.append(
+                            f'{name}{{{labels},quantile="{q}"}} {_fmt(histogram.quantile(q))}'
+                        )
+                    lines.append(f"{name}_sum{{{labels}}} {_fmt(histogram.total)}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+            name = f"{prefix}_{kind}_errors_total"
+            lines.append(f"# HELP {name} Calls that returned an error per {kind}.")
+            lines.append(f"# TYPE {name} counter")
+            for key, series in series_map.items():
+                lines.append(f'{name}{{{label}="{_escape_label(key)}"}} {series.errors}')
+        lines.append(f"# HELP {prefix}_start_time_seconds Server start time.")
+        lines.append(f"# TYPE {prefix}_start_time_seconds gauge")
+        lines.append(f"{prefix}_start_time_seconds {self.started_at:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Atomically write to_prometheus() to path (for node_exporter's textfile collector)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def __repr__(self) -> str:
+        return f"ServerMetrics(tools={len(self.tools)}, statements={len(self.statements)})"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt(value: float) -> str:
+    return "NaN" if math.isnan(value) else repr(float(value))
@@ -0,0 +1,177 @@
+"""
+Named Salesforce orgs served by one process.
+
+The unprefixed SF_* variables (SF_USERNAME, SF_ACCESS_TOKEN, ...) describe
+the default org, named by SF_DEFAULT_ORG ("default" if unset). SF_ORGS
+lists more orgs, each configured with SF_ORG_<NAME>_* variables:
+
+    SF_DEFAULT_ORG=prod
+    SF_ORGS=uat,dev
+    SF_ORG_UAT_USERNAME=me@example.com.uat
+    SF_ORG_UAT_DOMAIN=test
+    ...
+
+A listed org that is also the default reads its prefixed variables first
+and falls back to the unprefixed ones. Without unprefixed credentials the
+first SF_ORGS entry is the default.
+
+OrgRegistry creates each org's state (connection, caches, API accounting)
+on first use. It also tracks the org the current tool call targets, in a
+context variable, so helpers reach the right state without passing it
+around.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import os
+import re
+from dataclasses import dataclass, fields
+from typing import Callable, Dict, Generic, Iterator, List, Mapping, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_ORG_NAME_RE = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
+_current_org: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_org", default=None
+)
+
+
+@dataclass
+class OrgConfig:
+    """Credentials and per-org file locations of one Salesforce org."""
+
+    name: str
+    username: str = ""
+    password: str = ""
+    security_token: str = ""
+    domain: str = "login"
+    access_token: str = ""
+    instance_url: str = ""
+    describe_cache_dir: str = ""
+    replica_path: str = ""
+    record_file: str = ""
+    replay_file: str = ""
+
+    @classmethod
+    def from_env(cls, name: str, prefixes: Tuple[str, ...], environ: Mapping[str, str]) -> OrgConfig:
+        """Read each field from the first prefix that sets it (e.g. SF_ORG_UAT_DOMAIN)."""
+        values: Dict[str, str] = {}
+        for field in fields(cls):
+            if field.name == "name":
+                continue
+            for prefix in prefixes:
+                value = environ.get(f"{prefix}{field.name.upper()}", "")
+                if value:
+                    values[field.name] = value
+                    break
+        return cls(name=name, **values)
+
+    @property
+    def has_credentials(self) -> bool:
+        return bool((self.access_token and self.instance_url) or self.username or self.replay_file)
+
+    def __repr__(self) -> str:
+        # Never print secrets.
+        return f"OrgConfig(name={self.name!r}, domain={self.domain!r}, username={self.username!r})"
+
+
+def load_org_configs(environ: Mapping[str, str] = os.environ) -> Tuple[Dict[str, OrgConfig], str]:
+    """
+    Read the configured orgs from the environment.
+
+    Returns (configs by lower-case name, default org name). Raises
+    ValueError for an org name that cannot be used in variable names.
+    """
+    listed = [n.strip().lower() for n in environ.get("SF_ORGS", "").split(",") if n.strip()]
+    for name in listed:
+        if not _ORG_NAME_RE.match(name):
+            raise ValueError(
+                f"Invalid org name '{name}' in SF_ORGS: use letters, digits and underscores."
+            )
+
+    unprefixed = OrgConfig.from_env("", ("SF_",), environ)
+    default = environ.get("SF_DEFAULT_ORG", "").strip().lower()
+    if not default:
+        default = "default" if unprefixed.has_credentials or not listed else listed[0]
+
+    configs: Dict[str, OrgConfig] = {}
+    if default not in listed:
+        unprefixed.name = default
+        configs[default] = unprefixed
+    for name in listed:
+        prefixes: Tuple[str, ...] = (f"SF_ORG_{name.upper()}_",)
+        if name == default:
+            prefixes += ("SF_",)
+        configs[name] = OrgConfig.from_env(name, prefixes, environ)
+    return configs, default
+
+
+class OrgRegistry(Generic[T]):
+    """
+    Per-org state, created on first use, and the org of the current call.
+
+    Usage:
+        configs, default = load_org_configs()
+        registry = OrgRegistry(configs, default, factory=OrgContext)
+        with registry.use("uat"):
+            registry.current()         # the uat OrgContext
+        registry.current()             # the default org's
+    """
+
+    def __init__(self, configs: Dict[str, OrgConfig], default: str, factory: Callable[[OrgConfig], T]) -> None:
+        if default not in configs:
+            raise ValueError(f"Default org '{default}' is not configured.")
+        self.configs = configs
+        self.default = default
+        self._factory = factory
+        self._states: Dict[str, T] = {}
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.configs)
+
+    def resolve(self, name: Optional[str]) -> str:
+        """The configured name for name (default org if empty); ValueError if unknown."""
+        if not name:
+            return self.default
+        key = name.strip().lower()
+        if key not in self.configs:
+            raise ValueError(
+                f"Unknown org '{name}'. Configured orgs: {', '.join(self.configs)}."
+            )
+        return key
+
+    def get(self, name: Optional[str] = None) -> T:
+        """The state of an org (default org if name is empty), created on first use."""
+        key = self.resolve(name)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = self._factory(self.configs[key])
+        return state
+
+    def current(self) -> T:
+        """The state of the org the current tool call targets."""
+        return self.get(_current_org.get())
+
+    @contextlib.contextmanager
+    def use(self, name: Optional[str]) -> Iterator[T]:
+        """Target an org for the duration of the block (and tasks it starts)."""
+        key = self.resolve(name)
+        token = _current_org.set(key)
+        try:
+            yield self.get(key)
+        finally:
+            _current_org.reset(token)
+
+    def active(self) -> List[T]:
+        """States of the orgs used so far."""
+        return list(self._states.values())
+
+    def __len__(self) -> int:
+        return len(self.configs)
+
+    def __repr__(self) -> str:
+        return f"OrgRegistry(orgs={self.names}, default={self.default!r}, active={len(self._states)})"
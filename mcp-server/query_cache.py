@@ -0,0 +1,219 @@
+"""
+Short-lived cache of query results with write invalidation.
+
+Agents often re-run the same query within a minute (a work item list, the
+same ad-hoc sf_query). Results are cached for a short TTL, keyed by a
+canonical form of the SOQL. Two statements share an entry when they
+differ only in:
+- whitespace
+- keyword/identifier case
+- SELECT field order, unless the query selects an unaliased expression
+  such as COUNT(Id); Salesforce names those columns by position (expr0)
+- the order of AND-ed conditions
+String literals keep their case. Statements that use relative date
+literals (TODAY, LAST_N_DAYS:7, ...) also key on the current date.
+
+Every entry is tagged with the objects it reads: the FROM object, plus
+the parents reached through the custom relationships in
+RELATIONSHIP_TARGETS (Project__r becomes Project__c). A write invalidates
+its objects. Results of queries with child subqueries, or with custom
+relationships whose target is not known, are not cached. The cache is LRU
+with a byte budget, estimated from the response sizes.
+
+A query that was already running when one of its objects was invalidated
+is not stored, since it may have read rows from before the write.
+"""
+
+from __future__ import annotations
+
+import datetime
+import re
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from soql_builder import SOQL_DATE_LITERAL_PREFIXES, SOQL_DATE_LITERALS, parse_soql
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_PUNCTUATION_SPACE_RE = re.compile(r"\s*([,=<>!])\s*")
+_FROM_RE = re.compile(r"\bFROM\s+(\w+)", re.IGNORECASE)
+_RELATIONSHIP_RE = re.compile(r"\b(\w+)__r\.", re.IGNORECASE)
+# Parent objects reached through the org's custom relationship fields. A
+# relationship name says nothing reliable about its target (Assigned_To__r
+# is a User), so only these are mapped.
+RELATIONSHIP_TARGETS = {
+    "project__r": "project__c",
+    "work_item__r": "work_item__c",
+    "assigned_to__r": "user",
+}
+_RELATIVE_DATE_RE = re.compile(
+    r"\b(?:" + "|".join(sorted(SOQL_DATE_LITERALS, key=len, reverse=True))
+    + r"|(?:" + "|".join(p.rstrip(":") for p in SOQL_DATE_LITERAL_PREFIXES) + r"):\d+)\b"
+)
+
+
+def _fold(soql: str) -> str:
+    """Upper-case and collapse whitespace outside string literals."""
+    def fold(text: str) -> str:
+        return _PUNCTUATION_SPACE_RE.sub(r"\1", " ".join(text.upper().split()))
+
+    pieces: List[str] = []
+    last = 0
+    for match in _STRING_LITERAL_RE.finditer(soql):
+        pieces.append(fold(soql[last:match.start()]))
+        pieces.append(match.group(0))
+        last = match.end()
+    pieces.append(fold(soql[last:]))
+    return " ".join(p for p in pieces if p)
+
+
+def canonical_soql(soql: str, today: Optional[datetime.date] = None) -> str:
+    """
+    Cache key for a SOQL statement.
+
+    Usage:
+        canonical_soql("select Name, Id from Work_Item__c where Due_Date__c = TODAY")
+        # 'SELECT ID, NAME FROM WORK_ITEM__C WHERE DUE_DATE__C=TODAY @2026-10-16'
+    """
+    text = _fold(soql)
+    try:
+        key = parse_soql(text).normalized().build()
+    except ValueError:
+        key = text
+    # Dates inside string literals were kept verbatim; only bare literals count.
+    if _RELATIVE_DATE_RE.search(_STRING_LITERAL_RE.sub("''", key)):
+        key += f" @{(today or datetime.date.today()).isoformat()}"
+    return key
+
+
+def objects_read(soql: str) -> FrozenSet[str]:
+    """
+    The FROM object(s) and the custom parent objects a query reads, lower-cased.
+    A custom relationship missing from RELATIONSHIP_TARGETS is returned
+    under its own name (e.g. "parent_project__r").
+    """
+    text = _STRING_LITERAL_RE.sub("''", soql)
+    objects = {m.group(1).lower() for m in _FROM_RE.finditer(text)}
+    for m in _RELATIONSHIP_RE.finditer(text):
+        relationship = f"{m.group(1).lower()}__r"
+        objects.add(RELATIONSHIP_TARGETS.get(relationship, relationship))
+    return frozenset(objects)
+
+
+@dataclass
+class CachedResult:
+    """The pages of one query result and its bookkeeping."""
+
+    pages: List[List[Dict[str, Any]]]
+    objects: FrozenSet[str]
+    nbytes: int
+    expires_at: float
+
+
+class QueryResultCache:
+    """
+    TTL + LRU cache of query result pages, bounded by an estimated byte size.
+
+    Usage:
+        cache = QueryResultCache(ttl=60, max_bytes=32 * 1024 * 1024)
+        key = cache.key(soql)
+        entry = cache.get(key)
+        if entry is None:
+            token = cache.begin(soql)
+            pages = ...run the query...
+            cache.put(key, pages, nbytes, token)
+        cache.invalidate("Time_Entry__c", "Work_Item__c")
+    """
+
+    def __init__(self, ttl: float = 60.0, max_bytes: int = 32 * 1024 * 1024) -> None:
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._generations: Dict[str, int] = defaultdict(int)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_bytes > 0
+
+    @property
+    def max_entry_bytes(self) -> int:
+        """Larger results are not cached, so one query cannot flush the rest."""
+        return self.max_bytes // 4
+
+    def key(self, soql: str) -> str:
+        return canonical_soql(soql)
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """The cached result for key, or None."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        if entry is not None:
+            self._drop(key)
+        self.misses += 1
+        return None
+
+    def begin(self, soql: str) -> Tuple[Tuple[str, int], ...]:
+        """Snapshot the generations of the objects soql reads; pass to put()."""
+        return tuple((obj, self._generations[obj]) for obj in sorted(objects_read(soql)))
+
+    def put(
+        self,
+        key: str,
+        pages: List[List[Dict[str, Any]]],
+        nbytes: int,
+        token: Tuple[Tuple[str, int], ...],
+    ) -> bool:
+        """Store a complete result unless it is too large or went stale."""
+        if not self.enabled or nbytes > self.max_entry_bytes:
+            return False
+        # A child subquery (FROM Time_Entries__r) or an unknown parent
+        # relationship reads an object that cannot be named without a describe.
+        if any(obj.endswith("__r") for obj, _ in token):
+            return False
+        if any(self._generations[obj] != generation for obj, generation in token):
+            return False
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = CachedResult(
+            pages=pages,
+            objects=frozenset(obj for obj, _ in token),
+            nbytes=nbytes,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+        return True
+
+    def invalidate(self, *objects: str) -> int:
+        """Drop every entry that reads any of objects; returns entries dropped."""
+        names = {o.lower() for o in objects}
+        for name in names:
+            self._generations[name] += 1
+        stale = [k for k, e in self._entries.items() if e.objects & names]
+        for key in stale:
+            self._drop(key)
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nbytes = 0
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.nbytes -= entry.nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"QueryResultCache(entries={len(self._entries)}, bytes={self.nbytes})"
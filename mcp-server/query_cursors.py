@@ -0,0 +1,132 @@
+"""
+Server-side cursors for paging through large query results.
+
+sf_query only shows one page of rows, and OFFSET stops at 2000. A cursor
+keeps what is needed to continue a query without re-running it:
+
+- the unread remainder of the last Salesforce batch (at most one batch,
+  normally 2000 records), and
+- Salesforce's nextRecordsUrl for the batches after it.
+
+Cursors expire after a TTL of inactivity and the store holds at most
+max_cursors of them (least recently used are evicted first), so memory is
+bounded by roughly max_cursors x one Salesforce batch. Keep the TTL below
+Salesforce's own ~15 minute query-locator timeout.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class QueryCursor:
+    """Paging state for one open query."""
+
+    cursor_id: str
+    soql: str
+    total_size: int
+    buffer: List[Dict[str, Any]]
+    next_records_url: Optional[str]
+    expires_at: float
+    served: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    @property
+    def exhausted(self) -> bool:
+        return not self.buffer and not self.next_records_url
+
+
+@dataclass
+class CursorPage:
+    """Rows returned by one fetch, with their 1-based position in the result."""
+
+    rows: List[Dict[str, Any]]
+    first_row: int
+    last_row: int
+    exhausted: bool
+
+
+class CursorStore:
+    """
+    TTL + LRU store of open query cursors.
+
+    Usage:
+        store = CursorStore(ttl=600, max_cursors=32)
+        cursor = await store.open(sf, soql)
+        page = await store.fetch(sf, cursor, 200)
+        cursor = store.get(cursor.cursor_id)     # later; None once expired
+    """
+
+    def __init__(self, ttl: float = 600.0, max_cursors: int = 32) -> None:
+        if max_cursors < 1:
+            raise ValueError(f"max_cursors must be at least 1, got {max_cursors}.")
+        self.ttl = ttl
+        self.max_cursors = max_cursors
+        self._cursors: "OrderedDict[str, QueryCursor]" = OrderedDict()
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        for cursor_id in [c for c, cur in self._cursors.items() if cur.expires_at <= now]:
+            del self._cursors[cursor_id]
+
+    async def open(self, sf: Any, soql: str) -> QueryCursor:
+        """Run a query and keep its first batch as a new cursor."""
+        result = await sf.query(soql)
+        self._purge_expired()
+        cursor = QueryCursor(
+            cursor_id=secrets.token_urlsafe(8),
+            soql=soql,
+            total_size=result.get("totalSize", 0),
+            buffer=list(result.get("records", [])),
+            next_records_url=result.get("nextRecordsUrl"),
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self._cursors[cursor.cursor_id] = cursor
+        while len(self._cursors) > self.max_cursors:
+            self._cursors.popitem(last=False)
+        return cursor
+
+    def get(self, cursor_id: str) -> Optional[QueryCursor]:
+        """Return a live cursor, or None if it is unknown or has expired."""
+        self._purge_expired()
+        cursor = self._cursors.get(cursor_id)
+        if cursor is not None:
+            self._cursors.move_to_end(cursor_id)
+        return cursor
+
+    async def fetch(self, sf: Any, cursor: QueryCursor, n: int) -> CursorPage:
+        """
+        Return the next n records, pulling further Salesforce batches only
+        when the buffer runs short. Exhausted cursors are closed.
+        """
+        async with cursor.lock:
+            first_row = cursor.served + 1
+            while len(cursor.buffer) < n and cursor.next_records_url:
+                result = await sf.query_more(cursor.next_records_url)
+                cursor.buffer.extend(result.get("records", []))
+                cursor.next_records_url = result.get("nextRecordsUrl")
+            rows = cursor.buffer[:n]
+            del cursor.buffer[:n]
+            cursor.served += len(rows)
+            cursor.expires_at = time.monotonic() + self.ttl
+            page = CursorPage(rows, first_row, cursor.served, cursor.exhausted)
+        if page.exhausted:
+            self.close(cursor.cursor_id)
+        return page
+
+    def close(self, cursor_id: str) -> None:
+        """Drop a cursor and its buffered rows."""
+        self._cursors.pop(cursor_id, None)
+
+    def __len__(self) -> int:
+        self._purge_expired()
+        return len(self._cursors)
+
+    def __repr__(self) -> str:
+        return f"CursorStore(open={len(self._cursors)}, ttl={self.ttl})"
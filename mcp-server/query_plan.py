@@ -0,0 +1,177 @@
+"""
+Query-plan preflight for ad-hoc SOQL.
+
+sf_query and sf_aggregate run whatever SOQL the caller writes, and a filter
+on an unindexed field makes Salesforce scan the whole table, which on large
+objects such as Time_Entry__c is slow and can time out. The REST explain
+resource (query/?explain=...) returns the optimizer's candidate plans
+without running the query, cheapest first; the leading plan is the one
+Salesforce would use.
+
+QueryPreflight explains a query before it runs and flags it when the
+leading plan is a TableScan over an object with at least large_cardinality
+records. Plans are cached by query shape (literals replaced by "?", see
+metrics.normalize_soql), so repeated queries that differ only in their
+values cost one explain call per TTL.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics import normalize_soql
+
+PREFLIGHT_MODES = ("off", "warn", "refuse")
+
+TABLE_SCAN = "TableScan"
+
+# Standard fields Salesforce indexes on every object.
+STANDARD_INDEXED_FIELDS = ("Id", "Name", "OwnerId", "CreatedDate", "SystemModstamp", "RecordTypeId")
+
+
+@dataclass
+class QueryPlan:
+    """One candidate plan from the explain resource."""
+
+    leading_operation: str
+    cardinality: int
+    sobject_cardinality: int
+    sobject_type: str
+    relative_cost: float
+    fields: List[str] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, plan: Dict[str, Any]) -> "QueryPlan":
+        notes = []
+        for note in plan.get("notes", []):
+            text = note.get("description", "")
+            if note.get("fields"):
+                text += f" ({', '.join(note['fields'])})"
+            notes.append(text)
+        return cls(
+            leading_operation=plan.get("leadingOperationType", ""),
+            cardinality=int(plan.get("cardinality", 0)),
+            sobject_cardinality=int(plan.get("sobjectCardinality", 0)),
+            sobject_type=plan.get("sobjectType", ""),
+            relative_cost=float(plan.get("relativeCost", 0.0)),
+            fields=list(plan.get("fields", [])),
+            notes=notes,
+        )
+
+
+def indexed_fields(describe: Dict[str, Any]) -> List[str]:
+    """
+    Fields of an object that are likely indexed: the standard indexed
+    fields, lookups, and unique or external ID fields.
+    """
+    names = []
+    for f in describe.get("fields", []):
+        if (
+            f["name"] in STANDARD_INDEXED_FIELDS
+            or f.get("type") == "reference"
+            or f.get("externalId")
+            or f.get("unique")
+        ):
+            names.append(f["name"])
+    return names
+
+
+class QueryPreflight:
+    """
+    Explains queries before they run and flags non-selective ones.
+
+    Usage:
+        preflight = QueryPreflight(mode="warn", large_cardinality=100000)
+        plan = await preflight.check(sf, soql)    # None if selective / off
+        if plan is not None:
+            message = preflight.describe_problem(plan, indexed_fields(desc))
+    """
+
+    def __init__(
+        self,
+        mode: str = "off",
+        large_cardinality: int = 100000,
+        ttl: float = 3600.0,
+        max_entries: int = 256,
+    ) -> None:
+        if mode not in PREFLIGHT_MODES:
+            raise ValueError(
+                f"Invalid preflight mode '{mode}'. Valid options: {', '.join(PREFLIGHT_MODES)}"
+            )
+        self.mode = mode
+        self.large_cardinality = large_cardinality
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._plans: "OrderedDict[str, Tuple[Optional[QueryPlan], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.flagged = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def refuses(self) -> bool:
+        return self.mode == "refuse"
+
+    async def leading_plan(self, sf: Any, soql: str) -> Optional[QueryPlan]:
+        """Return the plan Salesforce would use for soql (cached by shape)."""
+        key = normalize_soql(soql, max_length=10000)
+        cached = self._plans.get(key)
+        if cached is not None and cached[1] > time.monotonic():
+            self._plans.move_to_end(key)
+            self.hits += 1
+            return cached[0]
+        self.misses += 1
+        result = await sf.explain(soql)
+        plans = [QueryPlan.from_json(p) for p in result.get("plans", [])]
+        plan = plans[0] if plans else None
+        self._plans[key] = (plan, time.monotonic() + self.ttl)
+        self._plans.move_to_end(key)
+        while len(self._plans) > self.max_entries:
+            self._plans.popitem(last=False)
+        return plan
+
+    def is_non_selective(self, plan: Optional[QueryPlan]) -> bool:
+        return (
+            plan is not None
+            and plan.leading_operation == TABLE_SCAN
+            and plan.sobject_cardinality >= self.large_cardinality
+        )
+
+    async def check(self, sf: Any, soql: str) -> Optional[QueryPlan]:
+        """Return the leading plan if it is a large table scan, else None."""
+        if not self.enabled:
+            return None
+        plan = await self.leading_plan(sf, soql)
+        if not self.is_non_selective(plan):
+            return None
+        self.flagged += 1
+        return plan
+
+    @staticmethod
+    def describe_problem(plan: QueryPlan, indexed: Optional[List[str]] = None) -> str:
+        """Explain why a plan was flagged and what to filter on instead."""
+        message = (
+            f"Non-selective query: Salesforce would scan all "
+            f"{plan.sobject_cardinality:,} {plan.sobject_type} records "
+            f"(relative cost {plan.relative_cost:.2f})."
+        )
+        if plan.notes:
+            message += " Optimizer notes: " + "; ".join(plan.notes) + "."
+        if indexed:
+            message += f" Filter on an indexed field instead, e.g. {', '.join(indexed)}."
+        else:
+            message += " Filter on an indexed field (Id, Name, a lookup, CreatedDate) instead."
+        return message
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def __repr__(self) -> str:
+        return f"QueryPreflight(mode={self.mode!r}, plans={len(self._plans)})"
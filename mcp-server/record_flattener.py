@@ -0,0 +1,204 @@
+"""
+Schema-driven flattening of Salesforce query records into columns.
+
+Query results nest parent relationships as dicts (Work_Item__r ->
+Project__r -> Name) and child subqueries as {"records": [...]} blocks.
+RecordFlattener reads the SELECT list of a query once, turns each selected
+field into a column path, and then extracts every column for all records in
+a single pass, producing a dict of lists that pandas can adopt directly.
+
+Queries whose shape cannot be known from the SELECT list (aggregates,
+TYPEOF, FIELDS(...)) fall back to flatten_relationship_fields(), which walks
+each record recursively.
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+from typing import Any, Dict, List, Tuple
+
+from soql_builder import parse_soql
+
+# Functions whose presence makes a result an AggregateResult (flat, keyed by
+# alias or exprN) rather than an sObject record.
+AGGREGATE_FUNCTIONS = {
+    "AVG", "COUNT", "COUNT_DISTINCT", "MIN", "MAX", "SUM",
+    "CALENDAR_MONTH", "CALENDAR_QUARTER", "CALENDAR_YEAR", "DAY_IN_MONTH",
+    "DAY_IN_WEEK", "DAY_IN_YEAR", "DAY_ONLY", "FISCAL_MONTH",
+    "FISCAL_QUARTER", "FISCAL_YEAR", "HOUR_IN_DAY", "WEEK_IN_MONTH",
+    "WEEK_IN_YEAR", "GROUPING",
+}
+
+_FUNCTION_RE = re.compile(r"^(\w+)\s*\((.*)\)\s*(\w+)?$", re.DOTALL)
+
+
+def flatten_relationship_fields(
+    records: List[Dict[str, Any]],
+    parent_key: str = "",
+) -> List[Dict[str, Any]]:
+    """
+    Flatten nested relationship objects in Salesforce query results.
+
+    Parent relationships are flattened to any depth and child subquery
+    results become lists of flattened child records.
+
+    Example: {"Work_Item__r": {"Project__r": {"Name": "Alpha"}}} becomes
+             {"Work_Item__r.Project__r.Name": "Alpha"}
+    """
+    flat_records: List[Dict[str, Any]] = []
+    for record in records:
+        flat: Dict[str, Any] = {}
+        _flatten_into(flat, record, parent_key)
+        flat_records.append(flat)
+    return flat_records
+
+
+def _flatten_into(flat: Dict[str, Any], record: Dict[str, Any], prefix: str) -> None:
+    for key, value in record.items():
+        if key == "attributes":
+            continue
+        full_key = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict) and "records" in value and "totalSize" in value:
+            flat[full_key] = flatten_relationship_fields(value["records"])
+        elif isinstance(value, dict):
+            _flatten_into(flat, value, full_key)
+        else:
+            flat[full_key] = value
+
+
+class RecordFlattener:
+    """
+    Column extractor compiled from a query's SELECT list.
+
+    Usage:
+        flattener = RecordFlattener.for_query(soql)
+        columns = flattener.to_columns(records)   # {column: [values...]}
+        df = pd.DataFrame(columns)
+    """
+
+    def __init__(
+        self,
+        paths: List[Tuple[str, ...]],
+        children: Dict[str, "RecordFlattener"],
+        dynamic: bool = False,
+    ) -> None:
+        # paths: one tuple of key segments per column, as written in the query
+        self.paths = paths
+        self.children = children
+        self.dynamic = dynamic
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def for_query(soql: str) -> "RecordFlattener":
+        """Compile (and memoize) the flattener for a SOQL string."""
+        try:
+            query = parse_soql(soql)
+        except ValueError:
+            return RecordFlattener([], {}, dynamic=True)
+        if query.group_by_fields:
+            return RecordFlattener([], {}, dynamic=True)
+
+        paths: List[Tuple[str, ...]] = []
+        children: Dict[str, RecordFlattener] = {}
+        for item in query.select_fields:
+            if item.startswith("("):
+                inner = item[1:-1]
+                rel_name = (parse_soql(inner).sobject or "").split(" ")[0]
+                children[rel_name.lower()] = RecordFlattener.for_query(inner)
+                paths.append((rel_name,))
+                continue
+            upper = item.upper()
+            if upper.startswith("TYPEOF") or upper.startswith("FIELDS("):
+                return RecordFlattener([], {}, dynamic=True)
+            match = _FUNCTION_RE.match(item)
+            if match:
+                func, arg, alias = match.groups()
+                if func.upper() in AGGREGATE_FUNCTIONS:
+                    return RecordFlattener([], {}, dynamic=True)
+                # toLabel(), FORMAT(), convertCurrency() keep the field's key
+                # unless aliased.
+                paths.append((alias,) if alias else tuple(arg.strip().split(".")))
+                continue
+            paths.append(tuple(item.split()[0].split(".")))
+        return RecordFlattener(paths, children)
+
+    @staticmethod
+    def _canonical_path(records: List[Dict[str, Any]], path: Tuple[str, ...]) -> Tuple[str, ...]:
+        """
+        Match a path as written in SOQL (any case) to the keys Salesforce
+        returned, using the first record where each level is populated.
+        """
+        canon = list(path)
+        resolved = 0
+        for record in records:
+            node: Any = record
+            for depth, seg in enumerate(canon):
+                if not isinstance(node, dict):
+                    break
+                if seg not in node:
+                    lowered = seg.lower()
+                    seg = next((k for k in node if k.lower() == lowered), seg)
+                    canon[depth] = seg
+                resolved = max(resolved, depth + 1)
+                node = node.get(seg)
+            if resolved == len(canon):
+                break
+        return tuple(canon)
+
+    def to_columns(self, records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """Extract every selected column for all records in one pass each."""
+        if self.dynamic:
+            flat = flatten_relationship_fields(records)
+            columns: Dict[str, List[Any]] = {}
+            for i, rec in enumerate(flat):
+                for key, value in rec.items():
+                    if key not in columns:
+                        columns[key] = [None] * i
+                    columns[key].append(value)
+                for col in columns.values():
+                    if len(col) <= i:
+                        col.append(None)
+            return columns
+
+        columns = {}
+        for path in self.paths:
+            path = self._canonical_path(records, path)
+            name = ".".join(path)
+            if len(path) == 1:
+                key = path[0]
+                values = [rec.get(key) for rec in records]
+            elif len(path) == 2:
+                rel, key = path
+                values = [
+                    parent.get(key) if (parent := rec.get(rel)) is not None else None
+                    for rec in records
+                ]
+            else:
+                values = []
+                for rec in records:
+                    node: Any = rec
+                    for seg in path:
+                        if node is None:
+                            break
+                        node = node.get(seg)
+                    values.append(node)
+            child = self.children.get(path[0].lower()) if len(path) == 1 else None
+            if child is not None:
+                values = [
+                    child.to_records(v.get("records", [])) if isinstance(v, dict) else None
+                    for v in values
+                ]
+            columns[name] = values
+        return columns
+
+    def to_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Row-oriented view of to_columns() (used for child subqueries)."""
+        columns = self.to_columns(records)
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+    def __repr__(self) -> str:
+        if self.dynamic:
+            return "RecordFlattener(dynamic)"
+        return f"RecordFlattener(columns={['.'.join(p) for p in self.paths]})"
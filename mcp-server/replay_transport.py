@@ -0,0 +1,228 @@
+"""
+Record/replay of Salesforce REST traffic for offline runs.
+
+Both classes are httpx transports that sit beneath AsyncSalesforce:
+
+- RecordingTransport forwards every request to the real transport and
+  appends the exchange to a fixture file (JSON Lines, gzip-compressed when
+  the name ends in .gz). Only the path, query, request body, status, a few
+  response headers, the decoded response body and the elapsed time are
+  kept. The session token is never written.
+- ReplayTransport answers from such a file without any network access.
+
+Requests are matched on method, path, and query/body with SOQL normalized
+(whitespace collapsed). When nothing matches exactly, the request's
+shape, with literals in SOQL replaced by "?", is tried next. That way a
+query built around today's date still finds its recording on a later day.
+Identical requests recorded several times are replayed in recorded order,
+then the last response is repeated. A request with no recording raises
+ReplayMiss.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import time
+from collections import defaultdict
+from typing import IO, Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httpx
+
+from metrics import normalize_soql
+
+# Response headers worth keeping; everything else is transport detail.
+KEPT_HEADERS = ("content-type", "sforce-limit-info", "retry-after", "last-modified")
+
+# Query parameters that carry SOQL.
+_SOQL_PARAMS = ("q", "explain")
+
+# Headers that no longer apply once the body has been decoded.
+_ENCODING_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class ReplayMiss(Exception):
+    """Raised when a replayed request has no recording in the fixture."""
+
+
+def _open_fixture(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _canonical_soql(soql: str, shape: bool) -> str:
+    return normalize_soql(soql, max_length=100000) if shape else " ".join(soql.split())
+
+
+def _canonical_url(url: str, shape: bool) -> str:
+    """Path plus sorted query string, with SOQL parameters normalized."""
+    split = urlsplit(url)
+    params = sorted(
+        (k, _canonical_soql(v, shape) if k in _SOQL_PARAMS else v)
+        for k, v in parse_qsl(split.query, keep_blank_values=True)
+    )
+    return f"{split.path}?{urlencode(params)}" if params else split.path
+
+
+def _canonical_body(body: bytes, shape: bool) -> str:
+    """Request body as sorted JSON; composite and batch subrequest URLs are normalized."""
+    if not body:
+        return ""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body.decode("utf-8", "replace")
+    subrequests = next(
+        (k for k in ("batchRequests", "compositeRequest") if isinstance(data, dict) and k in data),
+        None,
+    )
+    if subrequests is not None:
+        data = dict(data, **{subrequests: [
+            dict(sub, url=_canonical_url(sub.get("url", ""), shape))
+            for sub in data[subrequests]
+        ]})
+    elif shape:
+        # sObject writes fall back to matching on method and path alone.
+        return ""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"))
+
+
+def request_keys(method: str, url: str, body: bytes) -> Tuple[str, str]:
+    """(exact key, shape key) for a request."""
+    return tuple(  # type: ignore[return-value]
+        f"{method} {_canonical_url(url, shape)} {_canonical_body(body, shape)}".rstrip()
+        for shape in (False, True)
+    )
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Pass requests through to another transport and record each exchange.
+
+    Usage:
+        transport = RecordingTransport(httpx.AsyncHTTPTransport(), "org.jsonl.gz")
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, path: str) -> None:
+        self.inner = inner
+        self.path = path
+        self.recorded = 0
+        self._file = _open_fixture(path, "a")
+        self._lock = asyncio.Lock()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        # Read through a client-side Response so the body comes back decoded.
+        decoded = httpx.Response(
+            response.status_code, headers=response.headers, stream=response.stream
+        )
+        content = await decoded.aread()
+        elapsed = time.perf_counter() - start
+        await decoded.aclose()
+
+        exact, shape = request_keys(request.method, str(request.url), body)
+        entry: Dict[str, Any] = {
+            "key": exact,
+            "shape": shape,
+            "status": response.status_code,
+            "headers": {
+                k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS
+            },
+            "elapsed_ms": round(elapsed * 1000, 2),
+        }
+        try:
+            entry["body"] = json.loads(content) if content else None
+        except ValueError:
+            entry["text"] = content.decode("utf-8", "replace")
+        async with self._lock:
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._file.flush()
+            self.recorded += 1
+
+        headers = [
+            (k, v) for k, v in response.headers.multi_items()
+            if k.lower() not in _ENCODING_HEADERS
+        ]
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=content,
+            request=request,
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        self._file.close()
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serve recorded exchanges from a fixture file, with no network access.
+
+    With simulate_latency, each response is delayed by its recorded
+    elapsed time; otherwise responses are immediate.
+
+    Usage:
+        transport = ReplayTransport("org.jsonl.gz")
+    """
+
+    def __init__(self, path: str, simulate_latency: bool = False) -> None:
+        self.path = path
+        self.simulate_latency = simulate_latency
+        self.hits = 0
+        self.shape_hits = 0
+        self._exact: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._shape: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._served: Dict[Tuple[str, str], int] = defaultdict(int)
+        with _open_fixture(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._exact[entry["key"]].append(entry)
+                    self._shape[entry["shape"]].append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._exact.values())
+
+    def _next(self, table: str, key: str, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        served = self._served[(table, key)]
+        self._served[(table, key)] = served + 1
+        return entries[min(served, len(entries) - 1)]
+
+    def lookup(self, method: str, url: str, body: bytes) -> Optional[Dict[str, Any]]:
+        """The recorded exchange for a request, or None."""
+        exact, shape = request_keys(method, url, body)
+        if exact in self._exact:
+            self.hits += 1
+            return self._next("exact", exact, self._exact[exact])
+        if shape in self._shape:
+            self.shape_hits += 1
+            return self._next("shape", shape, self._shape[shape])
+        return None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        entry = self.lookup(request.method, str(request.url), body)
+        if entry is None:
+            raise ReplayMiss(
+                f"No recorded response for {request.method} {request.url.raw_path.decode()} "
+                f"in {self.path}; record the fixture again with this call included."
+            )
+        if self.simulate_latency:
+            await asyncio.sleep(entry["elapsed_ms"] / 1000)
+        if "text" in entry:
+            content = entry["text"].encode()
+        else:
+            content = b"" if entry["body"] is None else json.dumps(entry["body"]).encode()
+        return httpx.Response(
+            entry["status"], headers=entry["headers"], content=content, request=request
+        )
+
+    def __repr__(self) -> str:
+        return f"ReplayTransport(path={self.path!r}, exchanges={len(self)})"
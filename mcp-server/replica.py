@@ -0,0 +1,285 @@
+"""
+Opt-in local SQLite replica of Project__c, Work_Item__c and Time_Entry__c.
+
+The analytics tools re-read the same few thousand rows on every call. When a
+replica path is configured, the three objects are downloaded once and then
+kept current incrementally:
+
+- changed rows: SystemModstamp >= the last high-water mark (upserted),
+- deleted rows: the REST getDeleted endpoint (sobjects/<object>/deleted/).
+
+Reads are served from SQLite whenever the last sync is younger than the
+configured staleness bound; otherwise an incremental sync runs first. If
+getDeleted can no longer cover the gap (Salesforce keeps ~15-30 days), the
+object is re-bootstrapped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from lazy_imports import LazyModule
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = LazyModule("pandas")
+
+# Replicated objects: SQLite table name -> (sObject, replicated fields)
+REPLICATED_OBJECTS: Dict[str, tuple] = {
+    "project": (
+        "Project__c",
+        [
+            "Id", "Name", "Status__c", "Client__c", "Start_Date__c", "End_Date__c",
+            "Total_Estimated_Hours__c", "Total_Actual_Hours__c", "SystemModstamp",
+        ],
+    ),
+    "work_item": (
+        "Work_Item__c",
+        [
+            "Id", "Name", "Subject__c", "Project__c", "Assigned_To__c", "Status__c",
+            "Priority__c", "Type__c", "Estimated_Hours__c", "Actual_Hours__c",
+            "Due_Date__c", "Completed_Date__c", "SystemModstamp",
+        ],
+    ),
+    "time_entry": (
+        "Time_Entry__c",
+        ["Id", "Name", "Work_Item__c", "Hours__c", "Date__c", "Notes__c", "SystemModstamp"],
+    ),
+}
+
+# Incremental windows overlap by this much; upserts make re-reads harmless.
+SYNC_OVERLAP = datetime.timedelta(minutes=1)
+
+
+def _parse_sf_datetime(value: str) -> datetime.datetime:
+    """Parse a Salesforce datetime such as 2026-10-16T12:00:00.000+0000."""
+    return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+
+def _sf_datetime(timestamp: float) -> str:
+    """Format a Unix time the way Salesforce returns datetimes."""
+    value = datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+
+def _soql_datetime(value: datetime.datetime) -> str:
+    return value.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class LocalReplica:
+    """
+    SQLite-backed replica of the project management objects.
+
+    Usage:
+        replica = LocalReplica("replica.sqlite3", max_staleness=300)
+        if await replica.ensure_fresh(sf):
+            df = await replica.read_sql("SELECT ... FROM work_item", ())
+    """
+
+    def __init__(self, path: str, max_staleness: float = 300.0) -> None:
+        self.path = path
+        self.max_staleness = max_staleness
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        self._sync_lock = asyncio.Lock()
+        self._create_schema()
+
+    # -----------------------------------------------------------------
+    # Schema / state
+    # -----------------------------------------------------------------
+
+    def _create_schema(self) -> None:
+        with self._db_lock, self._conn:
+            for table, (_, fields) in REPLICATED_OBJECTS.items():
+                columns = ", ".join(
+                    f"{f} TEXT PRIMARY KEY" if f == "Id" else f for f in fields
+                )
+                self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state ("
+                "object TEXT PRIMARY KEY, high_water TEXT, last_sync REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS work_item_project ON work_item (Project__c)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS time_entry_work_item ON time_entry (Work_Item__c)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS time_entry_date ON time_entry (Date__c)"
+            )
+
+    def _state(self, sobject: str) -> Optional[tuple]:
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT high_water, last_sync FROM sync_state WHERE object = ?",
+                (sobject,),
+            ).fetchone()
+
+    def last_sync(self) -> Optional[float]:
+        """Epoch time of the oldest per-object sync, or None if never synced."""
+        times = []
+        for sobject, _ in REPLICATED_OBJECTS.values():
+            state = self._state(sobject)
+            if state is None:
+                return None
+            times.append(state[1])
+        return min(times)
+
+    def staleness(self) -> Optional[float]:
+        """Seconds since the replica was last fully synced, or None."""
+        last = self.last_sync()
+        return None if last is None else time.time() - last
+
+    # -----------------------------------------------------------------
+    # Writes (run in a worker thread)
+    # -----------------------------------------------------------------
+
+    def _upsert(self, table: str, fields: List[str], records: List[Dict[str, Any]]) -> None:
+        placeholders = ", ".join("?" for _ in fields)
+        rows = [tuple(rec.get(f) for f in fields) for rec in records]
+        with self._db_lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(fields)}) VALUES ({placeholders})",
+                rows,
+            )
+
+    def _delete(self, table: str, ids: Sequence[str]) -> None:
+        with self._db_lock, self._conn:
+            self._conn.executemany(
+                f"DELETE FROM {table} WHERE Id = ?", [(i,) for i in ids]
+            )
+
+    def _clear(self, table: str, sobject: str) -> None:
+        # Forget the high-water mark in the same transaction: if the reload
+        # fails partway, the next sync must bootstrap again rather than run
+        # an incremental load into the emptied table.
+        with self._db_lock, self._conn:
+            self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute("DELETE FROM sync_state WHERE object = ?", (sobject,))
+
+    def _save_state(self, sobject: str, high_water: Optional[str], synced_at: float) -> None:
+        with self._db_lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (object, high_water, last_sync) "
+                "VALUES (?, ?, ?)",
+                (sobject, high_water, synced_at),
+            )
+
+    # -----------------------------------------------------------------
+    # Sync
+    # -----------------------------------------------------------------
+
+    async def _copy_rows(
+        self,
+        sf: Any,
+        table: str,
+        fields: List[str],
+        soql: str,
+        high_water: Optional[str],
+    ) -> tuple:
+        """Stream a query into a table; returns (rows copied, new high water)."""
+        copied = 0
+        async for page in sf.query_pages(soql):
+            if not page.records:
+                continue
+            await asyncio.to_thread(self._upsert, table, fields, page.records)
+            copied += len(page.records)
+            page_max = max(r["SystemModstamp"] for r in page.records)
+            if high_water is None or _parse_sf_datetime(page_max) > _parse_sf_datetime(high_water):
+                high_water = page_max
+        return copied, high_water
+
+    async def _sync_object(self, sf: Any, table: str) -> int:
+        sobject, fields = REPLICATED_OBJECTS[table]
+        started = time.time()
+        select = f"SELECT {', '.join(fields)} FROM {sobject}"
+        state = self._state(sobject)
+
+        if state is not None and state[0] is not None:
+            high_water, last_sync = state
+            since = _parse_sf_datetime(high_water) - SYNC_OVERLAP
+            now = datetime.datetime.now(datetime.timezone.utc)
+            deleted = await sf.get_deleted(
+                sobject,
+                datetime.datetime.fromtimestamp(last_sync, datetime.timezone.utc) - SYNC_OVERLAP,
+                now,
+            )
+            if deleted is not None:
+                ids = [d["id"] for d in deleted]
+                if ids:
+                    await asyncio.to_thread(self._delete, table, ids)
+                copied, high_water = await self._copy_rows(
+                    sf,
+                    table,
+                    fields,
+                    f"{select} WHERE SystemModstamp >= {_soql_datetime(since)}",
+                    high_water,
+                )
+                await asyncio.to_thread(self._save_state, sobject, high_water, started)
+                return copied + len(ids)
+            # The deleted-records window no longer reaches back to our last
+            # sync: fall through to a full re-bootstrap.
+
+        await asyncio.to_thread(self._clear, table, sobject)
+        copied, high_water = await self._copy_rows(sf, table, fields, select, None)
+        # An empty object has no SystemModstamp to resume from; anything
+        # created later is stamped after the sync started.
+        await asyncio.to_thread(
+            self._save_state, sobject, high_water or _sf_datetime(started), started
+        )
+        return copied
+
+    async def sync(self, sf: Any) -> Dict[str, int]:
+        """Bootstrap or incrementally sync every object; returns rows touched."""
+        async with self._sync_lock:
+            return await self._sync_all(sf)
+
+    async def _sync_all(self, sf: Any) -> Dict[str, int]:
+        counts = await asyncio.gather(
+            *(self._sync_object(sf, table) for table in REPLICATED_OBJECTS)
+        )
+        return dict(zip(REPLICATED_OBJECTS, counts))
+
+    def _is_fresh(self, limit: float) -> bool:
+        age = self.staleness()
+        return age is not None and age <= limit
+
+    async def ensure_fresh(self, sf: Any, max_staleness: Optional[float] = None) -> bool:
+        """
+        Sync if the replica is older than max_staleness (default: the
+        configured bound); True when usable. Callers that find the replica
+        stale together share one sync.
+        """
+        limit = self.max_staleness if max_staleness is None else max_staleness
+        if self._is_fresh(limit):
+            return True
+        async with self._sync_lock:
+            # Another caller may have synced while this one waited.
+            if not self._is_fresh(limit):
+                await self._sync_all(sf)
+        return True
+
+    # -----------------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------------
+
+    def _read(self, sql: str, params: Sequence[Any]) -> pd.DataFrame:
+        with self._db_lock:
+            return pd.read_sql_query(sql, self._conn, params=list(params))
+
+    async def read_sql(self, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+        """Run a read query against the replica in a worker thread."""
+        return await asyncio.to_thread(self._read, sql, params)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __repr__(self) -> str:
+        return f"LocalReplica(path={self.path!r}, staleness={self.staleness()})"
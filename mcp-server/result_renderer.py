@@ -0,0 +1,165 @@
+"""
+Rendering of tool results within a size budget.
+
+Every character a tool returns is read by the model, so the renderer offers
+compact formats besides the padded text table, and keeps output under a
+character budget (roughly 4 characters per token). When a result is over
+budget it is shrunk in steps, and stops as soon as the output fits:
+
+1. long text values (descriptions, notes) are cut short,
+2. low-value columns (Ids, audit fields, all-empty columns) are dropped,
+3. trailing rows are dropped.
+
+Anything elided is reported on a final line so the caller can narrow the
+query or ask for another format.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from lazy_imports import LazyModule
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = LazyModule("pandas")
+
+# Columns dropped first when a result is over budget (matched on the last
+# segment of flattened names such as Work_Item__r.Id).
+LOW_VALUE_COLUMNS = {
+    "Id", "SystemModstamp", "CreatedById", "CreatedDate",
+    "LastModifiedById", "LastModifiedDate", "OwnerId",
+}
+
+# Long text values are cut to this many characters when over budget.
+TEXT_TRUNCATE_AT = 120
+
+
+def _md_cell(value: Any) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def _to_table(df: pd.DataFrame) -> str:
+    return df.to_string(index=False)
+
+
+def _to_csv(df: pd.DataFrame) -> str:
+    return df.to_csv(index=False, lineterminator="\n").rstrip("\n")
+
+
+def _to_jsonl(df: pd.DataFrame) -> str:
+    return df.to_json(orient="records", lines=True, date_format="iso").rstrip("\n")
+
+
+def _to_markdown(df: pd.DataFrame) -> str:
+    columns = [_md_cell(c) for c in df.columns]
+    lines = [
+        "| " + " | ".join(columns) + " |",
+        "|" + "|".join("---" for _ in columns) + "|",
+    ]
+    for row in df.itertuples(index=False):
+        lines.append("| " + " | ".join(_md_cell(v) for v in row) + " |")
+    return "\n".join(lines)
+
+
+RENDERERS: Dict[str, Callable[[pd.DataFrame], str]] = {
+    "table": _to_table,
+    "csv": _to_csv,
+    "jsonl": _to_jsonl,
+    "markdown": _to_markdown,
+}
+
+OUTPUT_FORMATS = sorted(RENDERERS)
+
+
+def validate_format(output_format: str) -> Optional[str]:
+    """Return an error message for an unknown format, or None."""
+    if output_format in RENDERERS:
+        return None
+    return (
+        f"Invalid output_format '{output_format}'. "
+        f"Valid options: {', '.join(OUTPUT_FORMATS)}"
+    )
+
+
+def _is_low_value(df: pd.DataFrame, column: Any) -> bool:
+    return str(column).rsplit(".", 1)[-1] in LOW_VALUE_COLUMNS or df[column].isna().all()
+
+
+def _truncate_text(df: pd.DataFrame, limit: int) -> Tuple[pd.DataFrame, int]:
+    """Cut string values longer than limit; returns (frame, values cut)."""
+    cut = 0
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if not (series.dtype == object or pd.api.types.is_string_dtype(series)):
+            continue
+        mask = series.map(lambda v: isinstance(v, str) and len(v) > limit).astype(bool)
+        n = int(mask.sum())
+        if n:
+            df[column] = series.astype(object).where(
+                ~mask, series[mask].str.slice(0, limit - 3) + "..."
+            )
+            cut += n
+    return df, cut
+
+
+def render_dataframe(
+    df: pd.DataFrame,
+    output_format: str = "table",
+    max_rows: int = 200,
+    max_chars: Optional[int] = None,
+    index: bool = False,
+) -> str:
+    """
+    Render a DataFrame in the given format, shrinking it to max_chars.
+
+    Parameters:
+    - output_format: one of "table", "csv", "jsonl", "markdown"
+    - max_rows: hard row cap applied before any budgeting
+    - max_chars: character budget for the rendered output (None = no limit)
+    - index: include the index as leading column(s), e.g. for pivot tables
+    """
+    error = validate_format(output_format)
+    if error:
+        raise ValueError(error)
+    if index:
+        df = df.reset_index()
+    render = RENDERERS[output_format]
+
+    # attributes remnants never carry information
+    df = df.drop(columns=[c for c in df.columns if str(c).rsplit(".", 1)[-1] == "attributes"])
+    df = df.head(max_rows)
+    text = render(df)
+    if max_chars is None or len(text) <= max_chars:
+        return text
+
+    notes: List[str] = []
+    df, cut = _truncate_text(df, TEXT_TRUNCATE_AT)
+    if cut:
+        notes.append(f"{cut} long value(s) cut to {TEXT_TRUNCATE_AT} chars")
+        text = render(df)
+
+    if len(text) > max_chars:
+        dropped = [c for c in df.columns if _is_low_value(df, c)]
+        if dropped and len(dropped) < len(df.columns):
+            df = df.drop(columns=dropped)
+            notes.append(f"dropped column(s) {', '.join(str(c) for c in dropped)}")
+            text = render(df)
+
+    rows = len(df)
+    while len(text) > max_chars and len(df) > 1:
+        # Scale by the overshoot, then step down until the output fits.
+        keep = min(len(df) - 1, max(1, int(len(df) * max_chars / len(text) * 0.95)))
+        df = df.head(keep)
+        text = render(df)
+    if len(df) < rows:
+        notes.append(f"showing {len(df)} of {rows} rows")
+
+    if notes:
+        text += f"\n[elided to fit {max_chars} chars: {'; '.join(notes)}]"
+    return text
@@ -9,19 +9,59 @@ Requires Python 3.10+ and the packages listed in requirements.txt.
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import datetime
+import functools
+import inspect
+import logging
 import math
 import os
 import statistics
+import time
+import weakref
 from collections import defaultdict
-from typing import Any, Dict, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 
-import pandas as pd
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
-from simple_salesforce import Salesforce, SalesforceError
-
-from soql_builder import SOQLBuilder
+from pydantic import BaseModel, Field
+
+from api_governor import ApiGovernor, parse_budgets
+from describe_cache import DescribeCache
+from lazy_imports import LazyModule
+from metrics import CallStats, ServerMetrics, record_dataframe, timed
+from org_registry import OrgConfig, OrgRegistry, load_org_configs
+from query_cache import QueryResultCache
+from query_cursors import CursorStore, QueryCursor
+from query_plan import QueryPreflight, indexed_fields
+from record_flattener import RecordFlattener, flatten_relationship_fields
+from result_renderer import render_dataframe, validate_format
+from replica import LocalReplica
+from soql_builder import SOQLBuilder, count_query, with_limit
+from work_item_index import INDEX_FIELDS, RESOLVE_CHUNK_SIZE, WorkItemIndex, name_key
+
+# pandas, simple_salesforce and the httpx client account for most of the
+# import time and no tool needs them to be listed; they load on first use
+# (or during the background warm-up started by the lifespan below).
+if TYPE_CHECKING:
+    import pandas as pd
+    from simple_salesforce import Salesforce
+
+    from sf_client import AsyncSalesforce
+else:
+    pd = LazyModule("pandas")
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -29,51 +69,312 @@ from soql_builder import SOQLBuilder
 
 load_dotenv()
 
-SF_USERNAME = os.getenv("SF_USERNAME", "")
-SF_PASSWORD = os.getenv("SF_PASSWORD", "")
-SF_SECURITY_TOKEN = os.getenv("SF_SECURITY_TOKEN", "")
-SF_DOMAIN = os.getenv("SF_DOMAIN", "login")
+SF_MAX_CONNECTIONS = int(os.getenv("SF_MAX_CONNECTIONS", "20"))
+SF_HTTP_CONNECT_TIMEOUT = float(os.getenv("SF_HTTP_CONNECT_TIMEOUT", "10"))
+SF_HTTP_READ_TIMEOUT = float(os.getenv("SF_HTTP_READ_TIMEOUT", "60"))
+SF_HTTP_KEEPALIVE = int(os.getenv("SF_HTTP_KEEPALIVE", "120"))
+SF_HTTP_GZIP = os.getenv("SF_HTTP_GZIP", "true").lower() in ("1", "true", "yes")
+SF_DESCRIBE_CACHE_TTL = float(os.getenv("SF_DESCRIBE_CACHE_TTL", "3600"))
+SF_DESCRIBE_CACHE_SIZE = int(os.getenv("SF_DESCRIBE_CACHE_SIZE", "64"))
+SF_WORK_ITEM_INDEX_REFRESH = float(os.getenv("SF_WORK_ITEM_INDEX_REFRESH", "300"))
+SF_MAX_QUERY_ROWS = int(os.getenv("SF_MAX_QUERY_ROWS", "100000"))
+SF_MAX_QUERY_BYTES = int(os.getenv("SF_MAX_QUERY_BYTES", str(200 * 1024 * 1024)))
+SF_REPLICA_MAX_STALENESS = float(os.getenv("SF_REPLICA_MAX_STALENESS", "300"))
+SF_QUERY_CACHE_TTL = float(os.getenv("SF_QUERY_CACHE_TTL", "60"))
+SF_QUERY_CACHE_MAX_BYTES = int(os.getenv("SF_QUERY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+SF_QUERY_CURSOR_TTL = float(os.getenv("SF_QUERY_CURSOR_TTL", "600"))
+SF_QUERY_CURSOR_MAX = int(os.getenv("SF_QUERY_CURSOR_MAX", "32"))
+SF_RESULT_MAX_CHARS = int(os.getenv("SF_RESULT_MAX_CHARS", "30000"))
+SF_API_WINDOW = float(os.getenv("SF_API_WINDOW", "3600"))
+SF_API_WINDOW_BUDGET = int(os.getenv("SF_API_WINDOW_BUDGET", "0"))
+SF_API_TOOL_BUDGET = int(os.getenv("SF_API_TOOL_BUDGET", "0"))
+SF_API_TOOL_BUDGETS = os.getenv("SF_API_TOOL_BUDGETS", "")
+SF_API_RESERVE_PERCENT = float(os.getenv("SF_API_RESERVE_PERCENT", "10"))
+SF_API_TIGHT_PERCENT = float(os.getenv("SF_API_TIGHT_PERCENT", "25"))
+SF_API_READING_MAX_AGE = float(os.getenv("SF_API_READING_MAX_AGE", "300"))
+SF_MAX_RETRIES = int(os.getenv("SF_MAX_RETRIES", "3"))
+SF_RETRY_BACKOFF = float(os.getenv("SF_RETRY_BACKOFF", "0.5"))
+SF_RETRY_BACKOFF_CAP = float(os.getenv("SF_RETRY_BACKOFF_CAP", "8"))
+SF_QUERY_PREFLIGHT = os.getenv("SF_QUERY_PREFLIGHT", "off").lower()
+SF_QUERY_PREFLIGHT_MIN_ROWS = int(os.getenv("SF_QUERY_PREFLIGHT_MIN_ROWS", "100000"))
+SF_QUERY_PLAN_TTL = float(os.getenv("SF_QUERY_PLAN_TTL", "3600"))
+SF_REPLAY_LATENCY = os.getenv("SF_REPLAY_LATENCY", "false").lower() in ("1", "true", "yes")
+SF_METRICS_FILE = os.getenv("SF_METRICS_FILE", "")
+SF_METRICS_INTERVAL = float(os.getenv("SF_METRICS_INTERVAL", "60"))
+SF_MCP_TRANSPORT = os.getenv("SF_MCP_TRANSPORT", "stdio").lower()
+SF_MCP_HOST = os.getenv("SF_MCP_HOST", "127.0.0.1")
+SF_MCP_PORT = int(os.getenv("SF_MCP_PORT", "8000"))
+SF_MCP_AUTH_TOKEN = os.getenv("SF_MCP_AUTH_TOKEN", "")
+SF_SESSION_MAX_CONCURRENCY = int(os.getenv("SF_SESSION_MAX_CONCURRENCY", "4"))
+
+logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 # Salesforce connection
 # ---------------------------------------------------------------------------
 
 
-SF_ACCESS_TOKEN = os.getenv("SF_ACCESS_TOKEN", "")
-SF_INSTANCE_URL = os.getenv("SF_INSTANCE_URL", "")
-
-_sf_connection: Optional[Salesforce] = None
-
-
-def _connect_sf() -> Salesforce:
-    """Create and return a Salesforce connection.
+def _connect_sf(config: OrgConfig, use_access_token: bool = True) -> Salesforce:
+    """Create and return a Salesforce connection to an org.
 
     Supports two auth modes:
-    1. Access token + instance URL (set SF_ACCESS_TOKEN and SF_INSTANCE_URL)
+    1. Access token + instance URL (SF_ACCESS_TOKEN and SF_INSTANCE_URL)
     2. Username + password + security token (traditional)
+
+    use_access_token=False forces mode 2, e.g. once the token has expired.
     """
-    if SF_ACCESS_TOKEN and SF_INSTANCE_URL:
-        return Salesforce(instance_url=SF_INSTANCE_URL, session_id=SF_ACCESS_TOKEN)
+    from simple_salesforce import Salesforce
+
+    from http_transport import tuned_session
+
+    session = tuned_session(
+        pool_size=SF_MAX_CONNECTIONS,
+        connect_timeout=SF_HTTP_CONNECT_TIMEOUT,
+        read_timeout=SF_HTTP_READ_TIMEOUT,
+        keepalive_idle=SF_HTTP_KEEPALIVE,
+        gzip=SF_HTTP_GZIP,
+    )
+    if use_access_token and config.access_token and config.instance_url:
+        return Salesforce(
+            instance_url=config.instance_url, session_id=config.access_token, session=session
+        )
     return Salesforce(
-        username=SF_USERNAME,
-        password=SF_PASSWORD,
-        security_token=SF_SECURITY_TOKEN,
-        domain=SF_DOMAIN,
+        username=config.username,
+        password=config.password,
+        security_token=config.security_token,
+        domain=config.domain,
+        session=session,
     )
 
 
+class OrgContext:
+    """
+    Connection, caches and API accounting of one Salesforce org.
+
+    One is created per configured org on first use (see org_registry);
+    tools reach the one for their `org` argument through _org().
+
+    Usage:
+        org = _orgs.get("uat")
+        sf = await org.get_async_sf()
+    """
+
+    def __init__(self, config: OrgConfig) -> None:
+        self.config = config
+        self.name = config.name
+        self.sf_connection: Optional[Salesforce] = None
+        self.async_sf: Optional[AsyncSalesforce] = None
+        self._async_sf_lock = asyncio.Lock()
+        self.api_governor = ApiGovernor(
+            window=SF_API_WINDOW,
+            window_budget=SF_API_WINDOW_BUDGET,
+            tool_budget=SF_API_TOOL_BUDGET,
+            tool_budgets=parse_budgets(SF_API_TOOL_BUDGETS),
+            reserve_fraction=SF_API_RESERVE_PERCENT / 100,
+            tight_fraction=SF_API_TIGHT_PERCENT / 100,
+            max_reading_age=SF_API_READING_MAX_AGE,
+        )
+        self.describe_cache = DescribeCache(
+            ttl=SF_DESCRIBE_CACHE_TTL,
+            max_entries=SF_DESCRIBE_CACHE_SIZE,
+            cache_dir=config.describe_cache_dir or None,
+        )
+        self.work_item_index = WorkItemIndex(refresh_interval=SF_WORK_ITEM_INDEX_REFRESH)
+        self.query_cache = QueryResultCache(
+            ttl=SF_QUERY_CACHE_TTL, max_bytes=SF_QUERY_CACHE_MAX_BYTES
+        )
+        self.query_cursors = CursorStore(
+            ttl=SF_QUERY_CURSOR_TTL, max_cursors=SF_QUERY_CURSOR_MAX
+        )
+        self.query_preflight = QueryPreflight(
+            mode=SF_QUERY_PREFLIGHT,
+            large_cardinality=SF_QUERY_PREFLIGHT_MIN_ROWS,
+            ttl=SF_QUERY_PLAN_TTL,
+        )
+        self.replica: Optional[LocalReplica] = (
+            LocalReplica(config.replica_path, max_staleness=SF_REPLICA_MAX_STALENESS)
+            if config.replica_path
+            else None
+        )
+
+    def get_sf(self) -> Salesforce:
+        """Return the cached Salesforce connection, creating it on first use."""
+        if self.sf_connection is None:
+            self.sf_connection = _connect_sf(self.config)
+        return self.sf_connection
+
+    async def refresh_session(self) -> str:
+        """Log in again after the session expired; returns the new session id.
+
+        Only username/password credentials can be renewed; an expired
+        access token without them has to be replaced by the user.
+        """
+        if not (self.config.username and self.config.password):
+            raise RuntimeError(
+                f"Salesforce session for org '{self.name}' expired. Configure a "
+                f"username/password for automatic re-login, or provide a fresh "
+                f"access token and restart the server."
+            )
+        logger.info("Salesforce session for org '%s' expired, logging in again", self.name)
+        self.sf_connection = await asyncio.to_thread(_connect_sf, self.config, False)
+        return self.sf_connection.session_id
+
+    async def get_async_sf(self) -> AsyncSalesforce:
+        """Return the org's async REST client, logging in on first use.
+
+        The (blocking) simple_salesforce login runs in a worker thread so the
+        event loop keeps serving other tool calls while it completes. With a
+        replay file configured there is no login: responses come from the
+        fixture.
+        """
+        if self.async_sf is None:
+            async with self._async_sf_lock:
+                if self.async_sf is None and self.config.replay_file:
+                    self.async_sf = self._replay_client()
+                elif self.async_sf is None:
+                    from sf_client import from_sync
+
+                    sf = await asyncio.to_thread(self.get_sf)
+                    self.async_sf = from_sync(
+                        sf,
+                        wrap_transport=(
+                            self._recording_transport if self.config.record_file else None
+                        ),
+                        max_connections=SF_MAX_CONNECTIONS,
+                        timeout=SF_HTTP_READ_TIMEOUT,
+                        connect_timeout=SF_HTTP_CONNECT_TIMEOUT,
+                        keepalive_expiry=SF_HTTP_KEEPALIVE,
+                        gzip=SF_HTTP_GZIP,
+                        session_refresher=self.refresh_session,
+                        max_retries=SF_MAX_RETRIES,
+                        backoff_base=SF_RETRY_BACKOFF,
+                        backoff_cap=SF_RETRY_BACKOFF_CAP,
+                        event_hooks={
+                            "request": [self.before_request],
+                            "response": [self.after_response],
+                        },
+                    )
+        return self.async_sf
+
+    def _recording_transport(self, inner: Any) -> Any:
+        """Record every REST exchange to the org's record file (see replay_transport)."""
+        from replay_transport import RecordingTransport
+
+        return RecordingTransport(inner, self.config.record_file)
+
+    def _replay_client(self) -> AsyncSalesforce:
+        """A client answered from the org's replay file; no login and no network."""
+        from replay_transport import ReplayTransport
+        from sf_client import AsyncSalesforce
+
+        path = self.config.replay_file
+        transport = ReplayTransport(path, simulate_latency=SF_REPLAY_LATENCY)
+        logger.info(
+            "Replaying Salesforce responses for org '%s' from %s (%d exchanges)",
+            self.name, path, len(transport),
+        )
+        return AsyncSalesforce(
+            self.config.instance_url or "https://replay.invalid",
+            "replay",
+            max_retries=0,
+            wrap_transport=lambda inner: transport,
+            event_hooks={
+                "request": [self.before_request],
+                "response": [self.after_response],
+            },
+        )
+
+    async def before_request(self, request: Any) -> None:
+        """httpx request hook: refuse calls that would overrun an API budget."""
+        self.api_governor.before_request(request.url.path)
+
+    async def after_response(self, response: Any) -> None:
+        """httpx response hook: count the call and read Sforce-Limit-Info."""
+        self.api_governor.after_response(response.headers)
+
+    def __repr__(self) -> str:
+        return f"OrgContext(name={self.name!r}, connected={self.async_sf is not None})"
+
+
+_orgs: OrgRegistry[OrgContext] = OrgRegistry(*load_org_configs(), factory=OrgContext)
+
+
+def _org() -> OrgContext:
+    """The org the current tool call targets (the default org outside tools)."""
+    return _orgs.current()
+
+
 def get_sf() -> Salesforce:
-    """Return the cached Salesforce connection, creating it on first use."""
-    global _sf_connection
-    if _sf_connection is None:
-        _sf_connection = _connect_sf()
-    return _sf_connection
+    """Return the current org's Salesforce connection, creating it on first use."""
+    return _org().get_sf()
+
+
+async def get_async_sf() -> AsyncSalesforce:
+    """Return the current org's async REST client, logging in on first use."""
+    return await _org().get_async_sf()
+
+
+_metrics = ServerMetrics()
+
+
+async def _warm_up() -> None:
+    """Load pandas and log in while the client is still listing tools.
+
+    Failures are only logged: the first tool call retries the login and
+    reports the error to the user.
+    """
+    try:
+        await asyncio.to_thread(pd.load)
+        await get_async_sf()
+    except Exception as e:
+        logger.warning("Background Salesforce login failed: %s", e)
+
+
+async def _export_metrics() -> None:
+    """Rewrite SF_METRICS_FILE every SF_METRICS_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(SF_METRICS_INTERVAL)
+        try:
+            await asyncio.to_thread(_metrics.write_prometheus, SF_METRICS_FILE)
+        except OSError as e:
+            logger.warning("Could not write metrics to %s: %s", SF_METRICS_FILE, e)
+
+
+_lifespan_users = 0
+_background_tasks: List[asyncio.Task] = []
+
+
+@contextlib.asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Start the warm-up as soon as the server loop runs; never block on it.
+
+    Over HTTP the lifespan runs once per client session. The background
+    tasks are shared: the first user starts them and the last one stops
+    them.
+    """
+    global _lifespan_users
+    _lifespan_users += 1
+    if _lifespan_users == 1:
+        _background_tasks.append(asyncio.create_task(_warm_up()))
+        if SF_METRICS_FILE:
+            _background_tasks.append(asyncio.create_task(_export_metrics()))
+    try:
+        yield
+    finally:
+        _lifespan_users -= 1
+        if _lifespan_users == 0:
+            for task in _background_tasks:
+                task.cancel()
+            _background_tasks.clear()
+            if SF_METRICS_FILE:
+                with contextlib.suppress(OSError):
+                    _metrics.write_prometheus(SF_METRICS_FILE)
 
 # ---------------------------------------------------------------------------
 # FastMCP server
 # ---------------------------------------------------------------------------
 
-mcp = FastMCP("salesforce-pm")
+mcp = FastMCP("salesforce-pm", lifespan=_lifespan, host=SF_MCP_HOST, port=SF_MCP_PORT)
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -82,59 +383,312 @@ mcp = FastMCP("salesforce-pm")
 VALID_WORK_ITEM_STATUSES = {"To Do", "In Progress", "Done", "Blocked"}
 
 
-def query_to_dataframe(soql: str) -> pd.DataFrame:
+def metered(tool: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """
+    Attribute the Salesforce API calls a tool makes to that tool, and record
+    its latency metrics.
+    """
+
+    @functools.wraps(tool)
+    async def wrapper(*args: Any, **kwargs: Any) -> str:
+        governor = _org().api_governor
+        with governor.attribute(tool.__name__), _metrics.tool_call(tool.__name__) as call:
+            result = await tool(*args, **kwargs)
+            call.error = result.startswith("Error")
+            return result
+
+    return wrapper
+
+
+ORG_PARAMETER_DESCRIPTION = (
+    f"Salesforce org to run against: one of {', '.join(_orgs.names)} "
+    f"(default: {_orgs.default})"
+    if len(_orgs) > 1
+    else f"Salesforce org to run against (only '{_orgs.default}' is configured)"
+)
+
+
+def org_scoped(tool: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """
+    Add an optional `org` parameter to a tool and run the tool against that
+    org's connection, caches and API budgets (the default org if omitted).
+    """
+
+    @functools.wraps(tool)
+    async def wrapper(*args: Any, org: str = "", **kwargs: Any) -> str:
+        try:
+            name = _orgs.resolve(org)
+        except ValueError as e:
+            return f"Error: {e}"
+        with _orgs.use(name):
+            return await tool(*args, **kwargs)
+
+    signature = inspect.signature(tool, eval_str=True)
+    wrapper.__signature__ = signature.replace(  # type: ignore[attr-defined]
+        parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter(
+                "org",
+                inspect.Parameter.KEYWORD_ONLY,
+                default="",
+                annotation=Annotated[str, Field(description=ORG_PARAMETER_DESCRIPTION)],
+            ),
+        ]
+    )
+    return wrapper
+
+
+# Per client session; entries go away with their session.
+_session_slots: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _session_slot() -> Optional[asyncio.Semaphore]:
+    """The concurrency limit of the calling client session, if any."""
+    if SF_SESSION_MAX_CONCURRENCY <= 0:
+        return None
+    try:
+        session = mcp.get_context().session
+    except ValueError:
+        # Called outside an MCP request (benchmarks, scripts).
+        return None
+    slot = _session_slots.get(session)
+    if slot is None:
+        slot = _session_slots[session] = asyncio.Semaphore(SF_SESSION_MAX_CONCURRENCY)
+    return slot
+
+
+def session_limited(tool: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """
+    Run at most SF_SESSION_MAX_CONCURRENCY tool calls at once per client
+    session; further calls from that session wait. Over HTTP this keeps one
+    busy client from taking the whole Salesforce connection pool.
     """
-    Execute a SOQL query via query_all() and return results as a pandas
-    DataFrame.  Handles pagination automatically through query_all().
+
+    @functools.wraps(tool)
+    async def wrapper(*args: Any, **kwargs: Any) -> str:
+        slot = _session_slot()
+        if slot is None:
+            return await tool(*args, **kwargs)
+        async with slot:
+            return await tool(*args, **kwargs)
+
+    return wrapper
+
+
+# Cached reads made stale by each kind of write. Logging time changes the
+# hour roll-ups on the work item and project, so those go too.
+TIME_ENTRY_WRITE_OBJECTS = ("Time_Entry__c", "Work_Item__c", "Project__c")
+STATUS_WRITE_OBJECTS = ("Work_Item__c", "Project__c")
+
+
+async def describe_sobject(object_name: str) -> Dict[str, Any]:
+    """Return an object's describe result through the org's describe cache."""
+    org = _org()
+    sf = await org.get_async_sf()
+    return await org.describe_cache.aget_or_fetch(
+        object_name, sf.describe, allow_stale=org.api_governor.is_tight()
+    )
+
+
+class QueryLimitExceeded(Exception):
+    """Raised when a query streams more rows or bytes than allowed."""
+
+
+async def iter_dataframe_chunks(
+    soql: str,
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+) -> AsyncIterator[pd.DataFrame]:
+    """
+    Stream a SOQL query as one flattened DataFrame per result page.
+
+    Each page is flattened and converted as soon as it arrives, and the raw
+    JSON is released before the next page is requested. Raises
+    QueryLimitExceeded once more than max_rows rows or max_bytes response
+    bytes (defaults: SF_MAX_QUERY_ROWS / SF_MAX_QUERY_BYTES) have been read.
+
+    Results small enough for the query cache (SF_QUERY_CACHE_TTL) keep
+    their pages until the last one arrives, and a repeat of the same query
+    within the TTL is answered from the cache.
+    """
+    max_rows = SF_MAX_QUERY_ROWS if max_rows is None else max_rows
+    max_bytes = SF_MAX_QUERY_BYTES if max_bytes is None else max_bytes
+    stats = CallStats()
+    started = time.perf_counter()
+    cache = _org().query_cache
+    cache_key = cache.key(soql) if cache.enabled else None
+    cached = cache.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        try:
+            # Hold a cached result to the caller's limits, as if it were fetched.
+            total_rows = sum(len(records) for records in cached.pages)
+            if total_rows > max_rows:
+                stats.error = True
+                raise QueryLimitExceeded(
+                    f"query returned more than {max_rows} rows "
+                    f"({total_rows} total); add a LIMIT or a narrower filter."
+                )
+            if cached.nbytes > max_bytes:
+                stats.error = True
+                raise QueryLimitExceeded(
+                    f"query response exceeded {max_bytes} bytes; "
+                    f"select fewer fields or add a LIMIT."
+                )
+            for records in cached.pages:
+                stats.rows += len(records)
+                df_start = time.perf_counter()
+                df = records_to_dataframe(records, soql)
+                stats.dataframe_seconds += time.perf_counter() - df_start
+                yield df
+        finally:
+            _metrics.observe_statement(soql, time.perf_counter() - started, stats)
+        return
+
+    token = cache.begin(soql) if cache_key is not None else ()
+    pages: Optional[List[List[Dict[str, Any]]]] = [] if cache_key is not None else None
+    sf = await get_async_sf()
+    try:
+        async for page in timed(sf.query_pages(soql), stats):
+            stats.pages += 1
+            stats.rows += len(page.records)
+            stats.bytes += page.nbytes
+            if stats.rows > max_rows:
+                raise QueryLimitExceeded(
+                    f"query returned more than {max_rows} rows "
+                    f"({page.total_size} total); add a LIMIT or a narrower filter."
+                )
+            if stats.bytes > max_bytes:
+                raise QueryLimitExceeded(
+                    f"query response exceeded {max_bytes} bytes; "
+                    f"select fewer fields or add a LIMIT."
+                )
+            if pages is not None:
+                if stats.bytes > cache.max_entry_bytes:
+                    pages = None
+                else:
+                    if page.records:
+                        pages.append(page.records)
+                    # Stored before the last yield: callers may stop reading
+                    # once they have enough rows.
+                    if page.done:
+                        cache.put(cache_key, pages, stats.bytes, token)
+            if page.records:
+                df_start = time.perf_counter()
+                df = records_to_dataframe(page.records, soql)
+                stats.dataframe_seconds += time.perf_counter() - df_start
+                yield df
+    except BaseException:
+        stats.error = True
+        raise
+    finally:
+        stats.http_requests = stats.pages
+        _metrics.observe_statement(soql, time.perf_counter() - started, stats)
+
+
+async def query_to_dataframe(
+    soql: str,
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Execute a SOQL query and return results as a pandas DataFrame.
+    Pages are streamed via nextRecordsUrl and flattened one at a time
+    (see iter_dataframe_chunks), so only the DataFrame is ever held in full.
     Nested relationship dicts are flattened (e.g. Project__r.Name).
     """
-    result = get_sf().query_all(soql)
-    records: List[Dict[str, Any]] = result.get("records", [])
+    chunks = [
+        chunk async for chunk in iter_dataframe_chunks(soql, max_rows, max_bytes)
+    ]
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def records_to_dataframe(
+    records: List[Dict[str, Any]],
+    soql: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Convert raw query records into a flattened DataFrame.
+
+    When the originating SOQL is given, columns are extracted by a
+    RecordFlattener compiled from its SELECT list (any relationship depth,
+    child subqueries as lists of records); otherwise each record is
+    flattened recursively.
+    """
     if not records:
         return pd.DataFrame()
-    flat = flatten_relationship_fields(records)
-    df = pd.DataFrame(flat)
-    # Drop Salesforce metadata column injected by simple_salesforce
-    if "attributes" in df.columns:
-        df = df.drop(columns=["attributes"])
+    start = time.perf_counter()
+    if soql is not None:
+        df = pd.DataFrame(RecordFlattener.for_query(soql).to_columns(records))
+    else:
+        df = pd.DataFrame(flatten_relationship_fields(records))
+    record_dataframe(time.perf_counter() - start)
     return df
 
 
-def flatten_relationship_fields(
-    records: List[Dict[str, Any]],
-    parent_key: str = "",
-) -> List[Dict[str, Any]]:
-    """
-    Flatten nested relationship objects in Salesforce query results.
-
-    Example: {"Project__r": {"Name": "Alpha"}} becomes
-             {"Project__r.Name": "Alpha"}
-    """
-    flat_records: List[Dict[str, Any]] = []
-    for record in records:
-        flat: Dict[str, Any] = {}
-        for key, value in record.items():
-            full_key = f"{parent_key}.{key}" if parent_key else key
-            if isinstance(value, dict) and "attributes" in value:
-                # This is a relationship object -- flatten it
-                for sub_key, sub_val in value.items():
-                    if sub_key == "attributes":
-                        continue
-                    flat[f"{full_key}.{sub_key}"] = sub_val
-            elif isinstance(value, dict) and key == "attributes":
-                # Skip Salesforce metadata
-                continue
-            else:
-                flat[full_key] = value
-        flat_records.append(flat)
-    return flat_records
+async def analytics_dataframe(
+    soql: str,
+    replica_sql: str,
+    params: Tuple[Any, ...] = (),
+) -> pd.DataFrame:
+    """
+    Load analytics rows from the local replica when one is configured,
+    otherwise (or if the replica cannot be synced) from Salesforce.
 
+    replica_sql must return the same column names the SOQL would produce
+    after flattening (e.g. "Work_Item__r.Project__r.Name").
 
-def _df_to_table(df: pd.DataFrame, max_rows: int = 200) -> str:
-    """Convert a DataFrame to a readable text table."""
+    While the API budget is tight, any previously synced replica is used
+    as-is rather than spending calls on an incremental sync.
+    """
+    org = _org()
+    if org.replica is not None:
+        try:
+            sf = await org.get_async_sf()
+            max_staleness = math.inf if org.api_governor.is_tight() else None
+            if await org.replica.ensure_fresh(sf, max_staleness):
+                return await org.replica.read_sql(replica_sql, params)
+        except Exception as e:
+            logger.warning("Replica unavailable, querying Salesforce: %s", e)
+    return await query_to_dataframe(soql)
+
+
+def _days_ago(n_days: int) -> str:
+    """Return the date n_days before today (YYYY-MM-DD), i.e. LAST_N_DAYS:n."""
+    return (datetime.date.today() - datetime.timedelta(days=n_days)).isoformat()
+
+
+def _df_to_table(
+    df: pd.DataFrame,
+    max_rows: int = 200,
+    output_format: str = "table",
+    index: bool = False,
+) -> str:
+    """Render a DataFrame in the requested format within SF_RESULT_MAX_CHARS."""
     if df.empty:
         return "(no results)"
-    return df.head(max_rows).to_string(index=False)
+    return render_dataframe(
+        df,
+        output_format,
+        max_rows=max_rows,
+        max_chars=SF_RESULT_MAX_CHARS,
+        index=index,
+    )
+
+
+def _validate_hours(hours: float) -> Optional[str]:
+    """
+    Apply the Hours_Must_Be_Positive / Hours_Cannot_Exceed_24 validation
+    rules locally. Returns an error message, or None if the value is valid.
+    """
+    if hours <= 0:
+        return "hours must be greater than 0."
+    if hours > 24:
+        return "hours cannot exceed 24 for a single entry."
+    return None
 
 
 def _today_soql() -> str:
@@ -148,10 +702,14 @@ def _today_soql() -> str:
 
 
 @mcp.tool()
-def sf_get_my_work_items(
+@session_limited
+@org_scoped
+@metered
+async def sf_get_my_work_items(
     status: Optional[str] = None,
     project_name: Optional[str] = None,
     due_today: bool = False,
+    output_format: str = "table",
 ) -> str:
     """
     Retrieve work items from Salesforce with optional filters.
@@ -160,10 +718,13 @@ def sf_get_my_work_items(
     - status: filter by Status__c value (e.g. "In Progress", "Blocked")
     - project_name: filter by related Project name
     - due_today: if True, only items with Due_Date__c = TODAY
+    - output_format: "table" (default), "csv", "jsonl" or "markdown"
 
     Returns a formatted table of work items including project name,
     assigned user, status, priority, due date, and estimated hours.
     """
+    if (format_error := validate_format(output_format)) is not None:
+        return f"Error: {format_error}"
     try:
         builder = (
             SOQLBuilder()
@@ -193,14 +754,17 @@ def sf_get_my_work_items(
         builder.order_by("Due_Date__c", "ASC").limit(200)
 
         soql = builder.build()
-        df = query_to_dataframe(soql)
-        return _df_to_table(df)
+        df = await query_to_dataframe(soql)
+        return _df_to_table(df, output_format=output_format)
     except Exception as e:
         return f"Error fetching work items: {e}"
 
 
 @mcp.tool()
-def sf_log_time(
+@session_limited
+@org_scoped
+@metered
+async def sf_log_time(
     work_item_name: str,
     hours: float,
     date: str,
@@ -219,27 +783,19 @@ def sf_log_time(
     """
     try:
         # Validate hours
-        if hours <= 0:
-            return "Error: hours must be greater than 0."
-        if hours > 24:
-            return "Error: hours cannot exceed 24 for a single entry."
-
-        # Look up Work_Item__c by Name
-        lookup_soql = (
-            SOQLBuilder()
-            .select(["Id", "Name", "Subject__c"])
-            .from_object("Work_Item__c")
-            .where("Name", "=", work_item_name)
-            .limit(1)
-            .build()
-        )
-        result = get_sf().query(lookup_soql)
-        records = result.get("records", [])
-        if not records:
+        hours_error = _validate_hours(hours)
+        if hours_error:
+            return f"Error: {hours_error}"
+
+        # Resolve Work_Item__c by Name (no query when the index is warm)
+        org = _org()
+        sf = await org.get_async_sf()
+        work_item = (await org.work_item_index.resolve(sf, [work_item_name])).get(work_item_name)
+        if work_item is None:
             return f"Error: Work item '{work_item_name}' not found."
 
-        work_item_id = records[0]["Id"]
-        work_item_subject = records[0].get("Subject__c", "")
+        work_item_id = work_item["Id"]
+        work_item_subject = work_item.get("Subject__c", "")
 
         # Create Time_Entry__c
         entry_data: Dict[str, Any] = {
@@ -250,7 +806,13 @@ def sf_log_time(
         if notes:
             entry_data["Notes__c"] = notes
 
-        create_result = get_sf().Time_Entry__c.create(entry_data)
+        try:
+            create_result = await sf.create("Time_Entry__c", entry_data)
+        except Exception:
+            org.work_item_index.evict(work_item_name)
+            raise
+        finally:
+            org.query_cache.invalidate(*TIME_ENTRY_WRITE_OBJECTS)
         new_id = create_result.get("id", "unknown")
 
         return (
@@ -265,8 +827,96 @@ def sf_log_time(
         return f"Error logging time: {e}"
 
 
+class TimeEntryInput(BaseModel):
+    """One row of a sf_log_time_batch request."""
+
+    work_item_name: str = Field(description='Work item auto-number Name, e.g. "WI-0005"')
+    hours: float = Field(description="Hours to log (must be > 0 and <= 24)")
+    date: str = Field(description="Date of the time entry in YYYY-MM-DD format")
+    notes: str = Field(default="", description="Optional description of work performed")
+
+
+@mcp.tool()
+@session_limited
+@org_scoped
+@metered
+async def sf_log_time_batch(entries: List[TimeEntryInput]) -> str:
+    """
+    Log many time entries at once (e.g. a full week of time).
+
+    All work item names are resolved with a single query, hours are
+    validated locally with the same rules as sf_log_time, and valid rows are
+    inserted via sObject Collections in chunks of 200. Invalid rows are
+    reported and skipped; they do not block the rest of the batch.
+
+    Parameters:
+    - entries: List of {work_item_name, hours, date, notes}
+
+    Returns a per-row report of created entries and errors.
+    """
+    try:
+        if not entries:
+            return "Error: no entries provided."
+
+        org = _org()
+        sf = await org.get_async_sf()
+        work_items = await org.work_item_index.resolve(
+            sf, [e.work_item_name for e in entries]
+        )
+
+        # Validate locally; only rows that pass are sent to Salesforce.
+        row_results: List[str] = [""] * len(entries)
+        to_insert: List[Dict[str, Any]] = []
+        insert_rows: List[int] = []
+        for i, entry in enumerate(entries):
+            hours_error = _validate_hours(entry.hours)
+            if hours_error:
+                row_results[i] = f"Error: {hours_error}"
+                continue
+            work_item = work_items.get(entry.work_item_name)
+            if work_item is None:
+                row_results[i] = f"Error: Work item '{entry.work_item_name}' not found."
+                continue
+            entry_data: Dict[str, Any] = {
+                "Work_Item__c": work_item["Id"],
+                "Hours__c": entry.hours,
+                "Date__c": entry.date,
+            }
+            if entry.notes:
+                entry_data["Notes__c"] = entry.notes
+            to_insert.append(entry_data)
+            insert_rows.append(i)
+
+        if to_insert:
+            try:
+                results = await sf.insert_collection("Time_Entry__c", to_insert)
+            finally:
+                org.query_cache.invalidate(*TIME_ENTRY_WRITE_OBJECTS)
+            for i, result in zip(insert_rows, results):
+                if result.get("success"):
+                    row_results[i] = f"Created {result.get('id')}"
+                else:
+                    messages = "; ".join(
+                        err.get("message", str(err)) for err in result.get("errors", [])
+                    )
+                    row_results[i] = f"Error: {messages or 'insert failed'}"
+
+        created = sum(1 for r in row_results if r.startswith("Created"))
+        lines = [f"Logged {created} of {len(entries)} time entries.", ""]
+        for i, (entry, outcome) in enumerate(zip(entries, row_results), start=1):
+            lines.append(
+                f"  #{i} {entry.work_item_name} {entry.hours}h {entry.date}: {outcome}"
+            )
+        return "\n".join(lines)
+    except Exception as e:
+        return f"Error logging time batch: {e}"
+
+
 @mcp.tool()
-def sf_update_work_item_status(work_item_name: str, new_status: str) -> str:
+@session_limited
+@org_scoped
+@metered
+async def sf_update_work_item_status(work_item_name: str, new_status: str) -> str:
     """
     Update the status of a work item.
 
@@ -283,25 +933,24 @@ def sf_update_work_item_status(work_item_name: str, new_status: str) -> str:
                 f"Valid statuses: {', '.join(sorted(VALID_WORK_ITEM_STATUSES))}"
             )
 
-        # Look up Work_Item__c by Name
-        lookup_soql = (
-            SOQLBuilder()
-            .select(["Id", "Name", "Status__c", "Subject__c"])
-            .from_object("Work_Item__c")
-            .where("Name", "=", work_item_name)
-            .limit(1)
-            .build()
-        )
-        result = get_sf().query(lookup_soql)
-        records = result.get("records", [])
-        if not records:
+        # Resolve Work_Item__c by Name (no query when the index is warm)
+        org = _org()
+        sf = await org.get_async_sf()
+        work_item = (await org.work_item_index.resolve(sf, [work_item_name])).get(work_item_name)
+        if work_item is None:
             return f"Error: Work item '{work_item_name}' not found."
 
-        work_item = records[0]
         old_status = work_item.get("Status__c", "unknown")
         work_item_id = work_item["Id"]
 
-        get_sf().Work_Item__c.update(work_item_id, {"Status__c": new_status})
+        try:
+            await sf.update("Work_Item__c", work_item_id, {"Status__c": new_status})
+        except Exception:
+            org.work_item_index.evict(work_item_name)
+            raise
+        finally:
+            org.query_cache.invalidate(*STATUS_WRITE_OBJECTS)
+        org.work_item_index.record(work_item_name, Status__c=new_status)
 
         return (
             f"Status updated successfully.\n"
@@ -313,17 +962,160 @@ def sf_update_work_item_status(work_item_name: str, new_status: str) -> str:
         return f"Error updating status: {e}"
 
 
+class StatusUpdateInput(BaseModel):
+    """One row of a sf_update_work_item_status_batch request."""
+
+    work_item_name: str = Field(description='Work item auto-number Name, e.g. "WI-0005"')
+    new_status: str = Field(description="One of: To Do, In Progress, Done, Blocked")
+
+
+# Filter-based batch updates refuse to touch more than this many items.
+MAX_BATCH_STATUS_UPDATES = 2000
+
+
 @mcp.tool()
-def sf_get_project_summary(project_name: str) -> str:
+@session_limited
+@org_scoped
+@metered
+async def sf_update_work_item_status_batch(
+    updates: Optional[List[StatusUpdateInput]] = None,
+    where: Optional[str] = None,
+    new_status: Optional[str] = None,
+) -> str:
+    """
+    Update the status of many work items at once (e.g. at sprint close).
+
+    Either pass explicit (name, status) pairs in `updates`, or pass a SOQL
+    `where` filter on Work_Item__c together with a single `new_status`.
+    Current statuses are read with one pre-fetch query, then the changes are
+    sent as sObject Collection updates of 200 records each.
+
+    Parameters:
+    - updates: List of {work_item_name, new_status}
+    - where: SOQL WHERE clause (without 'WHERE'), e.g. "Project__r.Name = 'Alpha'
+      AND Status__c = 'In Progress'"
+    - new_status: Status applied to every item matched by `where`
+
+    Returns old/new status per item and any per-item errors.
+    """
+    try:
+        if bool(updates) == bool(where):
+            return "Error: provide either `updates` or `where` (with `new_status`), not both."
+
+        org = _org()
+        sf = await org.get_async_sf()
+        targets: List[Tuple[str, str]] = []  # (work item name, new status)
+        row_results: Dict[int, str] = {}
+
+        if updates:
+            seen: Dict[str, int] = {}
+            for i, update in enumerate(updates):
+                name = update.work_item_name
+                if update.new_status not in VALID_WORK_ITEM_STATUSES:
+                    row_results[i] = f"Error: Invalid status '{update.new_status}'."
+                elif name_key(name) in seen:
+                    row_results[i] = f"Error: duplicate of row #{seen[name_key(name)] + 1}."
+                else:
+                    seen[name_key(name)] = i
+                targets.append((name, update.new_status))
+
+            names = sorted(seen)
+            prefetch_soqls = [
+                SOQLBuilder()
+                .select(INDEX_FIELDS)
+                .from_object("Work_Item__c")
+                .where_in("Name", names[j:j + RESOLVE_CHUNK_SIZE])
+                .build()
+                for j in range(0, len(names), RESOLVE_CHUNK_SIZE)
+            ]
+            prefetch = await sf.query_batch(prefetch_soqls) if prefetch_soqls else []
+            records = [r for result in prefetch for r in result.get("records", [])]
+        else:
+            if new_status not in VALID_WORK_ITEM_STATUSES:
+                return (
+                    f"Error: Invalid status '{new_status}'. "
+                    f"Valid statuses: {', '.join(sorted(VALID_WORK_ITEM_STATUSES))}"
+                )
+            prefetch_soql = (
+                SOQLBuilder()
+                .select(INDEX_FIELDS)
+                .from_object("Work_Item__c")
+                .where_raw(where)
+                .order_by("Name", "ASC")
+                .limit(MAX_BATCH_STATUS_UPDATES + 1)
+                .build()
+            )
+            records = (await sf.query_all(prefetch_soql)).get("records", [])
+            if len(records) > MAX_BATCH_STATUS_UPDATES:
+                return (
+                    f"Error: filter matches more than {MAX_BATCH_STATUS_UPDATES} "
+                    f"work items. Narrow the `where` clause."
+                )
+            if not records:
+                return "No work items match the filter."
+            targets = [(r["Name"], new_status) for r in records]
+
+        org.work_item_index.remember(records)
+        by_name = {name_key(r["Name"]): r for r in records}
+
+        # Build the PATCH payload, skipping items already at the target status.
+        to_update: List[Dict[str, Any]] = []
+        update_rows: List[int] = []
+        for i, (name, status) in enumerate(targets):
+            if i in row_results:
+                continue
+            record = by_name.get(name_key(name))
+            if record is None:
+                row_results[i] = f"Error: Work item '{name}' not found."
+            elif record.get("Status__c") == status:
+                row_results[i] = "Unchanged (already at target status)."
+            else:
+                to_update.append({"id": record["Id"], "Status__c": status})
+                update_rows.append(i)
+
+        if to_update:
+            try:
+                results = await sf.update_collection("Work_Item__c", to_update)
+            finally:
+                org.query_cache.invalidate(*STATUS_WRITE_OBJECTS)
+            for i, result in zip(update_rows, results):
+                name, status = targets[i]
+                if result.get("success"):
+                    row_results[i] = f"{by_name[name_key(name)].get('Status__c')} -> {status}"
+                    org.work_item_index.record(name, Status__c=status)
+                else:
+                    messages = "; ".join(
+                        err.get("message", str(err)) for err in result.get("errors", [])
+                    )
+                    row_results[i] = f"Error: {messages or 'update failed'}"
+
+        updated = sum(1 for r in row_results.values() if " -> " in r)
+        lines = [f"Updated {updated} of {len(targets)} work items.", ""]
+        for i, (name, _) in enumerate(targets):
+            subject = (by_name.get(name_key(name)) or {}).get("Subject__c") or ""
+            lines.append(f"  {name} {subject}: {row_results[i]}")
+        return "\n".join(lines)
+    except Exception as e:
+        return f"Error updating statuses: {e}"
+
+
+@mcp.tool()
+@session_limited
+@org_scoped
+@metered
+async def sf_get_project_summary(project_name: str, output_format: str = "table") -> str:
     """
     Get a comprehensive summary of a project including status breakdown,
     overdue items, blocked items, and burn rate.
 
     Parameters:
     - project_name: The name of the Project__c record
+    - output_format: "table" (default), "csv", "jsonl" or "markdown"
 
     Returns a formatted project summary with key metrics.
     """
+    if (format_error := validate_format(output_format)) is not None:
+        return f"Error: {format_error}"
     try:
         # Fetch the project record
         proj_soql = (
@@ -342,13 +1134,10 @@ def sf_get_project_summary(project_name: str) -> str:
             .limit(1)
             .build()
         )
-        proj_result = get_sf().query(proj_soql)
-        proj_records = proj_result.get("records", [])
-        if not proj_records:
-            return f"Error: Project '{project_name}' not found."
-
-        project = proj_records[0]
-        project_id = project["Id"]
+        # Project Name is not unique, so the child queries filter on the Id
+        # of the project shown in the header. A Composite request lets them
+        # refer to that Id, and all four queries go out in one call.
+        project_id = "@{proj.records[0].Id}"
 
         # Work items grouped by status
         status_soql = (
@@ -359,10 +1148,8 @@ def sf_get_project_summary(project_name: str) -> str:
             .group_by("Status__c")
             .build()
         )
-        status_df = query_to_dataframe(status_soql)
 
         # Overdue items
-        today = _today_soql()
         overdue_soql = (
             SOQLBuilder()
             .select(["Name", "Subject__c", "Due_Date__c", "Status__c", "Assigned_To__r.Name"])
@@ -374,7 +1161,6 @@ def sf_get_project_summary(project_name: str) -> str:
             .limit(50)
             .build()
         )
-        overdue_df = query_to_dataframe(overdue_soql)
 
         # Blocked items
         blocked_soql = (
@@ -386,7 +1172,33 @@ def sf_get_project_summary(project_name: str) -> str:
             .limit(50)
             .build()
         )
-        blocked_df = query_to_dataframe(blocked_soql)
+
+        sf = await get_async_sf()
+        results = await sf.query_composite(
+            {
+                "proj": proj_soql,
+                "status": status_soql,
+                "overdue": overdue_soql,
+                "blocked": blocked_soql,
+            },
+        )
+        proj_result = results["proj"]
+        if isinstance(proj_result, Exception):
+            raise proj_result
+        proj_records = proj_result.get("records", [])
+        if not proj_records:
+            return f"Error: Project '{project_name}' not found."
+        for result in results.values():
+            if isinstance(result, Exception):
+                raise result
+
+        project = proj_records[0]
+        status_result, overdue_result, blocked_result = (
+            results["status"], results["overdue"], results["blocked"]
+        )
+        status_df = records_to_dataframe(status_result.get("records", []), status_soql)
+        overdue_df = records_to_dataframe(overdue_result.get("records", []), overdue_soql)
+        blocked_df = records_to_dataframe(blocked_result.get("records", []), blocked_soql)
 
         # Build summary
         lines: List[str] = []
@@ -407,21 +1219,21 @@ def sf_get_project_summary(project_name: str) -> str:
         if status_df.empty:
             lines.append("  No work items found.")
         else:
-            lines.append(_df_to_table(status_df))
+            lines.append(_df_to_table(status_df, output_format=output_format))
 
         lines.append("")
         lines.append(f"--- Overdue Items ({len(overdue_df)}) ---")
         if overdue_df.empty:
             lines.append("  None - all items are on track!")
         else:
-            lines.append(_df_to_table(overdue_df))
+            lines.append(_df_to_table(overdue_df, output_format=output_format))
 
         lines.append("")
         lines.append(f"--- Blocked Items ({len(blocked_df)}) ---")
         if blocked_df.empty:
             lines.append("  None - no blockers!")
         else:
-            lines.append(_df_to_table(blocked_df))
+            lines.append(_df_to_table(blocked_df, output_format=output_format))
 
         return "\n".join(lines)
     except Exception as e:
@@ -434,7 +1246,10 @@ def sf_get_project_summary(project_name: str) -> str:
 
 
 @mcp.tool()
-def sf_estimate_accuracy(group_by: str = "type") -> str:
+@session_limited
+@org_scoped
+@metered
+async def sf_estimate_accuracy(group_by: str = "type", output_format: str = "table") -> str:
     """
     Analyze estimation accuracy for completed work items.
 
@@ -445,9 +1260,12 @@ def sf_estimate_accuracy(group_by: str = "type") -> str:
     - group_by: How to group results. Options: "type" (Type__c),
       "project" (Project__r.Name), or "priority" (Priority__c).
       Defaults to "type".
+    - output_format: "table" (default), "csv", "jsonl" or "markdown"
 
     Returns a table showing estimation accuracy percentages per group.
     """
+    if (format_error := validate_format(output_format)) is not None:
+        return f"Error: {format_error}"
     try:
         group_field_map = {
             "type": "Type__c",
@@ -461,38 +1279,42 @@ def sf_estimate_accuracy(group_by: str = "type") -> str:
                 f"Options: type, project, priority"
             )
 
+        # Aggregate in Salesforce: one row per group instead of every item.
         soql = (
             SOQLBuilder()
             .select([
-                "Id",
-                "Name",
-                group_field,
-                "Estimated_Hours__c",
-                "Actual_Hours__c",
+                f"{group_field} grp",
+                "COUNT(Id) items",
+                "SUM(Estimated_Hours__c) total_estimated",
+                "SUM(Actual_Hours__c) total_actual",
             ])
             .from_object("Work_Item__c")
             .where("Status__c", "=", "Done")
             .where_not_null("Estimated_Hours__c")
             .where_not_null("Actual_Hours__c")
-            .limit(2000)
+            .group_by(group_field)
             .build()
         )
-        df = query_to_dataframe(soql)
-        if df.empty:
+        replica_group_col = {
+            "Type__c": "w.Type__c",
+            "Project__r.Name": "p.Name",
+            "Priority__c": "w.Priority__c",
+        }[group_field]
+        replica_sql = (
+            f"SELECT {replica_group_col} AS grp, COUNT(w.Id) AS items, "
+            "SUM(w.Estimated_Hours__c) AS total_estimated, "
+            "SUM(w.Actual_Hours__c) AS total_actual "
+            "FROM work_item w LEFT JOIN project p ON p.Id = w.Project__c "
+            "WHERE w.Status__c = 'Done' AND w.Estimated_Hours__c IS NOT NULL "
+            f"AND w.Actual_Hours__c IS NOT NULL GROUP BY {replica_group_col}"
+        )
+        grouped = await analytics_dataframe(soql, replica_sql)
+        if grouped.empty:
             return "No completed work items with both estimated and actual hours found."
 
-        # The group field might be flattened (e.g. Project__r.Name)
-        col = group_field if group_field in df.columns else group_field.replace(".", "_")
-        if col not in df.columns:
-            # Try to find a column that ends with the field name
-            matching = [c for c in df.columns if c.endswith(group_field.split(".")[-1])]
-            col = matching[0] if matching else group_field
-
-        grouped = df.groupby(col).agg(
-            items=("Id", "count"),
-            total_estimated=("Estimated_Hours__c", "sum"),
-            total_actual=("Actual_Hours__c", "sum"),
-        ).reset_index()
+        grouped = grouped.rename(columns={"grp": group_field})[
+            [group_field, "items", "total_estimated", "total_actual"]
+        ]
 
         grouped["accuracy_%"] = (
             grouped["total_actual"] / grouped["total_estimated"] * 100
@@ -500,10 +1322,10 @@ def sf_estimate_accuracy(group_by: str = "type") -> str:
         grouped["overrun_%"] = (grouped["accuracy_%"] - 100).round(1)
 
         lines = [f"=== Estimation Accuracy by {group_by.title()} ===", ""]
-        lines.append(grouped.to_string(index=False))
+        lines.append(_df_to_table(grouped, output_format=output_format))
         lines.append("")
-        overall_est = df["Estimated_Hours__c"].sum()
-        overall_act = df["Actual_Hours__c"].sum()
+        overall_est = grouped["total_estimated"].sum()
+        overall_act = grouped["total_actual"].sum()
         overall_pct = (overall_act / overall_est * 100) if overall_est > 0 else 0
         lines.append(
             f"Overall: {overall_act:.1f}h actual / {overall_est:.1f}h estimated "
@@ -515,49 +1337,55 @@ def sf_estimate_accuracy(group_by: str = "type") -> str:
 
 
 @mcp.tool()
-def sf_weekly_utilization(weeks: int = 2) -> str:
+@session_limited
+@org_scoped
+@metered
+async def sf_weekly_utilization(weeks: int = 2, output_format: str = "table") -> str:
     """
     Show a weekly utilization report from time entries.
 
-    Queries Time_Entry__c for the last N weeks and creates a pivot table
-    showing hours logged per project per day, with daily totals and
+    Sums Time_Entry__c hours per project per day for the last N weeks (in
+    Salesforce) and creates a pivot table with daily totals and
     utilization percentage (based on an 8-hour workday).
 
     Parameters:
     - weeks: Number of past weeks to include (default: 2)
+    - output_format: "table" (default), "csv", "jsonl" or "markdown"
 
     Returns a formatted pivot table with utilization metrics.
     """
+    if (format_error := validate_format(output_format)) is not None:
+        return f"Error: {format_error}"
     try:
         n_days = weeks * 7
+        proj_col = "Work_Item__r.Project__r.Name"
+        # Aggregate in Salesforce: one row per project per day.
         soql = (
             SOQLBuilder()
             .select([
-                "Id",
-                "Date__c",
-                "Hours__c",
-                "Work_Item__r.Project__r.Name",
+                f"{proj_col} project",
+                "Date__c day_date",
+                "SUM(Hours__c) hours",
             ])
             .from_object("Time_Entry__c")
             .where("Date__c", ">=", f"LAST_N_DAYS:{n_days}")
-            .order_by("Date__c", "ASC")
-            .limit(5000)
+            .group_by([proj_col, "Date__c"])
             .build()
         )
-        df = query_to_dataframe(soql)
+        replica_sql = (
+            "SELECT p.Name AS project, t.Date__c AS day_date, SUM(t.Hours__c) AS hours "
+            "FROM time_entry t "
+            "LEFT JOIN work_item w ON w.Id = t.Work_Item__c "
+            "LEFT JOIN project p ON p.Id = w.Project__c "
+            "WHERE t.Date__c >= ? GROUP BY p.Name, t.Date__c"
+        )
+        df = await analytics_dataframe(soql, replica_sql, (_days_ago(n_days),))
         if df.empty:
             return f"No time entries found in the last {weeks} week(s)."
 
-        # Identify the project name column
-        proj_col = None
-        for c in df.columns:
-            if "Project" in c and "Name" in c:
-                proj_col = c
-                break
-        if proj_col is None:
-            proj_col = "Work_Item__r.Project__r.Name"
-
-        df["Date__c"] = pd.to_datetime(df["Date__c"])
+        df = df.rename(columns={"project": proj_col, "hours": "Hours__c"})
+        df["Date__c"] = pd.to_datetime(df["day_date"])
+        df = df.sort_values("Date__c")
         df["day"] = df["Date__c"].dt.strftime("%a %m/%d")
 
         pivot = df.pivot_table(
@@ -571,7 +1399,7 @@ def sf_weekly_utilization(weeks: int = 2) -> str:
         )
 
         lines = [f"=== Weekly Utilization (last {weeks} weeks) ===", ""]
-        lines.append(pivot.to_string())
+        lines.append(_df_to_table(pivot, output_format=output_format, index=True))
 
         # Daily utilization
         lines.append("")
@@ -589,46 +1417,64 @@ def sf_weekly_utilization(weeks: int = 2) -> str:
 
 
 @mcp.tool()
-def sf_velocity_trend(weeks: int = 6) -> str:
+@session_limited
+@org_scoped
+@metered
+async def sf_velocity_trend(weeks: int = 6, output_format: str = "table") -> str:
     """
     Show the team's velocity trend over recent weeks.
 
-    Queries completed work items by Completed_Date__c, groups them by
-    ISO week, counts items completed per week, and calculates a 4-week
-    rolling average with trend indicators.
+    Counts completed work items per Completed_Date__c in Salesforce, rolls
+    the daily counts up by ISO week, and calculates a 4-week rolling
+    average with trend indicators.
 
     Parameters:
     - weeks: Number of past weeks to analyze (default: 6)
+    - output_format: "table" (default), "csv", "jsonl" or "markdown"
 
     Returns a formatted table with weekly velocity and trend arrows.
     """
+    if (format_error := validate_format(output_format)) is not None:
+        return f"Error: {format_error}"
     try:
         n_days = weeks * 7
+        # Aggregate per completion day in Salesforce; SOQL has no ISO-week
+        # function, so the days are rolled up into ISO weeks here.
         soql = (
             SOQLBuilder()
-            .select(["Id", "Completed_Date__c", "Estimated_Hours__c", "Actual_Hours__c"])
+            .select([
+                "Completed_Date__c completed",
+                "COUNT(Id) items",
+                "SUM(Actual_Hours__c) hours",
+            ])
             .from_object("Work_Item__c")
             .where("Status__c", "=", "Done")
             .where("Completed_Date__c", ">=", f"LAST_N_DAYS:{n_days}")
             .where_not_null("Completed_Date__c")
-            .order_by("Completed_Date__c", "ASC")
-            .limit(5000)
+            .group_by("Completed_Date__c")
             .build()
         )
-        df = query_to_dataframe(soql)
+        replica_sql = (
+            "SELECT Completed_Date__c AS completed, COUNT(Id) AS items, "
+            "SUM(Actual_Hours__c) AS hours FROM work_item "
+            "WHERE Status__c = 'Done' AND Completed_Date__c >= ? "
+            "AND Completed_Date__c IS NOT NULL GROUP BY Completed_Date__c"
+        )
+        df = await analytics_dataframe(soql, replica_sql, (_days_ago(n_days),))
         if df.empty:
             return f"No completed items found in the last {weeks} weeks."
 
-        df["Completed_Date__c"] = pd.to_datetime(df["Completed_Date__c"])
-        df["iso_week"] = df["Completed_Date__c"].dt.isocalendar().week.astype(int)
-        df["iso_year"] = df["Completed_Date__c"].dt.isocalendar().year.astype(int)
-        df["week_label"] = df["iso_year"].astype(str) + "-W" + df["iso_week"].astype(str).str.zfill(2)
+        df["completed"] = pd.to_datetime(df["completed"])
+        iso = df["completed"].dt.isocalendar()
+        df["week_label"] = (
+            iso["year"].astype(int).astype(str) + "-W" + iso["week"].astype(int).astype(str).str.zfill(2)
+        )
 
         weekly = (
             df.groupby("week_label")
             .agg(
-                items_completed=("Id", "count"),
-                total_hours=("Actual_Hours__c", "sum"),
+                items_completed=("items", "sum"),
+                total_hours=("hours", "sum"),
             )
             .reset_index()
             .sort_values("week_label")
@@ -655,7 +1501,7 @@ def sf_velocity_trend(weeks: int = 6) -> str:
         weekly["trend"] = trends
 
         lines = [f"=== Velocity Trend (last {weeks} weeks) ===", ""]
-        lines.append(weekly.to_string(index=False))
+        lines.append(_df_to_table(weekly, output_format=output_format))
         lines.append("")
         avg_velocity = weekly["items_completed"].mean()
         lines.append(f"Average velocity: {avg_velocity:.1f} items/week")
@@ -666,7 +1512,10 @@ def sf_velocity_trend(weeks: int = 6) -> str:
 
 
 @mcp.tool()
-def sf_scope_estimate(work_type: str, gut_estimate: float) -> str:
+@session_limited
+@org_scoped
+@metered
+async def sf_scope_estimate(work_type: str, gut_estimate: float) -> str:
     """
     Provide a data-driven scope estimate based on historical actuals.
 
@@ -692,7 +1541,12 @@ def sf_scope_estimate(work_type: str, gut_estimate: float) -> str:
             .limit(5000)
             .build()
         )
-        df = query_to_dataframe(soql)
+        replica_sql = (
+            "SELECT Id, Estimated_Hours__c, Actual_Hours__c FROM work_item "
+            "WHERE Status__c = 'Done' AND Type__c = ? "
+            "AND Estimated_Hours__c IS NOT NULL AND Actual_Hours__c IS NOT NULL LIMIT 5000"
+        )
+        df = await analytics_dataframe(soql, replica_sql, (work_type,))
         if df.empty:
             return (
                 f"No completed '{work_type}' items with estimate data found. "
@@ -751,7 +1605,10 @@ def sf_scope_estimate(work_type: str, gut_estimate: float) -> str:
 
 
 @mcp.tool()
-def sf_daily_budget(target_hours: float = 8.0) -> str:
+@session_limited
+@org_scoped
+@metered
+async def sf_daily_budget(target_hours: float = 8.0, output_format: str = "table") -> str:
     """
     Generate a morning briefing showing today's work budget.
 
@@ -761,9 +1618,12 @@ def sf_daily_budget(target_hours: float = 8.0) -> str:
 
     Parameters:
     - target_hours: Total hours available today (default: 8.0)
+    - output_format: "table" (default), "csv", "jsonl" or "markdown"
 
     Returns a morning briefing with today's workload and remaining capacity.
     """
+    if (format_error := validate_format(output_format)) is not None:
+        return f"Error: {format_error}"
     try:
         today = _today_soql()
         soql = (
@@ -786,7 +1646,7 @@ def sf_daily_budget(target_hours: float = 8.0) -> str:
             .limit(100)
             .build()
         )
-        df = query_to_dataframe(soql)
+        df = await query_to_dataframe(soql)
 
         lines = [
             f"=== Daily Budget - {datetime.date.today().strftime('%A, %B %d, %Y')} ===",
@@ -822,7 +1682,7 @@ def sf_daily_budget(target_hours: float = 8.0) -> str:
 
         lines.append("")
         lines.append("--- Today's Items ---")
-        lines.append(_df_to_table(df))
+        lines.append(_df_to_table(df, output_format=output_format))
 
         return "\n".join(lines)
     except Exception as e:
@@ -834,8 +1694,59 @@ def sf_daily_budget(target_hours: float = 8.0) -> str:
 # ===================================================================
 
 
+# Maximum number of rows sf_query renders.
+SF_QUERY_MAX_ROWS = 200
+
+
+async def _preflight(soql: str) -> Optional[str]:
+    """
+    Explain an ad-hoc query when SF_QUERY_PREFLIGHT is on, and return a
+    warning if Salesforce would scan a large table, else None. A failed
+    explain call is logged and never blocks the query itself.
+    """
+    preflight = _org().query_preflight
+    if not preflight.enabled:
+        return None
+    try:
+        sf = await get_async_sf()
+        plan = await preflight.check(sf, soql)
+    except Exception as e:
+        logger.warning("Query plan preflight failed: %s", e)
+        return None
+    if plan is None:
+        return None
+    try:
+        indexed = indexed_fields(await describe_sobject(plan.sobject_type))
+    except Exception:
+        indexed = None
+    return preflight.describe_problem(plan, indexed)
+
+
+async def _cursor_page(cursor: QueryCursor, output_format: str = "table") -> str:
+    """Fetch and render the next page of a cursor, with a paging footer."""
+    sf = await get_async_sf()
+    page = await _org().query_cursors.fetch(sf, cursor, SF_QUERY_MAX_ROWS)
+    if not page.rows:
+        return "No more records."
+    df = records_to_dataframe(page.rows, cursor.soql)
+    footer = f"\n(Rows {page.first_row}-{page.last_row} of {cursor.total_size}"
+    if page.exhausted:
+        footer += "; end of results)"
+    else:
+        footer += f"; next page: sf_query_next(cursor_id=\"{cursor.cursor_id}\"))"
+    return _df_to_table(df, max_rows=SF_QUERY_MAX_ROWS, output_format=output_format) + footer
+
+
 @mcp.tool()
-def sf_query(soql: str) -> str:
+@session_limited
+@org_scoped
+@metered
+async def sf_query(
+    soql: str,
+    include_total: bool = False,
+    paginate: bool = False,
+    output_format: str = "table",
+) -> str:
     """
     Execute an arbitrary read-only SOQL query against Salesforce.
 
@@ -844,28 +1755,102 @@ def sf_query(soql: str) -> str:
 
     Parameters:
     - soql: A valid SOQL query string
-
-    Returns the query results as a formatted text table.
+    - include_total: if True and the result is truncated, also run a cheap
+      COUNT() query to report the total number of matching records
+    - paginate: if True, open a cursor over the full result; the footer
+      gives a cursor_id for sf_query_next to fetch the following pages
+      without re-running the query
+    - output_format: "table" (default), "csv", "jsonl" or "markdown"
+
+    Returns the query results as a formatted text table. When the query
+    plan preflight is enabled, queries that would scan a large table get a
+    warning with indexed fields to filter on (or are refused).
     """
+    if (format_error := validate_format(output_format)) is not None:
+        return f"Error: {format_error}"
     try:
-        df = query_to_dataframe(soql)
-        if len(df) > 200:
-            df = df.head(200)
-            note = f"\n(Showing first 200 of {len(df)} records)"
-        else:
-            note = ""
-        return _df_to_table(df) + note
+        warning = await _preflight(soql)
+        if warning and _org().query_preflight.refuses:
+            return f"Error: {warning}"
+        prefix = f"Warning: {warning}\n\n" if warning else ""
+
+        if paginate:
+            sf = await get_async_sf()
+            with _metrics.statement(soql):
+                cursor = await _org().query_cursors.open(sf, soql)
+                return prefix + await _cursor_page(cursor, output_format)
+
+        # Push a LIMIT down so Salesforce never sends more than we show; one
+        # extra row tells us whether the result was truncated.
+        limited_soql = with_limit(soql, SF_QUERY_MAX_ROWS + 1)
+        chunks: List[pd.DataFrame] = []
+        rows = 0
+        # Close the generator on break so its page stream is released now.
+        async with contextlib.aclosing(iter_dataframe_chunks(limited_soql)) as stream:
+            async for chunk in stream:
+                chunks.append(chunk)
+                rows += len(chunk)
+                if rows > SF_QUERY_MAX_ROWS:
+                    break
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+        note = ""
+        if len(df) > SF_QUERY_MAX_ROWS:
+            df = df.head(SF_QUERY_MAX_ROWS)
+            total_soql = count_query(soql) if include_total else None
+            if total_soql:
+                sf = await get_async_sf()
+                total = (await sf.query(total_soql)).get("totalSize", 0)
+                note = f"\n(Showing first {SF_QUERY_MAX_ROWS} of {total} records"
+            else:
+                note = f"\n(Showing first {SF_QUERY_MAX_ROWS} records; more are available"
+            note += "; use paginate=True to page through all of them)"
+        return prefix + _df_to_table(df, max_rows=SF_QUERY_MAX_ROWS, output_format=output_format) + note
     except Exception as e:
         return f"Error executing SOQL: {e}"
 
 
 @mcp.tool()
-def sf_aggregate(
+@session_limited
+@org_scoped
+@metered
+async def sf_query_next(cursor_id: str, output_format: str = "table") -> str:
+    """
+    Fetch the next page of a query opened with sf_query(paginate=True).
+
+    Parameters:
+    - cursor_id: The cursor_id from the previous page's footer
+    - output_format: "table" (default), "csv", "jsonl" or "markdown"
+
+    Returns the next (up to) 200 records as a formatted text table. Cursors
+    expire after a period of inactivity; re-run sf_query if yours has.
+    """
+    if (format_error := validate_format(output_format)) is not None:
+        return f"Error: {format_error}"
+    try:
+        cursor = _org().query_cursors.get(cursor_id)
+        if cursor is None:
+            return (
+                f"Error: Cursor '{cursor_id}' not found. It may have expired or "
+                "reached the end of its results; re-run sf_query(paginate=True)."
+            )
+        with _metrics.statement(cursor.soql):
+            return await _cursor_page(cursor, output_format)
+    except Exception as e:
+        return f"Error fetching next page: {e}"
+
+
+@mcp.tool()
+@session_limited
+@org_scoped
+@metered
+async def sf_aggregate(
     object_name: str,
     aggregate_function: str,
     field: Optional[str] = None,
     group_by: Optional[str] = None,
     where: Optional[str] = None,
+    output_format: str = "table",
 ) -> str:
     """
     Execute an aggregate SOQL query (COUNT, SUM, AVG, MIN, MAX).
@@ -876,9 +1861,13 @@ def sf_aggregate(
     - field: The field to aggregate (not required for COUNT)
     - group_by: Optional field to group results by
     - where: Optional WHERE clause (without the 'WHERE' keyword)
+    - output_format: "table" (default), "csv", "jsonl" or "markdown"
 
-    Returns the aggregate results as a formatted table.
+    Returns the aggregate results as a formatted table. The where clause
+    goes through the same query plan preflight as sf_query.
     """
+    if (format_error := validate_format(output_format)) is not None:
+        return f"Error: {format_error}"
     try:
         agg = aggregate_function.upper().strip()
         valid_aggs = {"COUNT", "SUM", "AVG", "MIN", "MAX"}
@@ -907,14 +1896,21 @@ def sf_aggregate(
             soql_parts.append(f"GROUP BY {group_by}")
 
         soql = " ".join(soql_parts)
-        df = query_to_dataframe(soql)
-        return _df_to_table(df)
+        warning = await _preflight(soql)
+        if warning and _org().query_preflight.refuses:
+            return f"Error: {warning}"
+        df = await query_to_dataframe(soql)
+        table = _df_to_table(df, output_format=output_format)
+        return f"Warning: {warning}\n\n{table}" if warning else table
     except Exception as e:
         return f"Error executing aggregate query: {e}"
 
 
 @mcp.tool()
-def sf_describe_object(object_name: str) -> str:
+@session_limited
+@org_scoped
+@metered
+async def sf_describe_object(object_name: str) -> str:
     """
     Describe a Salesforce object's metadata including fields, types,
     picklist values, and relationships.
@@ -925,7 +1921,7 @@ def sf_describe_object(object_name: str) -> str:
     Returns a formatted description of the object's schema.
     """
     try:
-        desc = getattr(get_sf(), object_name).describe()
+        desc = await describe_sobject(object_name)
 
         lines = [
             f"=== {desc['label']} ({desc['name']}) ===",
@@ -969,9 +1965,184 @@ def sf_describe_object(object_name: str) -> str:
         return f"Error describing object '{object_name}': {e}"
 
 
+@mcp.tool()
+@session_limited
+@org_scoped
+@metered
+async def sf_api_usage(refresh: bool = True, output_format: str = "table") -> str:
+    """
+    Show Salesforce API consumption and the budgets this server enforces.
+
+    Reports the org's rolling 24-hour API usage (from the limits resource
+    and the Sforce-Limit-Info header on every response), this server's own
+    calls in the current budget window, per-tool counts, and whether the
+    budget is tight (in which case cached and replica answers are preferred).
+
+    Parameters:
+    - refresh: if True (default), read the limits resource for an exact
+      org figure; this costs one API call
+    - output_format: "table" (default), "csv", "jsonl" or "markdown"
+
+    Returns a formatted usage report.
+    """
+    if (format_error := validate_format(output_format)) is not None:
+        return f"Error: {format_error}"
+    try:
+        org = _org()
+        if refresh:
+            try:
+                sf = await org.get_async_sf()
+                org.api_governor.observe_limits(await sf.limits())
+            except Exception as e:
+                logger.warning("Could not read org limits: %s", e)
+
+        usage = org.api_governor.snapshot()
+        lines = [f"=== Salesforce API Usage ({org.name}) ===", ""]
+        if usage["org_max"]:
+            pct_left = usage["org_remaining"] / usage["org_max"] * 100
+            lines.append(
+                f"Org (rolling 24h): {usage['org_used']} of {usage['org_max']} used, "
+                f"{usage['org_remaining']} left ({pct_left:.1f}%)"
+            )
+        else:
+            lines.append("Org (rolling 24h): not yet known (no API responses seen)")
+        budget = usage["window_budget"] or "unlimited"
+        lines.append(
+            f"This server (last {usage['window']:.0f}s): "
+            f"{usage['window_calls']} calls, budget {budget}"
+        )
+        lines.append(
+            f"Reserve kept for other integrations: {SF_API_RESERVE_PERCENT:.0f}% of daily max"
+        )
+        lines.append(f"Refused calls: {usage['refused']}")
+        lines.append(
+            "Budget status: TIGHT - preferring cached and replica answers"
+            if usage["tight"]
+            else "Budget status: OK"
+        )
+
+        lines.append("")
+        lines.append("--- Calls by Tool ---")
+        if not usage["tools"]:
+            lines.append("  No tool has called Salesforce yet.")
+        else:
+            df = pd.DataFrame([
+                {
+                    "tool": tool,
+                    "window_calls": stats["window_calls"],
+                    "total_calls": stats["total_calls"],
+                    "budget": stats["budget"] or "unlimited",
+                }
+                for tool, stats in usage["tools"].items()
+            ])
+            lines.append(_df_to_table(df, output_format=output_format))
+        return "\n".join(lines)
+    except Exception as e:
+        return f"Error reading API usage: {e}"
+
+
+@mcp.tool()
+@session_limited
+@org_scoped
+@metered
+async def sf_server_stats(top: int = 10, output_format: str = "table") -> str:
+    """
+    Show latency metrics for this server's tools and SOQL statements.
+
+    Per tool and per SOQL statement (literals replaced by ?): call count,
+    errors, p50/p95/p99 wall time, and mean HTTP time, DataFrame
+    construction time, rows, pages and KB received. Also summarizes the
+    server's caches.
+
+    Parameters:
+    - top: How many statements to list, slowest total time first (default: 10)
+    - output_format: "table" (default), "csv", "jsonl" or "markdown"
+
+    Returns a formatted stats report.
+    """
+    if (format_error := validate_format(output_format)) is not None:
+        return f"Error: {format_error}"
+    try:
+        org = _org()
+        uptime = time.time() - _metrics.started_at
+        lines = ["=== Server Stats ===", "", f"Uptime: {uptime / 60:.1f} min"]
+        if len(_orgs) > 1:
+            connected = sum(1 for o in _orgs.active() if o.async_sf is not None)
+            lines.append(f"Org: {org.name} ({connected} of {len(_orgs)} orgs connected)")
+        if SF_MCP_TRANSPORT != "stdio":
+            lines.append(f"Client sessions: {len(_session_slots)} ({SF_MCP_TRANSPORT})")
+        lines.append(
+            f"Describe cache: {len(org.describe_cache)} entries, {org.describe_cache.hits} hits, "
+            f"{org.describe_cache.misses} misses, {org.describe_cache.revalidations} revalidated"
+        )
+        lines.append(f"Work item index: {len(org.work_item_index)} entries")
+        if org.query_cache.enabled:
+            lines.append(
+                f"Query cache: {len(org.query_cache)} entries, "
+                f"{org.query_cache.nbytes / 1024:.0f} KB, {org.query_cache.hits} hits, "
+                f"{org.query_cache.misses} misses, {org.query_cache.invalidations} invalidated"
+            )
+        lines.append(f"Open query cursors: {len(org.query_cursors)}")
+        if org.query_preflight.enabled:
+            lines.append(
+                f"Query plans ({org.query_preflight.mode}): {len(org.query_preflight)} cached, "
+                f"{org.query_preflight.hits} hits, {org.query_preflight.misses} explained, "
+                f"{org.query_preflight.flagged} flagged non-selective"
+            )
+        if org.replica is not None:
+            age = org.replica.staleness()
+            lines.append(
+                "Replica: never synced" if age is None else f"Replica: synced {age:.0f}s ago"
+            )
+        if org.async_sf is not None:
+            lines.append(
+                f"HTTP retries: {org.async_sf.retries}, "
+                f"session refreshes: {org.async_sf.session_refreshes}"
+            )
+
+        lines.append("")
+        lines.append("--- Tools ---")
+        tool_rows = _metrics.summary_rows("tools")
+        if not tool_rows:
+            lines.append("  No tool calls recorded yet.")
+        else:
+            df = pd.DataFrame(tool_rows).rename(columns={"key": "tool"})
+            lines.append(_df_to_table(
+                df.sort_values("total_s", ascending=False), output_format=output_format
+            ))
+
+        lines.append("")
+        lines.append(f"--- SOQL Statements (top {top} by total time) ---")
+        statement_rows = _metrics.summary_rows("statements")
+        if not statement_rows:
+            lines.append("  No queries recorded yet.")
+        else:
+            df = pd.DataFrame(statement_rows).rename(columns={"key": "soql"})
+            df = df.sort_values("total_s", ascending=False).head(top)
+            # Put the (long) statement last so the numbers stay aligned.
+            df = df[[c for c in df.columns if c != "soql"] + ["soql"]]
+            lines.append(_df_to_table(df, output_format=output_format))
+        return "\n".join(lines)
+    except Exception as e:
+        return f"Error reading server stats: {e}"
+
+
 # ===================================================================
 # Entry point
 # ===================================================================
 
+async def _serve_http() -> None:
+    """Serve all clients from this process; the warm-up starts right away."""
+    from mcp_http import check_exposure, serve
+
+    # Fail before logging in to any org.
+    check_exposure(mcp.settings.host, SF_MCP_AUTH_TOKEN)
+    async with _lifespan(mcp):
+        await serve(mcp, SF_MCP_TRANSPORT, SF_MCP_AUTH_TOKEN)
+
+
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    if SF_MCP_TRANSPORT == "stdio":
+        mcp.run(transport="stdio")
+    else:
+        asyncio.run(_serve_http())
@@ -0,0 +1,654 @@
+"""
+Asynchronous Salesforce REST client.
+
+Thin asyncio-native wrapper around the Salesforce REST API built on a pooled
+httpx.AsyncClient, so independent queries issued by one tool can be awaited
+concurrently and a slow call never blocks the event loop.
+
+Authentication is delegated to simple_salesforce: this client only needs an
+instance URL and a session ID. Error responses are routed through
+simple_salesforce's exception handler so callers see the same exception
+types (SalesforceMalformedRequest, SalesforceExpiredSession, ...) as before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
+from urllib.parse import urlencode
+
+import httpx
+from simple_salesforce.exceptions import (
+    SalesforceError,
+    SalesforceExpiredSession,
+    SalesforceGeneralError,
+    SalesforceMalformedRequest,
+    SalesforceRefusedRequest,
+    SalesforceResourceNotFound,
+)
+from simple_salesforce.util import exception_handler
+
+from api_governor import LIMIT_INFO_HEADER, parse_limit_info
+from metrics import record_http, record_page
+
+DEFAULT_API_VERSION = "59.0"
+
+# Salesforce caps a Composite Batch request at 25 subrequests.
+COMPOSITE_BATCH_LIMIT = 25
+
+# Salesforce caps a Composite request at 25 subrequests, of which at most 5
+# may be queries.
+COMPOSITE_QUERY_LIMIT = 5
+
+# Salesforce caps an sObject Collections request at 200 records.
+COLLECTION_LIMIT = 200
+
+# Error codes meaning the request was rejected without effect, so it is safe
+# to retry for any method (lock contention, concurrent-request limits).
+RETRYABLE_ERROR_CODES = {"UNABLE_TO_LOCK_ROW", "REQUEST_LIMIT_EXCEEDED", "SERVER_UNAVAILABLE"}
+
+# REQUEST_LIMIT_EXCEEDED also means the org's rolling API allowance is spent.
+# That does not recover for hours, and every retry would count against it.
+_ALLOWANCE_SPENT_RE = re.compile(r"\bTotalRequests\b", re.IGNORECASE)
+
+# Gateway errors and read failures may hide a request that was applied, so
+# they are retried only for methods that can safely be repeated.
+RETRYABLE_STATUSES = {502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Transport errors raised before the request reached Salesforce.
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+_SUBREQUEST_EXCEPTIONS = {
+    400: SalesforceMalformedRequest,
+    401: SalesforceExpiredSession,
+    403: SalesforceRefusedRequest,
+    404: SalesforceResourceNotFound,
+}
+
+
+@dataclass
+class QueryPage:
+    """One page of query results as returned by the REST query endpoint."""
+
+    records: List[Dict[str, Any]]
+    total_size: int
+    done: bool
+    next_records_url: Optional[str]
+    nbytes: int
+
+
+def _errors(response: httpx.Response) -> List[Dict[str, Any]]:
+    """Return the error entries ({"errorCode", "message"}) of a REST error response body."""
+    try:
+        body = response.json()
+    except ValueError:
+        return []
+    if isinstance(body, dict):
+        body = [body]
+    if not isinstance(body, list):
+        return []
+    return [e for e in body if isinstance(e, dict)]
+
+
+def _error_codes(response: httpx.Response) -> List[str]:
+    """Return the errorCode values of a REST error response body."""
+    return [e.get("errorCode", "") for e in _errors(response)]
+
+
+def _allowance_spent(response: httpx.Response) -> bool:
+    """True when a REQUEST_LIMIT_EXCEEDED response means the API allowance is used up."""
+    usage = parse_limit_info(response.headers.get(LIMIT_INFO_HEADER))
+    if usage is not None and usage[0] >= usage[1]:
+        return True
+    return any(
+        e.get("errorCode") == "REQUEST_LIMIT_EXCEEDED"
+        and _ALLOWANCE_SPENT_RE.search(str(e.get("message", "")))
+        for e in _errors(response)
+    )
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _subrequest_error(
+    url: str, status: int, content: Any, resource: str = "composite/batch"
+) -> SalesforceError:
+    """Build the SalesforceError matching a failed composite subrequest."""
+    exc_cls = _SUBREQUEST_EXCEPTIONS.get(status, SalesforceGeneralError)
+    return exc_cls(url, status, resource, content)
+
+
+class AsyncSalesforce:
+    """
+    Async Salesforce REST client sharing one pooled HTTP connection set.
+
+    Usage:
+        client = AsyncSalesforce(instance_url, session_id)
+        result = await client.query_all("SELECT Id FROM Work_Item__c")
+        await client.aclose()
+
+    With a session_refresher, an expired session (401) is renewed once per
+    request; concurrent requests that hit the expiry share one login.
+    Transient failures are retried up to max_retries times with jittered
+    exponential backoff.
+    """
+
+    def __init__(
+        self,
+        instance_url: str,
+        session_id: str,
+        version: str = DEFAULT_API_VERSION,
+        max_connections: int = 20,
+        timeout: float = 30.0,
+        connect_timeout: Optional[float] = None,
+        keepalive_expiry: float = 5.0,
+        gzip: bool = True,
+        event_hooks: Optional[Dict[str, List[Callable[..., Awaitable[None]]]]] = None,
+        wrap_transport: Optional[
+            Callable[[httpx.AsyncBaseTransport], httpx.AsyncBaseTransport]
+        ] = None,
+        session_refresher: Optional[Callable[[], Awaitable[str]]] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+    ) -> None:
+        self.instance_url = instance_url.rstrip("/")
+        self.session_id = session_id
+        self.version = version
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retries = 0
+        self.session_refreshes = 0
+        self._session_refresher = session_refresher
+        self._refresh_lock = asyncio.Lock()
+        self.base_url = f"{self.instance_url}/services/data/v{version}/"
+        transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+        if wrap_transport is not None:
+            transport = wrap_transport(transport)
+        self._client = httpx.AsyncClient(
+            headers={
+                "Authorization": f"Bearer {session_id}",
+                "Content-Type": "application/json",
+                "X-PrettyPrint": "0",
+                "Accept-Encoding": "gzip, deflate" if gzip else "identity",
+            },
+            transport=transport,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout or timeout),
+            event_hooks=event_hooks,
+        )
+
+    # -----------------------------------------------------------------
+    # Low-level HTTP
+    # -----------------------------------------------------------------
+
+    def _url(self, path: str) -> str:
+        """Resolve a REST path relative to the versioned data endpoint.
+
+        Absolute paths (e.g. nextRecordsUrl values, which start with
+        /services/data/...) are resolved against the instance URL instead.
+        """
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        if path.startswith("/"):
+            return f"{self.instance_url}{path}"
+        return f"{self.base_url}{path}"
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        name: str = "",
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request and raise the matching SalesforceError on failure.
+
+        Expired sessions are refreshed and transient failures retried (see
+        the class docstring) before an error is raised.
+        """
+        url = self._url(path)
+        attempt = 0
+        refreshed = False
+        while True:
+            session = self.session_id
+            start = time.perf_counter()
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                record_http(time.perf_counter() - start, 0)
+                retryable = isinstance(e, _NOT_SENT_ERRORS) or method in IDEMPOTENT_METHODS
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                await self._backoff(attempt)
+                attempt += 1
+                continue
+            record_http(time.perf_counter() - start, len(response.content))
+
+            status = response.status_code
+            if status == 401 and self._session_refresher is not None and not refreshed:
+                await self._refresh_session(session)
+                refreshed = True
+                continue
+            if status >= 300 and status != 304:
+                if attempt < self.max_retries and self._is_retryable(method, response):
+                    await self._backoff(attempt, response)
+                    attempt += 1
+                    continue
+                exception_handler(response, name)
+            return response
+
+    @staticmethod
+    def _is_retryable(method: str, response: httpx.Response) -> bool:
+        codes = _error_codes(response)
+        if "REQUEST_LIMIT_EXCEEDED" in codes and _allowance_spent(response):
+            return False
+        if any(code in RETRYABLE_ERROR_CODES for code in codes):
+            return True
+        return response.status_code in RETRYABLE_STATUSES and method in IDEMPOTENT_METHODS
+
+    async def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> None:
+        delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.backoff_cap))
+        self.retries += 1
+        await asyncio.sleep(delay)
+
+    async def _refresh_session(self, stale_session: str) -> None:
+        """Single-flight re-authentication after a 401."""
+        async with self._refresh_lock:
+            if self.session_id != stale_session:
+                return  # another request already logged in again
+            self.session_id = await self._session_refresher()
+            self._client.headers["Authorization"] = f"Bearer {self.session_id}"
+            self.session_refreshes += 1
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self._client.aclose()
+
+    # -----------------------------------------------------------------
+    # Query
+    # -----------------------------------------------------------------
+
+    async def query(self, soql: str) -> Dict[str, Any]:
+        """Run a SOQL query and return the first page of results."""
+        response = await self.request("GET", "query/", params={"q": soql})
+        result = response.json()
+        record_page(len(result.get("records", [])))
+        return result
+
+    async def query_more(self, next_records_url: str) -> Dict[str, Any]:
+        """Fetch the next page of a query using its nextRecordsUrl."""
+        response = await self.request("GET", next_records_url)
+        result = response.json()
+        record_page(len(result.get("records", [])))
+        return result
+
+    async def query_pages(self, soql: str) -> AsyncIterator[QueryPage]:
+        """
+        Run a SOQL query and yield its pages one at a time.
+
+        Pages are fetched lazily via nextRecordsUrl, so a consumer that stops
+        iterating early never downloads the remaining pages, and only one
+        page of raw JSON is held in memory at a time.
+        """
+        response = await self.request("GET", "query/", params={"q": soql})
+        while True:
+            result = response.json()
+            next_url = result.get("nextRecordsUrl")
+            done = result.get("done", True)
+            record_page(len(result.get("records", [])))
+            yield QueryPage(
+                records=result.get("records", []),
+                total_size=result.get("totalSize", 0),
+                done=done,
+                next_records_url=next_url,
+                nbytes=len(response.content),
+            )
+            if done or not next_url:
+                return
+            del result
+            response = await self.request("GET", next_url)
+
+    async def explain(self, soql: str) -> Dict[str, Any]:
+        """Return the optimizer's query plans for soql without running it."""
+        response = await self.request("GET", "query/", params={"explain": soql})
+        return response.json()
+
+    async def query_all(self, soql: str) -> Dict[str, Any]:
+        """Run a SOQL query and follow nextRecordsUrl until all pages are read."""
+        records: List[Dict[str, Any]] = []
+        async for page in self.query_pages(soql):
+            records.extend(page.records)
+        return {"totalSize": len(records), "done": True, "records": records}
+
+    # -----------------------------------------------------------------
+    # Composite batch
+    # -----------------------------------------------------------------
+
+    async def composite_batch(
+        self,
+        batch_requests: List[Dict[str, Any]],
+        halt_on_error: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Send up to 25 subrequests in one Composite Batch call.
+
+        Each subrequest is a dict with "method" and a version-relative "url"
+        (e.g. "v59.0/query/?q=..."). Returns the per-subrequest results, each
+        a dict with "statusCode" and "result", in request order.
+        """
+        if len(batch_requests) > COMPOSITE_BATCH_LIMIT:
+            raise ValueError(
+                f"Composite batch accepts at most {COMPOSITE_BATCH_LIMIT} "
+                f"subrequests, got {len(batch_requests)}."
+            )
+        response = await self.request(
+            "POST",
+            "composite/batch",
+            json={"batchRequests": batch_requests, "haltOnError": halt_on_error},
+        )
+        return response.json().get("results", [])
+
+    async def query_batch(self, soqls: List[str]) -> List[Dict[str, Any]]:
+        """
+        Run several independent SOQL queries with as few HTTP calls as possible.
+
+        Queries are packed into Composite Batch requests of up to 25 and the
+        batches are sent concurrently. Any result that was truncated at the
+        page boundary is completed by following its nextRecordsUrl. Returns
+        one query_all()-style result dict per input query, in order; the first
+        failed subrequest is raised as the matching SalesforceError.
+        """
+        chunks = [
+            soqls[i:i + COMPOSITE_BATCH_LIMIT]
+            for i in range(0, len(soqls), COMPOSITE_BATCH_LIMIT)
+        ]
+        batch_results = await asyncio.gather(*(
+            self.composite_batch([
+                {
+                    "method": "GET",
+                    "url": f"v{self.version}/query/?{urlencode({'q': soql})}",
+                }
+                for soql in chunk
+            ])
+            for chunk in chunks
+        ))
+
+        results: List[Dict[str, Any]] = []
+        for chunk, sub_results in zip(chunks, batch_results):
+            for soql, sub in zip(chunk, sub_results):
+                status = sub.get("statusCode", 500)
+                if status >= 300:
+                    raise _subrequest_error(soql, status, sub.get("result"))
+                results.append(sub.get("result") or {})
+                record_page(len(results[-1].get("records", [])))
+
+        return list(await asyncio.gather(*(self._complete(r) for r in results)))
+
+    async def _complete(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Follow nextRecordsUrl from a first result page to a query_all()-style result."""
+        records: List[Dict[str, Any]] = list(result.get("records", []))
+        while not result.get("done", True) and result.get("nextRecordsUrl"):
+            result = await self.query_more(result["nextRecordsUrl"])
+            records.extend(result.get("records", []))
+        return {"totalSize": len(records), "done": True, "records": records}
+
+    # -----------------------------------------------------------------
+    # Composite
+    # -----------------------------------------------------------------
+
+    async def composite(
+        self,
+        subrequests: List[Dict[str, Any]],
+        all_or_none: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Send up to 25 dependent subrequests in one Composite call.
+
+        Each subrequest is a dict with "method", "referenceId" and an
+        absolute "url" (e.g. "/services/data/v59.0/query/?q=..."). Unlike a
+        Composite Batch, a subrequest can use an earlier one's result through
+        a reference such as @{proj.records[0].Id}. Returns the per-subrequest
+        responses, each a dict with "httpStatusCode", "body" and
+        "referenceId", in request order.
+        """
+        if len(subrequests) > COMPOSITE_BATCH_LIMIT:
+            raise ValueError(
+                f"Composite accepts at most {COMPOSITE_BATCH_LIMIT} "
+                f"subrequests, got {len(subrequests)}."
+            )
+        response = await self.request(
+            "POST",
+            "composite",
+            json={"allOrNone": all_or_none, "compositeRequest": subrequests},
+        )
+        return response.json().get("compositeResponse", [])
+
+    async def query_composite(
+        self,
+        soqls: Dict[str, str],
+        all_or_none: bool = False,
+    ) -> Dict[str, Union[Dict[str, Any], SalesforceError]]:
+        """
+        Run up to 5 SOQL queries, keyed by reference id, in one Composite call.
+
+        Queries run in order, so a query may refer to an earlier one's
+        result, e.g. "WHERE Project__c = '@{proj.records[0].Id}'". Returns a
+        query_all()-style result per reference id. A failed query maps to
+        its SalesforceError instead, like asyncio.gather(return_exceptions=True),
+        so the caller can check an earlier result (e.g. "no project found")
+        before deciding which failure to report. With all_or_none, one
+        failure rolls back the whole request and every other query reports
+        PROCESSING_HALTED, so reads should leave it off.
+        """
+        if len(soqls) > COMPOSITE_QUERY_LIMIT:
+            raise ValueError(
+                f"Composite accepts at most {COMPOSITE_QUERY_LIMIT} queries, "
+                f"got {len(soqls)}."
+            )
+        responses = await self.composite(
+            [
+                {
+                    "method": "GET",
+                    # Keep references readable: Salesforce resolves @{...}
+                    # before decoding the URL.
+                    "url": f"/services/data/v{self.version}/query/?"
+                    + urlencode({"q": soql}, safe="@{}[]"),
+                    "referenceId": ref,
+                }
+                for ref, soql in soqls.items()
+            ],
+            all_or_none=all_or_none,
+        )
+
+        results: Dict[str, Union[Dict[str, Any], SalesforceError]] = {}
+        pending: Dict[str, Dict[str, Any]] = {}
+        for (ref, soql), sub in zip(soqls.items(), responses):
+            status = sub.get("httpStatusCode", 500)
+            if status >= 300:
+                results[ref] = _subrequest_error(soql, status, sub.get("body"), "composite")
+                continue
+            pending[ref] = sub.get("body") or {}
+            record_page(len(pending[ref].get("records", [])))
+        completed = await asyncio.gather(*(self._complete(r) for r in pending.values()))
+        results.update(zip(pending, completed))
+        return {ref: results[ref] for ref in soqls if ref in results}
+
+    # -----------------------------------------------------------------
+    # sObject operations
+    # -----------------------------------------------------------------
+
+    async def create(self, sobject: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a record and return the REST response ({"id", "success", ...})."""
+        response = await self.request(
+            "POST", f"sobjects/{sobject}/", name=sobject, json=data
+        )
+        return response.json()
+
+    async def update(
+        self,
+        sobject: str,
+        record_id: str,
+        data: Dict[str, Any],
+    ) -> int:
+        """Update a record by Id and return the HTTP status code (204 on success)."""
+        response = await self.request(
+            "PATCH", f"sobjects/{sobject}/{record_id}", name=sobject, json=data
+        )
+        return response.status_code
+
+    async def limits(self) -> Dict[str, Any]:
+        """Return the org's limits (DailyApiRequests, etc.)."""
+        response = await self.request("GET", "limits/")
+        return response.json()
+
+    async def describe(
+        self,
+        sobject: str,
+        if_modified_since: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the full describe result for an sObject.
+
+        When if_modified_since (an HTTP date) is given and the metadata has
+        not changed since then, Salesforce answers 304 and None is returned.
+        """
+        headers = {"If-Modified-Since": if_modified_since} if if_modified_since else None
+        response = await self.request(
+            "GET", f"sobjects/{sobject}/describe/", name=sobject, headers=headers
+        )
+        if response.status_code == 304:
+            return None
+        return response.json()
+
+    async def get_deleted(
+        self,
+        sobject: str,
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return records of an sObject deleted between start and end.
+
+        Each entry is {"id", "deletedDate"}. Returns None when start lies
+        before the earliest date Salesforce still keeps deletion records
+        for, i.e. the caller can no longer sync incrementally.
+        """
+        fmt = "%Y-%m-%dT%H:%M:%S+00:00"
+        params = {
+            "start": start.astimezone(datetime.timezone.utc).strftime(fmt),
+            "end": end.astimezone(datetime.timezone.utc).strftime(fmt),
+        }
+        try:
+            response = await self.request(
+                "GET", f"sobjects/{sobject}/deleted/", name=sobject, params=params
+            )
+        except SalesforceMalformedRequest as e:
+            if "INVALID_REPLICATION_DATE" in str(e.content):
+                return None
+            raise
+        return response.json().get("deletedRecords", [])
+
+    # -----------------------------------------------------------------
+    # sObject Collections
+    # -----------------------------------------------------------------
+
+    async def insert_collection(
+        self,
+        sobject: str,
+        records: List[Dict[str, Any]],
+        all_or_none: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Create many records via sObject Collections, 200 per request.
+
+        Returns one {"id", "success", "errors"} dict per input record, in
+        order. Chunks are sent one after another: concurrent inserts under
+        the same master record contend for its roll-up lock.
+        """
+        return await self._send_collection("POST", sobject, records, all_or_none)
+
+    async def update_collection(
+        self,
+        sobject: str,
+        records: List[Dict[str, Any]],
+        all_or_none: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Update many records via sObject Collections, 200 per request.
+
+        Each record must carry its "id". Returns one {"id", "success",
+        "errors"} dict per input record, in order. Chunks are sent
+        sequentially for the same roll-up locking reason as inserts.
+        """
+        return await self._send_collection("PATCH", sobject, records, all_or_none)
+
+    async def _send_collection(
+        self,
+        method: str,
+        sobject: str,
+        records: List[Dict[str, Any]],
+        all_or_none: bool,
+    ) -> List[Dict[str, Any]]:
+        """
+        Send records in sequential chunks of 200. Records that failed only
+        on row-lock contention are re-sent (with backoff) unless all_or_none.
+        """
+        results: List[Dict[str, Any]] = []
+        for i in range(0, len(records), COLLECTION_LIMIT):
+            chunk = records[i:i + COLLECTION_LIMIT]
+            chunk_results: List[Optional[Dict[str, Any]]] = [None] * len(chunk)
+            pending = list(range(len(chunk)))
+            for attempt in range(self.max_retries + 1):
+                response = await self.request(
+                    method,
+                    "composite/sobjects",
+                    name=sobject,
+                    json={
+                        "allOrNone": all_or_none,
+                        "records": [
+                            {"attributes": {"type": sobject}, **chunk[j]} for j in pending
+                        ],
+                    },
+                )
+                locked = []
+                for j, result in zip(pending, response.json()):
+                    chunk_results[j] = result
+                    codes = {e.get("statusCode") for e in result.get("errors") or []}
+                    if not result.get("success") and "UNABLE_TO_LOCK_ROW" in codes:
+                        locked.append(j)
+                if not locked or all_or_none or attempt == self.max_retries:
+                    break
+                pending = locked
+                await self._backoff(attempt)
+            results.extend(chunk_results)
+        return results
+
+    def __repr__(self) -> str:
+        return f"AsyncSalesforce(instance_url={self.instance_url!r}, version={self.version!r})"
+
+
+def from_sync(sf: Any, **kwargs: Any) -> AsyncSalesforce:
+    """Build an AsyncSalesforce from an authenticated simple_salesforce client."""
+    return AsyncSalesforce(
+        instance_url=f"https://{sf.sf_instance}",
+        session_id=sf.session_id,
+        version=sf.sf_version,
+        **kwargs,
+    )
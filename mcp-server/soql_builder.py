@@ -3,11 +3,17 @@ Builder pattern class for constructing SOQL (Salesforce Object Query Language) q
 
 Provides a fluent, method-chaining interface for building type-safe SOQL queries
 with input validation, date literal support, and proper escaping.
+
+parse_soql() goes the other way: it reads an arbitrary SOQL string into a
+SOQLBuilder, so raw queries from sf_query can be inspected and rewritten
+(tightening a LIMIT, deriving a COUNT() query) and built again.
 """
 
 from __future__ import annotations
 
-from typing import Any, List, Optional, Union
+import functools
+import re
+from typing import Any, List, Optional, Pattern, Tuple, Union
 
 
 # SOQL date literals that must NOT be quoted
@@ -57,6 +63,28 @@ SOQL_DATE_LITERAL_PREFIXES = (
 
 VALID_OPERATORS = {"=", "!=", "<", ">", "<=", ">=", "LIKE", "IN", "NOT IN"}
 
+# Top-level clause keywords, in the order SOQL allows them.
+_CLAUSE_RE = re.compile(
+    r"(SELECT|FROM|USING\s+SCOPE|WHERE|WITH|GROUP\s+BY|HAVING|ORDER\s+BY"
+    r"|LIMIT|OFFSET|FOR|UPDATE|ALL\s+ROWS)\b",
+    re.IGNORECASE,
+)
+
+# Rank of each clause in the order SOQL requires. The trailing FOR VIEW /
+# UPDATE TRACKING / FOR UPDATE / ALL ROWS clauses share a rank and may repeat.
+_CLAUSE_ORDER = {
+    "SELECT": 0, "FROM": 1, "USING SCOPE": 2, "WHERE": 3, "WITH": 4,
+    "GROUP BY": 5, "HAVING": 6, "ORDER BY": 7, "LIMIT": 8, "OFFSET": 9,
+    "FOR": 10, "UPDATE": 10, "ALL ROWS": 10,
+}
+_TRAILING_RANK = 10
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_WHITESPACE_RE = re.compile(r"\s+")
+_COMMA_RE = re.compile(r"\s*,\s*")
+_AND_RE = re.compile(r"\s*\bAND\b\s*", re.IGNORECASE)
+_OR_RE = re.compile(r"\s*\bOR\b\s*", re.IGNORECASE)
+
 
 def _is_date_literal(value: str) -> bool:
     """Check if a string value is a SOQL date literal."""
@@ -89,6 +117,266 @@ def _format_value(value: Any) -> str:
     return f"'{_escape_soql_string(str(value))}'"
 
 
+def _squash(text: str) -> str:
+    """Collapse runs of whitespace to one space, except inside string literals."""
+    pieces: List[str] = []
+    last = 0
+    for match in _STRING_LITERAL_RE.finditer(text):
+        pieces.append(_WHITESPACE_RE.sub(" ", text[last:match.start()]))
+        pieces.append(match.group(0))
+        last = match.end()
+    pieces.append(_WHITESPACE_RE.sub(" ", text[last:]))
+    return "".join(pieces).strip()
+
+
+def _mask(text: str) -> str:
+    """
+    Return text with every character inside a string literal or parentheses
+    replaced by NUL, so top-level separators can be found with a regex.
+    Raises ValueError for an unterminated string or unbalanced parentheses.
+    """
+    chars = list(text)
+    depth = 0
+    quote_start = -1
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if quote_start >= 0:
+            if ch == "\\":
+                chars[i] = "\0"
+                i += 1
+                if i < n:
+                    chars[i] = "\0"
+            elif ch == "'":
+                quote_start = -1
+            else:
+                chars[i] = "\0"
+        elif ch == "'":
+            quote_start = i
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth < 0:
+                raise ValueError(f"Unbalanced ')' at position {i} in SOQL.")
+        elif depth > 0:
+            chars[i] = "\0"
+        i += 1
+    if quote_start >= 0:
+        raise ValueError(f"Unterminated string literal at position {quote_start} in SOQL.")
+    if depth:
+        raise ValueError("Unbalanced '(' in SOQL.")
+    return "".join(chars)
+
+
+def _split_top_level(text: str, separator: Pattern[str], mask: Optional[str] = None) -> List[str]:
+    """
+    Split text on a separator pattern (_COMMA_RE, _AND_RE, _OR_RE) where it
+    occurs outside string literals and parentheses. Parts are
+    whitespace-squashed.
+    """
+    mask = _mask(text) if mask is None else mask
+    parts: List[str] = []
+    start = 0
+    for match in separator.finditer(mask):
+        parts.append(_squash(text[start:match.start()]))
+        start = match.end()
+    parts.append(_squash(text[start:]))
+    return parts
+
+
+def top_level_clauses(soql: str) -> List[Tuple[str, int, int]]:
+    """
+    Locate the top-level clause keywords of a SOQL string.
+
+    Returns (keyword, start, end) tuples, where keyword is upper-cased with
+    single spaces (e.g. "ORDER BY"). Keywords inside quoted strings and
+    parenthesized subqueries are ignored.
+    """
+    clauses: List[Tuple[str, int, int]] = []
+    depth = 0
+    in_quote = False
+    i = 0
+    n = len(soql)
+    while i < n:
+        ch = soql[i]
+        if in_quote:
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == "'":
+                in_quote = False
+        elif ch == "'":
+            in_quote = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif depth == 0 and (i == 0 or soql[i - 1].isspace() or soql[i - 1] in "')"):
+            # A keyword may follow a closing quote or parenthesis directly.
+            match = _CLAUSE_RE.match(soql, i)
+            if match:
+                keyword = " ".join(match.group(1).upper().split())
+                clauses.append((keyword, match.start(), match.end()))
+                i = match.end()
+                continue
+        i += 1
+    return clauses
+
+
+def with_limit(soql: str, n: int) -> str:
+    """
+    Return the query with a top-level LIMIT of at most n.
+
+    An existing LIMIT is tightened (never loosened). COUNT() queries are
+    returned unchanged, since a LIMIT would cap the count itself, and so is
+    SOQL that does not parse (Salesforce reports the syntax error).
+    """
+    try:
+        query = parse_soql(soql)
+    except ValueError:
+        return soql
+    if query.is_count() or (query.row_limit is not None and query.row_limit <= n):
+        return soql
+    query._limit = n
+    return query.build()
+
+
+def count_query(soql: str) -> Optional[str]:
+    """
+    Derive a cheap SELECT COUNT() query with the same FROM/WHERE as soql.
+
+    Returns None for queries whose row count cannot be expressed that way
+    (GROUP BY / HAVING results) and for SOQL that does not parse.
+    """
+    try:
+        query = parse_soql(soql)
+    except ValueError:
+        return None
+    if query._group_by_fields or query._having_clauses:
+        return None
+    query._select_fields = ["COUNT()"]
+    query._order_by_clauses = []
+    query._limit = None
+    query._offset = None
+    query._trailing_clauses = []
+    return query.build()
+
+
+def _conjunction(clauses: List[str]) -> str:
+    """AND clauses together, parenthesizing any that contain a top-level OR."""
+    if len(clauses) == 1:
+        return clauses[0]
+    return " AND ".join(
+        f"({clause})" if len(_split_top_level(clause, _OR_RE)) > 1 else clause
+        for clause in clauses
+    )
+
+
+def _parse_conditions(body: str, mask: str) -> List[str]:
+    """WHERE/HAVING body as AND-ed conditions (one item if it has a top-level OR)."""
+    if len(_split_top_level(body, _OR_RE, mask)) > 1:
+        return [_squash(body)]
+    return _split_top_level(body, _AND_RE, mask)
+
+
+def _parse_select_list(body: str, mask: str) -> List[str]:
+    """SELECT items; TYPEOF ... END blocks stay whole, subqueries are parsed."""
+    items: List[str] = []
+    typeof: List[str] = []
+    for item in _split_top_level(body, _COMMA_RE, mask):
+        upper = item.upper()
+        if typeof or upper.startswith("TYPEOF "):
+            typeof.append(item)
+            if upper.endswith(" END"):
+                items.append(", ".join(typeof))
+                typeof = []
+            continue
+        if item.startswith("(") and item.endswith(")"):
+            item = f"({_parse(item[1:-1].strip()).build()})"
+        items.append(item)
+    if typeof:
+        raise ValueError("TYPEOF without END in SELECT.")
+    if "" in items:
+        raise ValueError("Empty field in SELECT list.")
+    return items
+
+
+def _parse_int(keyword: str, body: str) -> int:
+    try:
+        return int(body)
+    except ValueError:
+        raise ValueError(f"{keyword} requires an integer, got '{body.strip()}'.") from None
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse(soql: str) -> SOQLBuilder:
+    text = soql.strip()
+    mask = _mask(text)
+    clauses = top_level_clauses(text)
+    keywords = [c[0] for c in clauses]
+    if not clauses or keywords[0] != "SELECT" or clauses[0][1] != 0:
+        raise ValueError("SOQL must start with SELECT.")
+    if "FROM" not in keywords:
+        raise ValueError("SOQL has no FROM clause.")
+    for before, after in zip(keywords, keywords[1:]):
+        rank = _CLAUSE_ORDER[after]
+        if rank < _CLAUSE_ORDER[before] or (rank == _CLAUSE_ORDER[before] != _TRAILING_RANK):
+            raise ValueError(f"{after} cannot follow {before} in SOQL.")
+
+    query = SOQLBuilder()
+    for i, (keyword, start, end) in enumerate(clauses):
+        if _CLAUSE_ORDER[keyword] == _TRAILING_RANK:
+            # FOR VIEW, UPDATE TRACKING, FOR UPDATE, ALL ROWS: kept verbatim.
+            query._trailing_clauses.append(_squash(text[start:]))
+            break
+        body_end = clauses[i + 1][1] if i + 1 < len(clauses) else len(text)
+        body, body_mask = text[end:body_end], mask[end:body_end]
+        if not body.strip():
+            raise ValueError(f"{keyword} clause is empty.")
+        if keyword == "SELECT":
+            query._select_fields = _parse_select_list(body, body_mask)
+        elif keyword == "FROM":
+            query._from = _squash(body)
+        elif keyword == "USING SCOPE":
+            query._using_scope = _squash(body)
+        elif keyword == "WHERE":
+            query._where_clauses = _parse_conditions(body, body_mask)
+        elif keyword == "WITH":
+            query._with_clause = _squash(body)
+        elif keyword == "GROUP BY":
+            query._group_by_fields = _split_top_level(body, _COMMA_RE, body_mask)
+        elif keyword == "HAVING":
+            query._having_clauses = _parse_conditions(body, body_mask)
+        elif keyword == "ORDER BY":
+            query._order_by_clauses = _split_top_level(body, _COMMA_RE, body_mask)
+        elif keyword == "LIMIT":
+            query._limit = _parse_int(keyword, body)
+        elif keyword == "OFFSET":
+            query._offset = _parse_int(keyword, body)
+    return query
+
+
+def parse_soql(soql: str) -> SOQLBuilder:
+    """
+    Parse a SOQL string into a SOQLBuilder.
+
+    Handles relationship paths, child subqueries (parsed recursively), date
+    literals, aggregates with GROUP BY/HAVING, TYPEOF, USING SCOPE, WITH and
+    the trailing FOR/UPDATE clauses. build() on the result gives the same
+    query with whitespace normalized. Raises ValueError for malformed SOQL.
+
+    Parses are memoized by string; each call returns a fresh copy that the
+    caller may modify.
+
+    Usage:
+        query = parse_soql("SELECT Id, Name FROM Work_Item__c WHERE Status__c = 'Done'")
+        query.where("Type__c", "=", "Bug").limit(10).build()
+    """
+    return _parse(soql).copy()
+
+
 class SOQLBuilder:
     """
     A builder for constructing SOQL queries with method chaining.
@@ -109,12 +397,68 @@ class SOQLBuilder:
     def __init__(self) -> None:
         self._select_fields: List[str] = []
         self._from: Optional[str] = None
+        self._using_scope: Optional[str] = None
         self._where_clauses: List[str] = []
+        self._with_clause: Optional[str] = None
         self._order_by_clauses: List[str] = []
         self._group_by_fields: List[str] = []
         self._having_clauses: List[str] = []
         self._limit: Optional[int] = None
         self._offset: Optional[int] = None
+        self._trailing_clauses: List[str] = []
+
+    @property
+    def select_fields(self) -> List[str]:
+        """The SELECT items (fields, functions, "(SELECT ...)" subqueries)."""
+        return list(self._select_fields)
+
+    @property
+    def sobject(self) -> Optional[str]:
+        return self._from
+
+    @property
+    def where_clauses(self) -> List[str]:
+        """The AND-ed WHERE conditions."""
+        return list(self._where_clauses)
+
+    @property
+    def group_by_fields(self) -> List[str]:
+        return list(self._group_by_fields)
+
+    @property
+    def row_limit(self) -> Optional[int]:
+        return self._limit
+
+    def is_count(self) -> bool:
+        """True for SELECT COUNT() queries."""
+        return [f.replace(" ", "").upper() for f in self._select_fields] == ["COUNT()"]
+
+    def copy(self) -> SOQLBuilder:
+        """Return an independent copy of this builder."""
+        clone = SOQLBuilder()
+        clone.__dict__.update(
+            {k: list(v) if isinstance(v, list) else v for k, v in self.__dict__.items()}
+        )
+        return clone
+
+    def normalized(self) -> SOQLBuilder:
+        """
+        Return a copy with SELECT items and AND-ed WHERE conditions sorted,
+        so queries that differ only in term order build identically.
+
+        SELECT items keep their order when one is an unaliased expression
+        (COUNT(Id), SUM(Hours__c)): its result column is named by position
+        (expr0, expr1), so reordering would change the result.
+        """
+        clone = self.copy()
+        fields = [
+            f"({parse_soql(f[1:-1]).normalized().build()})" if f.startswith("(") else f
+            for f in self._select_fields
+        ]
+        positional = any(not f.startswith("(") and f.endswith(")") for f in fields)
+        clone._select_fields = fields if positional else sorted(fields)
+        clone._where_clauses = sorted(self._where_clauses)
+        return clone
 
     def select(self, fields: Union[str, List[str]]) -> SOQLBuilder:
         """Add fields to the SELECT clause."""
@@ -187,10 +531,28 @@ class SOQLBuilder:
         return self
 
     def where_raw(self, clause: str) -> SOQLBuilder:
-        """Add a raw WHERE clause string (for complex conditions)."""
+        """
+        Add a raw WHERE clause string (for complex conditions). A clause
+        with a top-level OR is parenthesized when combined with others.
+        """
         self._where_clauses.append(clause)
         return self
 
+    def using_scope(self, scope: str) -> SOQLBuilder:
+        """Set the USING SCOPE filter (e.g. "mine", "team")."""
+        self._using_scope = scope
+        return self
+
+    def with_clause(self, clause: str) -> SOQLBuilder:
+        """Set the WITH clause (e.g. "SECURITY_ENFORCED")."""
+        self._with_clause = clause
+        return self
+
+    def trailing(self, clause: str) -> SOQLBuilder:
+        """Append a trailing clause: FOR VIEW, FOR REFERENCE, FOR UPDATE, UPDATE TRACKING."""
+        self._trailing_clauses.append(clause)
+        return self
+
     def group_by(self, fields: Union[str, List[str]]) -> SOQLBuilder:
         """Set the GROUP BY clause."""
         if isinstance(fields, str):
@@ -239,14 +601,20 @@ class SOQLBuilder:
         parts = [f"SELECT {', '.join(self._select_fields)}"]
         parts.append(f"FROM {self._from}")
 
+        if self._using_scope:
+            parts.append(f"USING SCOPE {self._using_scope}")
+
         if self._where_clauses:
-            parts.append(f"WHERE {' AND '.join(self._where_clauses)}")
+            parts.append(f"WHERE {_conjunction(self._where_clauses)}")
+
+        if self._with_clause:
+            parts.append(f"WITH {self._with_clause}")
 
         if self._group_by_fields:
             parts.append(f"GROUP BY {', '.join(self._group_by_fields)}")
 
         if self._having_clauses:
-            parts.append(f"HAVING {' AND '.join(self._having_clauses)}")
+            parts.append(f"HAVING {_conjunction(self._having_clauses)}")
 
         if self._order_by_clauses:
             parts.append(f"ORDER BY {', '.join(self._order_by_clauses)}")
@@ -257,6 +625,8 @@ class SOQLBuilder:
         if self._offset is not None:
             parts.append(f"OFFSET {self._offset}")
 
+        parts.extend(self._trailing_clauses)
+
         return " ".join(parts)
 
     def __str__(self) -> str:
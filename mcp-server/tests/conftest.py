@@ -0,0 +1,84 @@
+"""The server modules are flat files in mcp-server/; make them importable."""
+
+import os
+import re
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _SERVER_DIR)
+# The local Salesforce REST stand-in lives with the benchmarks.
+sys.path.insert(0, os.path.join(_SERVER_DIR, "benchmarks"))
+
+
+def _serve_standin(time_entries):
+    from sf_standin import serve
+
+    server = serve(time_entries=time_entries)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(scope="session")
+def standin():
+    """Instance URL of a local Salesforce REST stand-in with 5,000 time entries."""
+    yield from _serve_standin(5000)
+
+
+@pytest.fixture
+def writable_standin():
+    """A small stand-in (10 work items) of the test's own, for tests that write."""
+    yield from _serve_standin(200)
+
+
+class FakeSalesforce:
+    """
+    The AsyncSalesforce calls the work item index and the replica make,
+    answered from in-memory records per sObject.
+
+    query_all() returns the rows whose Name is quoted in the query (matched
+    case-insensitively, as SOQL does); query_pages() returns every row as
+    one page, then raises ConnectionError if the sObject is fail_on.
+    get_deleted() returns `deleted` (None: the deletion window expired).
+    """
+
+    def __init__(self, records, deleted=()):
+        self.records = records
+        self.deleted = None if deleted is None else list(deleted)
+        self.fail_on = None
+        self.queries = 0
+        self.last_soql = {}
+
+    def _rows(self, soql):
+        self.queries += 1
+        sobject = soql.split(" FROM ")[1].split()[0]
+        self.last_soql[sobject] = soql
+        return sobject, self.records.get(sobject, [])
+
+    async def query_all(self, soql):
+        _, rows = self._rows(soql)
+        names = {n.upper() for n in re.findall(r"'([^']*)'", soql)}
+        return {"records": [r for r in rows if r["Name"].upper() in names]}
+
+    async def query_pages(self, soql):
+        sobject, rows = self._rows(soql)
+        yield SimpleNamespace(records=list(rows))
+        if sobject == self.fail_on:
+            raise ConnectionError("connection reset")
+
+    async def get_deleted(self, sobject, start, end):
+        return self.deleted
+
+
+@pytest.fixture
+def fake_salesforce():
+    """FakeSalesforce(records, deleted=()): records by sObject name."""
+    return FakeSalesforce
@@ -0,0 +1,113 @@
+"""ApiGovernor budgets, attribution and reserve handling as the org's usage changes."""
+
+import asyncio
+import time
+
+import pytest
+
+from api_governor import ApiBudgetExceeded, ApiGovernor, parse_budgets, parse_limit_info
+
+LIMITS_PATH = "/services/data/v59.0/limits/"
+QUERY_PATH = "/services/data/v59.0/query/"
+
+
+def _low_reading(governor: ApiGovernor) -> None:
+    # 14,000 of 15,000 used: 1,000 left is inside the 10% reserve.
+    governor.after_response({"Sforce-Limit-Info": "api-usage=14000/15000"})
+
+
+def test_reserve_refuses_calls():
+    governor = ApiGovernor(reserve_fraction=0.1)
+    _low_reading(governor)
+    with pytest.raises(ApiBudgetExceeded):
+        governor.before_request(QUERY_PATH)
+    assert governor.refused == 1
+
+
+def test_limits_probe_is_exempt_from_reserve():
+    governor = ApiGovernor(reserve_fraction=0.1)
+    _low_reading(governor)
+    governor.before_request(LIMITS_PATH)
+    governor.before_request(LIMITS_PATH.rstrip("/"))
+
+
+def test_limits_probe_still_counts_toward_window_budget():
+    governor = ApiGovernor(window_budget=1)
+    governor.after_response({})
+    with pytest.raises(ApiBudgetExceeded):
+        governor.before_request(LIMITS_PATH)
+
+
+def test_recovery_reported_by_limits_probe():
+    governor = ApiGovernor(reserve_fraction=0.1)
+    _low_reading(governor)
+    with pytest.raises(ApiBudgetExceeded):
+        governor.before_request(QUERY_PATH)
+
+    # The rolling 24h usage recovered; sf_api_usage reads limits/.
+    governor.before_request(LIMITS_PATH)
+    governor.observe_limits({"DailyApiRequests": {"Max": 15000, "Remaining": 9000}})
+    governor.before_request(QUERY_PATH)
+    assert not governor.is_tight()
+
+
+def test_stale_reading_stops_blocking():
+    governor = ApiGovernor(reserve_fraction=0.1, max_reading_age=300)
+    _low_reading(governor)
+    assert governor.is_tight()
+
+    governor.org_observed_at = time.time() - 301
+    governor.before_request(QUERY_PATH)
+    assert not governor.is_tight()
+    # The last reading is still reported.
+    assert governor.snapshot()["org_remaining"] == 1000
+
+
+def test_tool_budget():
+    governor = ApiGovernor(tool_budgets={"sf_query": 1})
+    with governor.attribute("sf_query"):
+        governor.before_request(QUERY_PATH)
+        governor.after_response({})
+        with pytest.raises(ApiBudgetExceeded):
+            governor.before_request(QUERY_PATH)
+    governor.before_request(QUERY_PATH)
+
+
+def test_parse_budgets():
+    assert parse_budgets("sf_query=100, sf_velocity_trend=20,") == {
+        "sf_query": 100,
+        "sf_velocity_trend": 20,
+    }
+    with pytest.raises(ValueError):
+        parse_budgets("sf_query")
+
+
+def test_parse_limit_info():
+    assert parse_limit_info("api-usage=14000/15000") == (14000, 15000)
+    assert parse_limit_info(None) is None
+
+
+def test_window_budget_refuses_and_reports_tight():
+    governor = ApiGovernor(window_budget=4, tight_fraction=0.25)
+    for _ in range(3):
+        governor.before_request(QUERY_PATH)
+        governor.after_response({})
+    assert governor.is_tight()
+    governor.before_request(QUERY_PATH)
+    governor.after_response({})
+    with pytest.raises(ApiBudgetExceeded):
+        governor.before_request(QUERY_PATH)
+
+
+def test_tasks_inherit_tool_attribution():
+    governor = ApiGovernor()
+
+    async def call():
+        governor.after_response({})
+
+    async def main():
+        with governor.attribute("sf_project_summary"):
+            await asyncio.gather(call(), call())
+
+    asyncio.run(main())
+    assert governor.snapshot()["tools"]["sf_project_summary"]["total_calls"] == 2
@@ -0,0 +1,65 @@
+"""DescribeCache keys, name validation and shared async fetches."""
+
+import asyncio
+import json
+
+import pytest
+
+from describe_cache import DescribeCache
+
+DESCRIBE = {"name": "Work_Item__c", "fields": []}
+
+
+def test_rejects_names_that_are_not_api_names(tmp_path):
+    cache_dir = tmp_path / "cache"
+    (tmp_path / "secret.json").write_text(json.dumps({"validated_at": 0, "describe": {}}))
+    cache = DescribeCache(cache_dir=str(cache_dir))
+    for name in ("../secret", "a/b", "Work_Item__c.json", ""):
+        with pytest.raises(ValueError):
+            cache.get_or_fetch(name, lambda *_: pytest.fail("fetched"), allow_stale=True)
+
+
+def test_names_match_case_insensitively(tmp_path):
+    cache = DescribeCache(cache_dir=str(tmp_path))
+    cache.put("Work_Item__c", DESCRIBE)
+    assert cache.get_or_fetch("work_item__c", lambda *_: pytest.fail("fetched")) == DESCRIBE
+    assert len(cache) == 1
+
+    # The disk layer uses the same key.
+    warm = DescribeCache(cache_dir=str(tmp_path))
+    assert warm.get_or_fetch("WORK_ITEM__C", lambda *_: pytest.fail("fetched")) == DESCRIBE
+    warm.invalidate("work_item__C")
+    assert not list(tmp_path.iterdir())
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = DescribeCache()
+    calls = []
+
+    async def fetch(name, ims):
+        calls.append(name)
+        await asyncio.sleep(0.01)
+        return DESCRIBE
+
+    async def main():
+        return await asyncio.gather(*(
+            cache.aget_or_fetch(name, fetch) for name in ("Work_Item__c", "work_item__c") * 3
+        ))
+
+    assert all(d == DESCRIBE for d in asyncio.run(main()))
+    assert len(calls) == 1
+    assert (cache.misses, cache.hits) == (1, 5)
+
+
+def test_failed_fetch_is_not_remembered():
+    cache = DescribeCache()
+
+    async def failing(name, ims):
+        raise ConnectionError("reset")
+
+    async def working(name, ims):
+        return DESCRIBE
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(cache.aget_or_fetch("Work_Item__c", failing))
+    assert asyncio.run(cache.aget_or_fetch("Work_Item__c", working)) == DESCRIBE
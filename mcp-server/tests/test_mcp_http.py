@@ -0,0 +1,17 @@
+"""The HTTP transport refuses to expose an unauthenticated server."""
+
+import pytest
+
+from mcp_http import check_exposure
+
+
+@pytest.mark.parametrize("host", ["127.0.0.1", "127.0.0.2", "::1", "localhost"])
+def test_loopback_needs_no_token(host):
+    check_exposure(host, "")
+
+
+@pytest.mark.parametrize("host", ["0.0.0.0", "::", "", "10.0.0.5", "mcp.example.com"])
+def test_other_hosts_need_a_token(host):
+    with pytest.raises(ValueError):
+        check_exposure(host, "")
+    check_exposure(host, "s3cret")
@@ -0,0 +1,112 @@
+"""Org configuration from the environment, and per-call org targeting."""
+
+import asyncio
+import inspect
+
+import pytest
+
+from org_registry import OrgConfig, OrgRegistry, load_org_configs
+
+
+def test_unprefixed_variables_configure_the_default_org():
+    configs, default = load_org_configs({"SF_USERNAME": "me@example.com", "SF_PASSWORD": "pw"})
+    assert default == "default" and list(configs) == ["default"]
+    assert configs["default"].username == "me@example.com"
+    assert configs["default"].domain == "login"
+
+
+def test_listed_orgs_read_their_prefixed_variables():
+    configs, default = load_org_configs({
+        "SF_USERNAME": "me@example.com",
+        "SF_ORGS": " UAT, dev ",
+        "SF_ORG_UAT_USERNAME": "me@example.com.uat",
+        "SF_ORG_UAT_DOMAIN": "test",
+        "SF_ORG_DEV_ACCESS_TOKEN": "token",
+        "SF_ORG_DEV_INSTANCE_URL": "https://dev.my.salesforce.com",
+    })
+    assert default == "default" and list(configs) == ["default", "uat", "dev"]
+    assert (configs["uat"].username, configs["uat"].domain) == ("me@example.com.uat", "test")
+    # Listed orgs that are not the default do not inherit the unprefixed credentials.
+    assert configs["dev"].username == "" and configs["dev"].has_credentials
+
+
+def test_listed_default_org_falls_back_to_unprefixed_variables():
+    configs, default = load_org_configs({
+        "SF_DEFAULT_ORG": "Prod",
+        "SF_ORGS": "prod,uat",
+        "SF_USERNAME": "me@example.com",
+        "SF_PASSWORD": "pw",
+        "SF_ORG_PROD_PASSWORD": "prod-pw",
+    })
+    assert default == "prod" and list(configs) == ["prod", "uat"]
+    assert (configs["prod"].username, configs["prod"].password) == ("me@example.com", "prod-pw")
+
+
+def test_first_listed_org_is_default_without_unprefixed_credentials():
+    configs, default = load_org_configs({"SF_ORGS": "uat,dev", "SF_ORG_UAT_USERNAME": "u"})
+    assert default == "uat" and list(configs) == ["uat", "dev"]
+
+
+def test_invalid_org_name_is_rejected():
+    with pytest.raises(ValueError, match="Invalid org name"):
+        load_org_configs({"SF_ORGS": "uat-2"})
+
+
+def test_repr_hides_secrets():
+    config = OrgConfig("uat", username="u", password="hunter2", access_token="00Dxx!secret")
+    assert "hunter2" not in repr(config) and "secret" not in repr(config)
+
+
+def _registry():
+    configs = {name: OrgConfig(name) for name in ("prod", "uat", "dev")}
+    return OrgRegistry(configs, "prod", factory=lambda config: {"org": config.name})
+
+
+def test_registry_resolves_names_and_creates_state_once():
+    registry = _registry()
+    assert registry.resolve("") == "prod" and registry.resolve(" UAT ") == "uat"
+    with pytest.raises(ValueError, match="Unknown org 'qa'"):
+        registry.resolve("qa")
+    assert registry.get("uat") is registry.get("uat")
+    assert [state["org"] for state in registry.active()] == ["uat"]
+
+
+def test_concurrent_calls_see_their_own_org():
+    registry = _registry()
+
+    async def call(name, delay):
+        with registry.use(name):
+            await asyncio.sleep(delay)
+            # Tasks started inside the call inherit its org.
+            inner = await asyncio.create_task(asyncio.sleep(0, registry.current()))
+            return registry.current()["org"], inner["org"]
+
+    async def main():
+        results = await asyncio.gather(call("uat", 0.02), call("dev", 0.01), call("", 0))
+        return results, registry.current()["org"]
+
+    results, outside = asyncio.run(main())
+    assert results == [("uat", "uat"), ("dev", "dev"), ("prod", "prod")]
+    assert outside == "prod"
+
+
+@pytest.fixture
+def server():
+    pytest.importorskip("mcp.server.fastmcp")
+    import server
+
+    return server
+
+
+def test_org_scoped_adds_org_keyword(server):
+    async def tool(project: str, limit: int = 10) -> str:
+        return f"{project} {limit} {server._orgs.current().name}"
+
+    wrapped = server.org_scoped(tool)
+    parameters = inspect.signature(wrapped).parameters
+    assert list(parameters) == ["project", "limit", "org"]
+    assert parameters["org"].kind is inspect.Parameter.KEYWORD_ONLY
+    assert parameters["org"].default == ""
+    default = server._orgs.default
+    assert asyncio.run(wrapped("P-1", org=default)) == f"P-1 10 {default}"
+    assert asyncio.run(wrapped("P-1", org="no_such_org")).startswith("Error: Unknown org")
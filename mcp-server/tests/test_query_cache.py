@@ -0,0 +1,109 @@
+"""Cache keys, object tagging and write invalidation of QueryResultCache."""
+
+import datetime
+
+from query_cache import QueryResultCache, canonical_soql, objects_read
+
+PAGES = [[{"Id": "a01000000000001"}]]
+
+
+def test_key_ignores_case_whitespace_and_term_order():
+    a = canonical_soql("select Name, Id from Work_Item__c where Status__c = 'Done' and Type__c = 'Bug'")
+    b = canonical_soql("SELECT  Id,Name\nFROM work_item__c WHERE Type__c='Bug' AND Status__c='Done'")
+    assert a == b
+
+
+def test_key_keeps_string_literal_case():
+    assert canonical_soql("SELECT Id FROM Account WHERE Name = 'acme'") != canonical_soql(
+        "SELECT Id FROM Account WHERE Name = 'ACME'"
+    )
+
+
+def test_key_keeps_order_of_unaliased_expressions():
+    # expr0 is whichever expression comes first.
+    assert canonical_soql("SELECT COUNT(Id), SUM(Hours__c) FROM Time_Entry__c") != canonical_soql(
+        "SELECT SUM(Hours__c), COUNT(Id) FROM Time_Entry__c"
+    )
+
+
+def test_relative_dates_key_on_today():
+    soql = "SELECT Id FROM Work_Item__c WHERE Due_Date__c < TODAY"
+    monday, tuesday = datetime.date(2026, 10, 12), datetime.date(2026, 10, 13)
+    assert canonical_soql(soql, monday) != canonical_soql(soql, tuesday)
+    # A date literal inside a string is just text.
+    quoted = "SELECT Id FROM Work_Item__c WHERE Subject__c = 'TODAY'"
+    assert canonical_soql(quoted, monday) == canonical_soql(quoted, tuesday)
+
+
+def test_objects_read():
+    soql = (
+        "SELECT Name, Assigned_To__r.Name, Work_Item__r.Project__r.Name FROM Time_Entry__c "
+        "WHERE Notes__c = 'Other__r.Name'"
+    )
+    assert objects_read(soql) == {"time_entry__c", "work_item__c", "project__c", "user"}
+    # Unknown relationships keep their own name, so put() declines them.
+    assert objects_read("SELECT Parent__r.Name FROM Project__c") == {"project__c", "parent__r"}
+
+
+def test_put_and_get():
+    cache = QueryResultCache(ttl=60)
+    soql = "SELECT Id FROM Work_Item__c"
+    key = cache.key(soql)
+    assert cache.get(key) is None
+    assert cache.put(key, PAGES, 100, cache.begin(soql))
+    assert cache.get(key).pages == PAGES
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_entries_are_dropped():
+    cache = QueryResultCache(ttl=60)
+    soql = "SELECT Id FROM Work_Item__c"
+    key = cache.key(soql)
+    cache.put(key, PAGES, 100, cache.begin(soql))
+    cache._entries[key].expires_at = 0
+    assert cache.get(key) is None
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_invalidate_drops_entries_reading_the_object():
+    cache = QueryResultCache(ttl=60)
+    items = "SELECT Id, Project__r.Name FROM Work_Item__c"
+    users = "SELECT Id FROM User"
+    for soql in (items, users):
+        cache.put(cache.key(soql), PAGES, 100, cache.begin(soql))
+    assert cache.invalidate("Project__c") == 1
+    assert cache.get(cache.key(items)) is None
+    assert cache.get(cache.key(users)) is not None
+
+
+def test_put_refuses_result_that_raced_a_write():
+    cache = QueryResultCache(ttl=60)
+    soql = "SELECT Id FROM Work_Item__c"
+    token = cache.begin(soql)
+    cache.invalidate("Work_Item__c")  # a write lands while the query runs
+    assert not cache.put(cache.key(soql), PAGES, 100, token)
+    assert cache.put(cache.key(soql), PAGES, 100, cache.begin(soql))
+
+
+def test_put_refuses_unmapped_relationships():
+    cache = QueryResultCache(ttl=60)
+    for soql in (
+        "SELECT Id, (SELECT Id FROM Time_Entries__r) FROM Work_Item__c",
+        "SELECT Parent__r.Name FROM Project__c",
+    ):
+        assert not cache.put(cache.key(soql), PAGES, 100, cache.begin(soql))
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = QueryResultCache(ttl=60, max_bytes=1000)
+    soqls = [f"SELECT Id FROM Work_Item__c WHERE Name = 'WI-{i}'" for i in range(3)]
+    for soql in soqls[:2]:
+        cache.put(cache.key(soql), PAGES, 250, cache.begin(soql))
+    cache.get(cache.key(soqls[0]))
+    assert not cache.put(cache.key(soqls[2]), PAGES, 251, cache.begin(soqls[2]))  # > max_bytes / 4
+    cache.put(cache.key(soqls[2]), PAGES, 250, cache.begin(soqls[2]))
+    cache.put(cache.key("SELECT Id FROM User"), PAGES, 250, cache.begin("SELECT Id FROM User"))
+    cache.put(cache.key("SELECT Name FROM User"), PAGES, 250, cache.begin("SELECT Name FROM User"))
+    assert cache.nbytes <= 1000
+    assert cache.get(cache.key(soqls[1])) is None
+    assert cache.get(cache.key(soqls[0])) is not None
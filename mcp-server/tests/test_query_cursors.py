@@ -0,0 +1,81 @@
+"""CursorStore paging against the stand-in, expiry and eviction."""
+
+import asyncio
+
+import pytest
+
+from query_cursors import CursorStore
+from sf_client import AsyncSalesforce
+
+ENTRIES = "SELECT Id FROM Time_Entry__c"  # 5000 rows, batches of 2000
+
+
+def _run(instance_url, call):
+    async def main():
+        sf = AsyncSalesforce(instance_url, "session", max_retries=0)
+        try:
+            return await call(sf)
+        finally:
+            await sf.aclose()
+
+    return asyncio.run(main())
+
+
+def test_pages_across_next_records_url_and_closes_when_exhausted(standin):
+    store = CursorStore()
+
+    async def call(sf):
+        cursor = await store.open(sf, ENTRIES)
+        pages = []
+        while store.get(cursor.cursor_id) is not None:
+            pages.append(await store.fetch(sf, cursor, 1500))
+        return cursor, pages
+
+    cursor, pages = _run(standin, call)
+    assert cursor.total_size == 5000
+    assert [(p.first_row, p.last_row, p.exhausted) for p in pages] == [
+        (1, 1500, False), (1501, 3000, False), (3001, 4500, False), (4501, 5000, True),
+    ]
+    ids = [r["Id"] for p in pages for r in p.rows]
+    assert len(ids) == len(set(ids)) == 5000
+    assert len(store) == 0
+
+
+def test_concurrent_fetches_get_disjoint_row_ranges(standin):
+    store = CursorStore()
+
+    async def call(sf):
+        cursor = await store.open(sf, ENTRIES)
+        return await asyncio.gather(*(store.fetch(sf, cursor, 1000) for _ in range(3)))
+
+    pages = _run(standin, call)
+    assert sorted((p.first_row, p.last_row) for p in pages) == [(1, 1000), (1001, 2000), (2001, 3000)]
+
+
+def test_expired_cursors_are_gone(standin):
+    store = CursorStore(ttl=60)
+    cursor = _run(standin, lambda sf: store.open(sf, ENTRIES))
+    assert store.get(cursor.cursor_id) is cursor
+    cursor.expires_at = 0
+    assert store.get(cursor.cursor_id) is None
+    assert len(store) == 0
+
+
+def test_least_recently_used_cursor_is_evicted(standin):
+    store = CursorStore(max_cursors=2)
+
+    async def call(sf):
+        first = await store.open(sf, ENTRIES)
+        second = await store.open(sf, ENTRIES)
+        store.get(first.cursor_id)
+        third = await store.open(sf, ENTRIES)
+        return first, second, third
+
+    first, second, third = _run(standin, call)
+    assert store.get(second.cursor_id) is None
+    assert store.get(first.cursor_id) is first and store.get(third.cursor_id) is third
+
+
+def test_max_cursors_must_be_positive():
+    with pytest.raises(ValueError):
+        CursorStore(max_cursors=0)
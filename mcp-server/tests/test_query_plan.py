@@ -0,0 +1,111 @@
+"""QueryPreflight modes, plan caching and table-scan detection."""
+
+import asyncio
+
+import pytest
+
+from query_plan import QueryPlan, QueryPreflight, indexed_fields
+from sf_client import AsyncSalesforce
+
+SCAN = "SELECT Id FROM Time_Entry__c WHERE Hours__c > {}"  # unindexed: TableScan
+INDEXED = "SELECT Id FROM Time_Entry__c WHERE Work_Item__c = 'a01000000000001'"
+
+
+class CountingSalesforce(AsyncSalesforce):
+    explains = 0
+
+    async def explain(self, soql):
+        self.explains += 1
+        return await super().explain(soql)
+
+
+def _run(instance_url, call):
+    async def main():
+        sf = CountingSalesforce(instance_url, "session", max_retries=0)
+        try:
+            return await call(sf), sf.explains
+        finally:
+            await sf.aclose()
+
+    return asyncio.run(main())
+
+
+def test_invalid_mode_is_rejected():
+    with pytest.raises(ValueError):
+        QueryPreflight(mode="block")
+
+
+def test_off_never_explains(standin):
+    preflight = QueryPreflight(mode="off", large_cardinality=1000)
+    plan, explains = _run(standin, lambda sf: preflight.check(sf, SCAN.format(2)))
+    assert plan is None and explains == 0
+    assert not preflight.enabled and not preflight.refuses
+
+
+@pytest.mark.parametrize("mode, refuses", [("warn", False), ("refuse", True)])
+def test_large_table_scan_is_flagged(standin, mode, refuses):
+    preflight = QueryPreflight(mode=mode, large_cardinality=1000)
+    plan, _ = _run(standin, lambda sf: preflight.check(sf, SCAN.format(2)))
+    assert plan.leading_operation == "TableScan" and plan.sobject_cardinality == 5000
+    assert preflight.refuses is refuses
+    assert preflight.flagged == 1
+    assert "scan all 5,000 Time_Entry__c records" in preflight.describe_problem(plan, ["Work_Item__c"])
+
+
+def test_selective_or_small_queries_pass(standin):
+    preflight = QueryPreflight(mode="refuse", large_cardinality=1000)
+    assert _run(standin, lambda sf: preflight.check(sf, INDEXED))[0] is None
+    # A table scan under large_cardinality is fine.
+    small = QueryPreflight(mode="refuse", large_cardinality=5001)
+    assert _run(standin, lambda sf: small.check(sf, SCAN.format(2)))[0] is None
+    assert preflight.flagged == small.flagged == 0
+
+
+def test_plans_are_cached_by_shape(standin):
+    preflight = QueryPreflight(mode="warn", large_cardinality=1000)
+
+    async def call(sf):
+        for value in (1, 2, 3):
+            await preflight.check(sf, SCAN.format(value))
+
+    _, explains = _run(standin, call)
+    assert explains == 1 and (preflight.hits, preflight.misses) == (2, 1)
+
+
+def test_expired_plans_are_explained_again(standin):
+    preflight = QueryPreflight(mode="warn", large_cardinality=1000, ttl=60)
+    _run(standin, lambda sf: preflight.check(sf, SCAN.format(1)))
+    for key, (plan, _) in list(preflight._plans.items()):
+        preflight._plans[key] = (plan, 0)
+    _, explains = _run(standin, lambda sf: preflight.check(sf, SCAN.format(1)))
+    assert explains == 1
+
+
+def test_least_recently_used_plans_are_evicted(standin):
+    preflight = QueryPreflight(mode="warn", large_cardinality=1000, max_entries=2)
+    queries = [SCAN.format(1), INDEXED, "SELECT Id FROM User"]
+
+    async def call(sf):
+        await preflight.check(sf, queries[0])
+        await preflight.check(sf, queries[1])
+        await preflight.check(sf, queries[0])
+        await preflight.check(sf, queries[2])  # evicts queries[1]
+        await preflight.check(sf, queries[0])
+        await preflight.check(sf, queries[1])
+
+    _, explains = _run(standin, call)
+    assert explains == 4 and len(preflight) == 2
+
+
+def test_plan_from_json_and_indexed_fields():
+    plan = QueryPlan.from_json({
+        "leadingOperationType": "TableScan", "cardinality": 10, "sobjectCardinality": 10,
+        "sobjectType": "Work_Item__c", "relativeCost": 1.5,
+        "notes": [{"description": "Not considering filter", "fields": ["Status__c"]}],
+    })
+    assert plan.notes == ["Not considering filter (Status__c)"]
+    describe = {"fields": [
+        {"name": "Id", "type": "id"}, {"name": "Status__c", "type": "picklist"},
+        {"name": "Project__c", "type": "reference"}, {"name": "Key__c", "type": "string", "externalId": True},
+    ]}
+    assert indexed_fields(describe) == ["Id", "Project__c", "Key__c"]
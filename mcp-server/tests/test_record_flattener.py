@@ -0,0 +1,128 @@
+"""RecordFlattener columns agree with the recursive flattener on real response shapes."""
+
+import asyncio
+
+import pytest
+
+from record_flattener import RecordFlattener, flatten_relationship_fields
+from sf_client import AsyncSalesforce
+
+
+def _attrs(sobject):
+    return {"type": sobject, "url": f"/services/data/v59.0/sobjects/{sobject}/x"}
+
+
+ENTRIES = [
+    {
+        "attributes": _attrs("Time_Entry__c"),
+        "Id": "a02000000000001",
+        "Hours__c": 2.0,
+        "Work_Item__r": {
+            "attributes": _attrs("Work_Item__c"),
+            "Name": "WI-0001",
+            "Project__r": {"attributes": _attrs("Project__c"), "Name": "Alpha"},
+        },
+    },
+    # Salesforce returns null, not an empty dict, for an unset lookup.
+    {"attributes": _attrs("Time_Entry__c"), "Id": "a02000000000002", "Hours__c": 1.5, "Work_Item__r": None},
+    {
+        "attributes": _attrs("Time_Entry__c"),
+        "Id": "a02000000000003",
+        "Hours__c": 0.5,
+        "Work_Item__r": {"attributes": _attrs("Work_Item__c"), "Name": "WI-0002", "Project__r": None},
+    },
+]
+
+
+def test_nested_paths_with_null_parents():
+    soql = "SELECT Id, Hours__c, Work_Item__r.Name, Work_Item__r.Project__r.Name FROM Time_Entry__c"
+    columns = RecordFlattener.for_query(soql).to_columns(ENTRIES)
+    assert columns == {
+        "Id": ["a02000000000001", "a02000000000002", "a02000000000003"],
+        "Hours__c": [2.0, 1.5, 0.5],
+        "Work_Item__r.Name": ["WI-0001", None, "WI-0002"],
+        "Work_Item__r.Project__r.Name": ["Alpha", None, None],
+    }
+
+
+def test_paths_resolve_to_the_case_salesforce_returned():
+    # SOQL is case-insensitive; the response uses the field's API name.
+    soql = "select id, HOURS__C, work_item__r.project__r.name from time_entry__c"
+    columns = RecordFlattener.for_query(soql).to_columns(ENTRIES[1:] + ENTRIES[:1])
+    assert list(columns) == ["Id", "Hours__c", "Work_Item__r.Project__r.Name"]
+    assert columns["Work_Item__r.Project__r.Name"] == [None, None, "Alpha"]
+
+
+def test_child_subqueries_become_lists_of_rows():
+    records = [
+        {
+            "attributes": _attrs("Work_Item__c"),
+            "Name": "WI-0001",
+            "Time_Entries__r": {
+                "totalSize": 2,
+                "done": True,
+                "records": [
+                    {"attributes": _attrs("Time_Entry__c"), "Hours__c": 1.0},
+                    {"attributes": _attrs("Time_Entry__c"), "Hours__c": 2.5},
+                ],
+            },
+        },
+        {"attributes": _attrs("Work_Item__c"), "Name": "WI-0002", "Time_Entries__r": None},
+    ]
+    soql = "SELECT Name, (SELECT Hours__c FROM Time_Entries__r) FROM Work_Item__c"
+    columns = RecordFlattener.for_query(soql).to_columns(records)
+    assert columns == {
+        "Name": ["WI-0001", "WI-0002"],
+        "Time_Entries__r": [[{"Hours__c": 1.0}, {"Hours__c": 2.5}], None],
+    }
+
+
+@pytest.mark.parametrize("soql", [
+    "SELECT Status__c, COUNT(Id) n FROM Work_Item__c GROUP BY Status__c",
+    "SELECT SUM(Hours__c) FROM Time_Entry__c",
+    "SELECT TYPEOF What WHEN Account THEN Name END FROM Event",
+    "SELECT FIELDS(STANDARD) FROM Work_Item__c LIMIT 200",
+    "not soql at all",
+])
+def test_unknown_shapes_fall_back_to_dynamic_flattening(soql):
+    flattener = RecordFlattener.for_query(soql)
+    assert flattener.dynamic
+    records = [
+        {"attributes": {"type": "AggregateResult"}, "Status__c": "Done", "expr0": 3},
+        {"attributes": {"type": "AggregateResult"}, "Status__c": "To Do", "Owner": {"Name": "U"}},
+    ]
+    assert flattener.to_columns(records) == {
+        "Status__c": ["Done", "To Do"],
+        "expr0": [3, None],
+        "Owner.Name": [None, "U"],
+    }
+
+
+def test_toLabel_keeps_the_field_key_unless_aliased():
+    soql = "SELECT toLabel(Status__c), FORMAT(Hours__c) hours FROM Work_Item__c"
+    flattener = RecordFlattener.for_query(soql)
+    assert not flattener.dynamic
+    assert flattener.to_columns([{"Status__c": "Done", "hours": "1.5"}]) == {
+        "Status__c": ["Done"],
+        "hours": ["1.5"],
+    }
+
+
+def test_matches_recursive_flattening_on_standin_results(standin):
+    soql = (
+        "SELECT Id, Hours__c, Work_Item__r.Name, Work_Item__r.Project__r.Name "
+        "FROM Time_Entry__c ORDER BY Name LIMIT 50"
+    )
+
+    async def main():
+        sf = AsyncSalesforce(standin, "session", max_retries=0)
+        try:
+            return (await sf.query(soql))["records"]
+        finally:
+            await sf.aclose()
+
+    records = asyncio.run(main())
+    columns = RecordFlattener.for_query(soql).to_columns(records)
+    flat = flatten_relationship_fields(records)
+    assert len(records) == 50
+    assert columns == {key: [row[key] for row in flat] for key in flat[0]}
@@ -0,0 +1,104 @@
+"""Recording exchanges against the stand-in and replaying them offline."""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from replay_transport import RecordingTransport, ReplayMiss, ReplayTransport, request_keys
+from sf_client import AsyncSalesforce
+
+SESSION = "00Dxx0000001gEF!secret-session-token"
+DATED = "SELECT Id FROM Time_Entry__c WHERE Date__c = {} LIMIT 5"
+
+
+def _run(instance_url, wrap, call):
+    async def main():
+        sf = AsyncSalesforce(instance_url, SESSION, max_retries=0, wrap_transport=wrap)
+        try:
+            return await call(sf)
+        finally:
+            await sf.aclose()
+
+    return asyncio.run(main())
+
+
+def _replay(path, call):
+    transport = ReplayTransport(str(path))
+    result = _run("https://replay.invalid", lambda inner: transport, call)
+    return result, transport
+
+
+@pytest.fixture(scope="module")
+def fixture_file(standin, tmp_path_factory):
+    path = tmp_path_factory.mktemp("replay") / "org.jsonl.gz"
+
+    async def calls(sf):
+        return [
+            await sf.query_all("SELECT Id, Name FROM User"),
+            await sf.query_all("SELECT Id FROM Time_Entry__c"),  # 3 pages
+            await sf.query_batch(["SELECT Id FROM Project__c", "SELECT Name FROM User LIMIT 2"]),
+            await sf.query(DATED.format("2026-10-01")),
+        ]
+
+    recorded = _run(standin, lambda inner: RecordingTransport(inner, str(path)), calls)
+    return path, recorded
+
+
+def test_replay_returns_recorded_results(fixture_file):
+    path, recorded = fixture_file
+
+    async def calls(sf):
+        return [
+            await sf.query_all("SELECT Id, Name FROM User"),
+            await sf.query_all("SELECT Id FROM Time_Entry__c"),
+            await sf.query_batch(["SELECT Id FROM Project__c", "SELECT Name FROM User LIMIT 2"]),
+        ]
+
+    replayed, transport = _replay(path, calls)
+    assert replayed == recorded[:3]
+    assert transport.shape_hits == 0
+
+
+def test_whitespace_only_differences_match_exactly(fixture_file):
+    path, recorded = fixture_file
+    result, transport = _replay(path, lambda sf: sf.query_all("SELECT  Id,\n  Name FROM   User"))
+    assert result == recorded[0]
+    assert (transport.hits, transport.shape_hits) == (1, 0)
+
+
+def test_other_literals_fall_back_to_the_query_shape(fixture_file):
+    path, recorded = fixture_file
+    result, transport = _replay(path, lambda sf: sf.query(DATED.format("2026-10-02")))
+    assert result == recorded[3]
+    assert (transport.hits, transport.shape_hits) == (0, 1)
+
+
+def test_unrecorded_request_raises_replay_miss(fixture_file):
+    path, _ = fixture_file
+    with pytest.raises(ReplayMiss):
+        _replay(path, lambda sf: sf.query("SELECT Id FROM Work_Item__c"))
+
+
+def test_session_token_is_not_recorded(fixture_file):
+    path, _ = fixture_file
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        text = f.read()
+    assert text and SESSION not in text and "secret-session-token" not in text
+
+
+def test_repeated_requests_replay_in_order_then_repeat_the_last(tmp_path):
+    path = tmp_path / "limits.jsonl"
+    exact, shape = request_keys("GET", "https://x.invalid/services/data/v59.0/limits/", b"")
+    with open(path, "w", encoding="utf-8") as f:
+        for remaining in (900, 800):
+            f.write(json.dumps({
+                "key": exact, "shape": shape, "status": 200, "headers": {},
+                "elapsed_ms": 1.0, "body": {"DailyApiRequests": {"Max": 1000, "Remaining": remaining}},
+            }) + "\n")
+
+    async def calls(sf):
+        return [(await sf.limits())["DailyApiRequests"]["Remaining"] for _ in range(3)]
+
+    assert _replay(path, calls)[0] == [900, 800, 800]
@@ -0,0 +1,67 @@
+"""LocalReplica re-bootstrap failures, empty objects and concurrent freshness checks."""
+
+import asyncio
+
+import pytest
+
+from replica import REPLICATED_OBJECTS, LocalReplica
+
+STAMP = "2026-10-16T12:00:00.000+0000"
+
+
+def _fake(fake_salesforce, empty=()):
+    """One row per replicated object (none for those in empty)."""
+    return fake_salesforce(
+        {
+            sobject: [] if sobject in empty else [{"Id": f"{sobject}-1", "SystemModstamp": STAMP}]
+            for sobject, _ in REPLICATED_OBJECTS.values()
+        },
+        deleted=None,
+    )
+
+
+def _count(replica, table):
+    return len(asyncio.run(replica.read_sql(f"SELECT Id FROM {table}")))
+
+
+def test_failed_rebootstrap_forgets_high_water(tmp_path, fake_salesforce):
+    sf = _fake(fake_salesforce)
+    replica = LocalReplica(str(tmp_path / "replica.sqlite3"))
+    asyncio.run(replica.sync(sf))
+    assert replica.staleness() is not None
+
+    sf.fail_on = "Work_Item__c"
+    with pytest.raises(ConnectionError):
+        asyncio.run(replica.sync(sf))
+    # The partly reloaded object counts as never synced, so the replica is
+    # not served and the next sync bootstraps it again.
+    assert replica._state("Work_Item__c") is None
+    assert replica.staleness() is None
+
+    sf.fail_on = None
+    asyncio.run(replica.sync(sf))
+    assert _count(replica, "work_item") == 1
+
+
+def test_concurrent_stale_callers_share_one_sync(tmp_path, fake_salesforce):
+    sf = _fake(fake_salesforce)
+    replica = LocalReplica(str(tmp_path / "replica.sqlite3"), max_staleness=300)
+
+    async def main():
+        return await asyncio.gather(*(replica.ensure_fresh(sf) for _ in range(5)))
+
+    assert all(asyncio.run(main()))
+    assert sf.queries == 3  # one query per replicated object
+
+
+def test_empty_object_syncs_incrementally(tmp_path, fake_salesforce):
+    sf = _fake(fake_salesforce, empty={"Time_Entry__c"})
+    sf.deleted = []
+    replica = LocalReplica(str(tmp_path / "replica.sqlite3"))
+    asyncio.run(replica.sync(sf))
+    # The sync start stands in for the missing SystemModstamp.
+    assert replica._state("Time_Entry__c")[0] is not None
+
+    asyncio.run(replica.sync(sf))
+    assert sf.queries == 6
+    assert " WHERE SystemModstamp >= " in sf.last_soql["Time_Entry__c"]
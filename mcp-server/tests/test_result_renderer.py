@@ -0,0 +1,88 @@
+"""render_dataframe formats and the steps that keep output within budget."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from result_renderer import TEXT_TRUNCATE_AT, render_dataframe, validate_format
+
+ROWS = [
+    {
+        "attributes": {"type": "Work_Item__c"},
+        "Id": f"a01{i:012d}",
+        "Name": f"WI-{i:04d}",
+        "Subject__c": f"Task {i} | fix",
+        "Hours": float(i),
+        "LastModifiedDate": "2026-10-16T12:00:00.000+0000",
+        "Empty__c": None,
+        "Description__c": "x" * 300,
+    }
+    for i in range(1, 41)
+]
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame(ROWS)
+
+
+def test_formats(frame):
+    small = frame[["Name", "Subject__c", "Hours"]].head(2)
+    assert render_dataframe(small, "table").splitlines()[0].split() == ["Name", "Subject__c", "Hours"]
+    assert render_dataframe(small, "csv").splitlines() == [
+        "Name,Subject__c,Hours", "WI-0001,Task 1 | fix,1.0", "WI-0002,Task 2 | fix,2.0",
+    ]
+    assert [json.loads(line) for line in render_dataframe(small, "jsonl").splitlines()] == [
+        {"Name": "WI-0001", "Subject__c": "Task 1 | fix", "Hours": 1.0},
+        {"Name": "WI-0002", "Subject__c": "Task 2 | fix", "Hours": 2.0},
+    ]
+    assert render_dataframe(small, "markdown").splitlines() == [
+        "| Name | Subject__c | Hours |",
+        "|---|---|---|",
+        "| WI-0001 | Task 1 \\| fix | 1.0 |",
+        "| WI-0002 | Task 2 \\| fix | 2.0 |",
+    ]
+
+
+def test_unknown_format_is_rejected(frame):
+    assert validate_format("yaml") is not None
+    with pytest.raises(ValueError):
+        render_dataframe(frame, "yaml")
+
+
+def test_within_budget_is_untouched(frame):
+    text = render_dataframe(frame, "csv", max_chars=10**6)
+    assert "elided" not in text and "attributes" not in text
+    assert len(text.splitlines()) == 41
+
+
+def test_long_text_is_cut_first(frame):
+    full = render_dataframe(frame, "csv")
+    text = render_dataframe(frame, "csv", max_chars=len(full) - 1)
+    assert "x" * (TEXT_TRUNCATE_AT - 3) + "..." in text and "x" * TEXT_TRUNCATE_AT not in text
+    assert text.endswith(f"[elided to fit {len(full) - 1} chars: 40 long value(s) cut to {TEXT_TRUNCATE_AT} chars]")
+    # Columns and rows survive when cutting text is enough.
+    assert len(text.splitlines()) == 42
+
+
+def test_low_value_columns_are_dropped_next(frame):
+    cut = render_dataframe(frame.assign(Description__c="short"), "csv")
+    text = render_dataframe(frame.assign(Description__c="short"), "csv", max_chars=len(cut) - 1)
+    header = text.splitlines()[0].split(",")
+    assert header == ["Name", "Subject__c", "Hours", "Description__c"]
+    assert "dropped column(s) Id, LastModifiedDate, Empty__c" in text
+
+
+@pytest.mark.parametrize("output_format", ["table", "csv", "jsonl", "markdown"])
+def test_rows_are_dropped_last(frame, output_format):
+    text = render_dataframe(frame, output_format, max_chars=1500)
+    body, note = text.rsplit("\n", 1)
+    assert len(body) <= 1500
+    assert note.startswith("[elided to fit 1500 chars: ")
+    assert "long value(s) cut" in note and "dropped column(s)" in note
+    assert "showing " in note and " of 40 rows" in note
+
+
+def test_max_rows_caps_before_budgeting(frame):
+    assert len(render_dataframe(frame[["Name"]], "csv", max_rows=5).splitlines()) == 6
@@ -0,0 +1,191 @@
+"""AsyncSalesforce composite calls against the local REST stand-in, and retries."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from simple_salesforce.exceptions import SalesforceMalformedRequest, SalesforceRefusedRequest
+
+from sf_client import AsyncSalesforce
+
+
+def _run(instance_url, call):
+    async def main():
+        sf = AsyncSalesforce(instance_url, "session", max_retries=0)
+        try:
+            return await call(sf)
+        finally:
+            await sf.aclose()
+
+    return asyncio.run(main())
+
+
+def test_query_batch_demultiplexes_in_order(standin):
+    # 30 queries span two Composite Batch requests.
+    # The stand-in has User 01 .. User 20.
+    soqls = [f"SELECT Id, Name FROM User WHERE Name = 'User {i:02d}'" for i in range(30, 0, -1)]
+    results = _run(standin, lambda sf: sf.query_batch(soqls))
+    assert [r["records"][0]["Name"] if r["records"] else None for r in results] == [
+        f"User {i:02d}" if i <= 20 else None for i in range(30, 0, -1)
+    ]
+
+
+def test_query_batch_completes_truncated_results(standin):
+    soqls = ["SELECT Id FROM Time_Entry__c", "SELECT Id FROM User"]
+    entries, users = _run(standin, lambda sf: sf.query_batch(soqls))
+    assert entries["done"] and entries["totalSize"] == len(entries["records"]) == 5000
+    assert users["totalSize"] == 20
+
+
+def test_query_batch_raises_failed_subrequest(standin):
+    soqls = ["SELECT Id FROM User", "SELECT FROM"]
+    with pytest.raises(SalesforceMalformedRequest):
+        _run(standin, lambda sf: sf.query_batch(soqls))
+
+
+def _summary_queries(project_name):
+    return {
+        "proj": f"SELECT Id, Name FROM Project__c WHERE Name = '{project_name}' LIMIT 1",
+        "items": "SELECT Id, Project__c FROM Work_Item__c WHERE Project__c = '@{proj.records[0].Id}'",
+    }
+
+
+def test_query_composite_resolves_references(standin):
+    results = _run(standin, lambda sf: sf.query_composite(_summary_queries("Project 002")))
+    project_id = results["proj"]["records"][0]["Id"]
+    items = results["items"]["records"]
+    assert items and {r["Project__c"] for r in items} == {project_id}
+
+
+def test_query_composite_returns_failures_in_place(standin):
+    results = _run(standin, lambda sf: sf.query_composite(_summary_queries("No Such Project")))
+    assert results["proj"]["records"] == []
+    assert isinstance(results["items"], SalesforceMalformedRequest)
+
+
+def test_query_composite_all_or_none_halts_every_query(standin):
+    results = _run(
+        standin,
+        lambda sf: sf.query_composite(_summary_queries("No Such Project"), all_or_none=True),
+    )
+    assert all(isinstance(r, SalesforceMalformedRequest) for r in results.values())
+    assert "PROCESSING_HALTED" in str(results["proj"].content)
+
+
+def _limit_exceeded_client(message, limit_info):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(
+            403,
+            json=[{"errorCode": "REQUEST_LIMIT_EXCEEDED", "message": message}],
+            headers={"Sforce-Limit-Info": limit_info},
+        )
+
+    sf = AsyncSalesforce(
+        "https://example.my.salesforce.com",
+        "session",
+        max_retries=2,
+        backoff_base=0,
+        wrap_transport=lambda inner: httpx.MockTransport(handler),
+    )
+    return sf, calls
+
+
+@pytest.mark.parametrize("message, limit_info, attempts", [
+    ("ConcurrentPerOrgLongTxn Limit exceeded.", "api-usage=100/15000", 3),
+    ("TotalRequests Limit exceeded.", "api-usage=15000/15000", 1),
+    ("TotalRequests Limit exceeded.", "", 1),
+    ("Limit exceeded.", "api-usage=15002/15000", 1),
+])
+def test_request_limit_retried_only_with_allowance_left(message, limit_info, attempts):
+    sf, calls = _limit_exceeded_client(message, limit_info)
+
+    async def main():
+        try:
+            await sf.query("SELECT Id FROM User")
+        finally:
+            await sf.aclose()
+
+    with pytest.raises(SalesforceRefusedRequest):
+        asyncio.run(main())
+    assert len(calls) == attempts
+
+
+def _collection_client(locks):
+    """
+    Answers collection updates, failing each id in locks with UNABLE_TO_LOCK_ROW
+    that many times and ids starting "bad" always. Returns (client, id batches sent).
+    """
+    batches = []
+
+    def handler(request):
+        records = json.loads(request.content)["records"]
+        batches.append([r["id"] for r in records])
+        results = []
+        for record in records:
+            record_id = record["id"]
+            if locks.get(record_id, 0) > 0:
+                locks[record_id] -= 1
+                error = {"statusCode": "UNABLE_TO_LOCK_ROW", "message": "unable to obtain exclusive access"}
+            elif record_id.startswith("bad"):
+                error = {"statusCode": "INVALID_FIELD", "message": "bad value"}
+            else:
+                results.append({"id": record_id, "success": True, "errors": []})
+                continue
+            results.append({"id": record_id, "success": False, "errors": [error]})
+        return httpx.Response(200, json=results)
+
+    sf = AsyncSalesforce(
+        "https://example.my.salesforce.com",
+        "session",
+        max_retries=2,
+        backoff_base=0,
+        wrap_transport=lambda inner: httpx.MockTransport(handler),
+    )
+    return sf, batches
+
+
+def _update(sf, ids, all_or_none=False):
+    async def main():
+        try:
+            records = [{"id": i, "Status__c": "Done"} for i in ids]
+            return await sf.update_collection("Work_Item__c", records, all_or_none=all_or_none)
+        finally:
+            await sf.aclose()
+
+    return asyncio.run(main())
+
+
+def test_collection_retries_only_row_lock_failures():
+    sf, batches = _collection_client({"a2": 1})
+    results = _update(sf, ["a1", "a2", "bad3", "a4"])
+    assert batches == [["a1", "a2", "bad3", "a4"], ["a2"]]
+    assert [r["success"] for r in results] == [True, True, False, True]
+    assert results[2]["errors"][0]["statusCode"] == "INVALID_FIELD"
+
+
+def test_collection_all_or_none_is_not_retried():
+    sf, batches = _collection_client({"a2": 1})
+    results = _update(sf, ["a1", "a2"], all_or_none=True)
+    assert batches == [["a1", "a2"]]
+    assert results[1]["errors"][0]["statusCode"] == "UNABLE_TO_LOCK_ROW"
+
+
+def test_collection_gives_up_after_max_retries():
+    sf, batches = _collection_client({"a1": 10})
+    results = _update(sf, ["a1", "a2"])
+    assert batches == [["a1", "a2"], ["a1"], ["a1"]]
+    assert not results[0]["success"] and results[1]["success"]
+
+
+def test_update_collection_writes_through_to_the_standin(writable_standin):
+    soql = "SELECT Id, Status__c FROM Work_Item__c ORDER BY Name LIMIT 3"
+    items = _run(writable_standin, lambda sf: sf.query_all(soql))["records"]
+    records = [{"id": r["Id"], "Status__c": "Blocked"} for r in items]
+    results = _run(writable_standin, lambda sf: sf.update_collection("Work_Item__c", records))
+    assert [r["success"] for r in results] == [True] * 3
+    after = _run(writable_standin, lambda sf: sf.query_all(soql))["records"]
+    assert {r["Status__c"] for r in after} == {"Blocked"}
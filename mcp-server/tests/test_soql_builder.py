@@ -0,0 +1,123 @@
+"""parse_soql round-trips and the rewrites built on it."""
+
+import pytest
+
+from soql_builder import SOQLBuilder, count_query, parse_soql, with_limit
+
+ROUND_TRIP = [
+    "SELECT Id, Name FROM Work_Item__c WHERE Status__c = 'Done'",
+    "SELECT Id FROM Account WHERE Name = 'Smith OR Jones' AND Type = 'A AND B'",
+    "SELECT Id FROM Account WHERE Name = 'O\\'Brien' AND Status__c = 'Done'",
+    "SELECT Id FROM Account WHERE Name = 'a' OR Name = 'b'",
+    "SELECT Id, (SELECT Id, Name FROM Contacts WHERE LastName = 'x' LIMIT 5) FROM Account",
+    "SELECT Id FROM Account ORDER BY Name ASC LIMIT 10 OFFSET 20",
+    "SELECT Id FROM Account LIMIT 1 FOR VIEW",
+    "SELECT Status__c, COUNT(Id) n FROM Work_Item__c GROUP BY Status__c HAVING COUNT(Id) > 1",
+    "SELECT COUNT() FROM Account WHERE CreatedDate = LAST_N_DAYS:7",
+    "SELECT Id FROM Account USING SCOPE mine WHERE Name LIKE '%limit%' WITH SECURITY_ENFORCED",
+]
+
+
+@pytest.mark.parametrize("soql", ROUND_TRIP)
+def test_round_trip(soql):
+    assert parse_soql(soql).build() == soql
+
+
+def test_whitespace_is_squashed_outside_strings():
+    soql = "SELECT  Id,\n  Name\nFROM Account\nWHERE Name = 'two  spaces'"
+    assert parse_soql(soql).build() == "SELECT Id, Name FROM Account WHERE Name = 'two  spaces'"
+
+
+def test_quoted_keywords_do_not_split_conditions():
+    query = parse_soql(ROUND_TRIP[1])
+    assert query.where_clauses == ["Name = 'Smith OR Jones'", "Type = 'A AND B'"]
+    assert parse_soql(ROUND_TRIP[2]).where_clauses[0] == "Name = 'O\\'Brien'"
+
+
+def test_added_condition_parenthesizes_top_level_or():
+    query = parse_soql(ROUND_TRIP[3]).where("Type", "=", "X")
+    assert query.build() == "SELECT Id FROM Account WHERE (Name = 'a' OR Name = 'b') AND Type = 'X'"
+
+
+def test_parse_returns_independent_copies():
+    parse_soql(ROUND_TRIP[0]).limit(5)
+    assert parse_soql(ROUND_TRIP[0]).row_limit is None
+
+
+@pytest.mark.parametrize("soql", [
+    "SELECT Id",
+    "FROM Account SELECT Id",
+    "SELECT Id FROM Account WHERE",
+    "SELECT Id FROM Account LIMIT x",
+    "SELECT Id FROM Account WHERE Name = 'x",
+    "SELECT Id FROM Account WHERE (Name = 'x'",
+    "SELECT Id FROM Account LIMIT 1 WHERE Name = 'x'",
+])
+def test_malformed_soql_raises(soql):
+    with pytest.raises(ValueError):
+        parse_soql(soql)
+
+
+def test_with_limit():
+    assert with_limit("SELECT Id FROM Account", 5) == "SELECT Id FROM Account LIMIT 5"
+    # Tightened, never loosened; OFFSET and FOR VIEW stay in place.
+    assert with_limit(ROUND_TRIP[5], 5) == "SELECT Id FROM Account ORDER BY Name ASC LIMIT 5 OFFSET 20"
+    assert with_limit(ROUND_TRIP[5], 50) == ROUND_TRIP[5]
+    assert with_limit("SELECT Id FROM Account LIMIT 9 FOR VIEW", 3) == "SELECT Id FROM Account LIMIT 3 FOR VIEW"
+    # A subquery's LIMIT is not the query's.
+    assert with_limit(ROUND_TRIP[4], 3) == ROUND_TRIP[4] + " LIMIT 3"
+    assert with_limit(ROUND_TRIP[8], 5) == ROUND_TRIP[8]
+    assert with_limit("SELEC Id FROM Account", 5) == "SELEC Id FROM Account"
+    # Keywords directly after a closing quote or parenthesis still count.
+    assert with_limit("SELECT Id FROM Account WHERE Name = 'x'LIMIT 3", 201) == (
+        "SELECT Id FROM Account WHERE Name = 'x'LIMIT 3"
+    )
+    assert with_limit("SELECT Id FROM Account WHERE Name = 'x'LIMIT 300", 201) == (
+        "SELECT Id FROM Account WHERE Name = 'x' LIMIT 201"
+    )
+    assert with_limit("SELECT Id FROM Account WHERE Id IN ('a','b')ORDER BY Name", 2) == (
+        "SELECT Id FROM Account WHERE Id IN ('a','b') ORDER BY Name LIMIT 2"
+    )
+
+
+def test_count_query():
+    assert count_query(ROUND_TRIP[5]) == "SELECT COUNT() FROM Account"
+    assert count_query(ROUND_TRIP[6]) == "SELECT COUNT() FROM Account"
+    assert count_query(ROUND_TRIP[1]) == (
+        "SELECT COUNT() FROM Account WHERE Name = 'Smith OR Jones' AND Type = 'A AND B'"
+    )
+    assert count_query(ROUND_TRIP[7]) is None
+    assert count_query("SELECT FROM") is None
+
+
+def test_normalized_sorts_terms():
+    a = parse_soql("SELECT Name, Id FROM Account WHERE b = 1 AND a = 2").normalized().build()
+    b = parse_soql("SELECT Id, Name FROM Account WHERE a = 2 AND b = 1").normalized().build()
+    assert a == b == "SELECT Id, Name FROM Account WHERE a = 2 AND b = 1"
+
+
+def test_normalized_sorts_subquery_terms():
+    a = parse_soql("SELECT Id, (SELECT Name, Id FROM Contacts) FROM Account").normalized()
+    b = parse_soql("SELECT (SELECT Id, Name FROM Contacts), Id FROM Account").normalized()
+    assert a.build() == b.build()
+
+
+def test_normalized_keeps_order_of_unaliased_expressions():
+    # Unaliased expressions come back as expr0, expr1, ... by position.
+    soql = "SELECT SUM(Hours__c), COUNT(Id) FROM Time_Entry__c"
+    assert parse_soql(soql).normalized().build() == soql
+
+
+def test_builder_quotes_values():
+    query = (
+        SOQLBuilder()
+        .select("Id")
+        .from_object("Work_Item__c")
+        .where("Subject__c", "=", "it's")
+        .where("Due_Date__c", "<", "TODAY")
+        .where_in("Status__c", ["To Do", "Blocked"])
+    )
+    assert query.build() == (
+        "SELECT Id FROM Work_Item__c WHERE Subject__c = 'it\\'s' AND Due_Date__c < TODAY"
+        " AND Status__c IN ('To Do', 'Blocked')"
+    )
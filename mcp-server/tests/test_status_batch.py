@@ -0,0 +1,95 @@
+"""sf_update_work_item_status_batch against the local REST stand-in."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("mcp.server.fastmcp")
+
+import server  # noqa: E402
+from sf_client import AsyncSalesforce  # noqa: E402
+
+
+@pytest.fixture
+def call(writable_standin, monkeypatch):
+    """Run a server tool against the writable stand-in, with fresh org state."""
+    monkeypatch.setattr(server._orgs, "_states", {})
+
+    def run(tool, **kwargs):
+        async def main():
+            org = server._orgs.get()
+            org.async_sf = AsyncSalesforce(writable_standin, "session", max_retries=0)
+            try:
+                return await tool(**kwargs)
+            finally:
+                await org.async_sf.aclose()
+                org.async_sf = None
+
+        return asyncio.run(main())
+
+    return run
+
+
+def _statuses(call):
+    async def query():
+        sf = await server.get_async_sf()
+        soql = "SELECT Name, Status__c FROM Work_Item__c ORDER BY Name"
+        return {r["Name"]: r["Status__c"] for r in (await sf.query_all(soql))["records"]}
+
+    return call(query)
+
+
+def _update(name, status):
+    return server.StatusUpdateInput(work_item_name=name, new_status=status)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"updates": [_update("WI-0001", "Done")], "where": "Status__c = 'To Do'", "new_status": "Done"},
+])
+def test_requires_exactly_one_of_updates_or_where(call, kwargs):
+    result = call(server.sf_update_work_item_status_batch, **kwargs)
+    assert result.startswith("Error: provide either `updates` or `where`")
+
+
+def test_updates_skip_items_already_at_target_status(call):
+    before = _statuses(call)
+    same, target = next(iter(before.items()))
+    other = next(n for n, s in before.items() if s != target)
+    result = call(
+        server.sf_update_work_item_status_batch,
+        updates=[_update(same, target), _update(other, target), _update("WI-9999", "Done")],
+    )
+    assert result.startswith("Updated 1 of 3 work items.")
+    assert "Unchanged (already at target status)." in result
+    assert f"{before[other]} -> {target}" in result
+    assert "Work item 'WI-9999' not found." in result
+    assert _statuses(call)[other] == target
+
+
+def test_where_updates_every_match(call):
+    before = _statuses(call)
+    todo = sorted(n for n, s in before.items() if s == "To Do")
+    result = call(
+        server.sf_update_work_item_status_batch, where="Status__c = 'To Do'", new_status="In Progress"
+    )
+    assert result.startswith(f"Updated {len(todo)} of {len(todo)} work items.")
+    after = _statuses(call)
+    assert [after[n] for n in todo] == ["In Progress"] * len(todo)
+
+
+def test_where_refuses_more_than_the_cap(call, monkeypatch):
+    monkeypatch.setattr(server, "MAX_BATCH_STATUS_UPDATES", 3)
+    before = _statuses(call)
+    result = call(
+        server.sf_update_work_item_status_batch, where="Status__c != null", new_status="Blocked"
+    )
+    assert result == "Error: filter matches more than 3 work items. Narrow the `where` clause."
+    assert _statuses(call) == before
+
+
+def test_where_matching_nothing(call):
+    result = call(
+        server.sf_update_work_item_status_batch, where="Name = 'WI-9999'", new_status="Done"
+    )
+    assert result == "No work items match the filter."
@@ -0,0 +1,57 @@
+"""WorkItemIndex lookups match Names case-insensitively, as SOQL does, and drop deleted rows."""
+
+import asyncio
+
+from work_item_index import WorkItemIndex
+
+RECORDS = [
+    {"Id": "a01000000000005", "Name": "WI-0005", "Subject__c": "Login page", "Status__c": "To Do"},
+    {"Id": "a01000000000006", "Name": "WI-0006", "Subject__c": "Logout", "Status__c": "Done"},
+]
+
+
+def test_resolve_ignores_case(fake_salesforce):
+    sf = fake_salesforce({"Work_Item__c": RECORDS})
+    index = WorkItemIndex()
+    refs = asyncio.run(index.resolve(sf, ["wi-0005"]))
+    assert refs["wi-0005"]["Id"] == "a01000000000005"
+
+    # Warm now, under either spelling.
+    refs = asyncio.run(index.resolve(sf, ["WI-0005", "Wi-0005"]))
+    assert set(refs) == {"WI-0005", "Wi-0005"}
+    assert sf.queries == 1
+
+
+def test_record_and_evict_ignore_case():
+    index = WorkItemIndex()
+    index.remember(RECORDS)
+    index.record("wi-0006", Status__c="Blocked")
+    assert index.get("WI-0006")["Status__c"] == "Blocked"
+    index.evict("wi-0006")
+    assert index.get("WI-0006") is None
+    assert len(index) == 1
+
+
+def test_unknown_names_are_absent(fake_salesforce):
+    sf = fake_salesforce({"Work_Item__c": RECORDS})
+    refs = asyncio.run(WorkItemIndex().resolve(sf, ["WI-9999", "wi-0006"]))
+    assert list(refs) == ["wi-0006"]
+
+
+def test_refresh_drops_deleted_rows(fake_salesforce):
+    sf = fake_salesforce({"Work_Item__c": RECORDS})
+    index = WorkItemIndex()
+    asyncio.run(index.resolve(sf, ["WI-0005", "WI-0006"]))
+    sf.deleted = [{"id": "a01000000000005", "deletedDate": "2026-10-16T12:00:00.000+0000"}]
+    asyncio.run(index.refresh(sf))
+    assert index.get("WI-0005") is None
+    assert index.get("WI-0006") is not None
+
+
+def test_refresh_forgets_everything_past_the_deletion_window(fake_salesforce):
+    sf = fake_salesforce({"Work_Item__c": RECORDS})
+    index = WorkItemIndex()
+    asyncio.run(index.resolve(sf, ["WI-0005"]))
+    sf.deleted = None
+    asyncio.run(index.refresh(sf))
+    assert len(index) == 0
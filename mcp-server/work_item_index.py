@@ -0,0 +1,179 @@
+"""
+In-process index of Work_Item__c records keyed by their auto-number Name.
+
+The write tools address work items by Name (e.g. "WI-0005") but the REST API
+needs the record Id, which used to cost a lookup query before every write.
+This index resolves Names to Id/Subject/Status:
+
+- lazily and in bulk: unknown names are fetched with a single IN query,
+- write-through: the write tools record the fields they change,
+- delta refresh: every refresh_interval seconds, rows whose SystemModstamp
+  moved since the last refresh are re-read in the background, and rows
+  deleted since then (the REST getDeleted endpoint) are dropped.
+
+Once an entry is warm, a write needs only its own API call. Like SOQL's
+Name comparison, lookups ignore case ("wi-0005" finds WI-0005).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from soql_builder import SOQLBuilder
+
+INDEX_FIELDS = ["Id", "Name", "Subject__c", "Status__c"]
+
+# Names per IN query; keeps the GET query string well under URL limits.
+RESOLVE_CHUNK_SIZE = 200
+
+# Delta refreshes overlap by this much to tolerate clock skew between this
+# host and the org. Re-reading a few rows is harmless.
+CLOCK_SKEW = datetime.timedelta(minutes=5)
+
+
+def name_key(name: str) -> str:
+    """Index key for a Name; SOQL matches Names case-insensitively."""
+    return name.upper()
+
+
+def _soql_datetime(value: datetime.datetime) -> str:
+    """Format a UTC datetime as an (unquoted) SOQL datetime literal."""
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class WorkItemIndex:
+    """
+    Name -> {Id, Name, Subject__c, Status__c} map for Work_Item__c.
+
+    Usage:
+        index = WorkItemIndex(refresh_interval=300)
+        refs = await index.resolve(sf, ["WI-0005", "WI-0006"])
+        index.record("WI-0005", Status__c="Done")
+    """
+
+    def __init__(self, refresh_interval: float = 300.0) -> None:
+        self.refresh_interval = refresh_interval
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._high_water: Optional[datetime.datetime] = None
+        self._last_refresh = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a Name, or None if unknown."""
+        return self._entries.get(name_key(name))
+
+    def record(self, name: str, **fields: Any) -> None:
+        """Write-through: merge fields a tool just wrote into a known entry."""
+        entry = self._entries.get(name_key(name))
+        if entry is not None:
+            entry.update(fields)
+
+    def evict(self, name: str) -> None:
+        """Forget a Name (e.g. after a write against its Id failed)."""
+        self._entries.pop(name_key(name), None)
+
+    def remember(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Index rows another query already fetched (must include INDEX_FIELDS)."""
+        self._store(records)
+
+    def _store(self, records: Iterable[Dict[str, Any]]) -> None:
+        for rec in records:
+            self._entries[name_key(rec["Name"])] = {f: rec.get(f) for f in INDEX_FIELDS}
+
+    def _mark_started(self) -> datetime.datetime:
+        started = datetime.datetime.now(datetime.timezone.utc) - CLOCK_SKEW
+        if self._high_water is None:
+            self._high_water = started
+            self._last_refresh = time.monotonic()
+        return started
+
+    # -----------------------------------------------------------------
+    # Population
+    # -----------------------------------------------------------------
+
+    async def resolve(self, sf: Any, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Return entries for the given Names, fetching any unknown ones. The
+        result is keyed by the Names as given.
+
+        Missing names are read with IN queries of up to 200 names each, sent
+        concurrently. Names that do not exist are simply absent from the
+        result. May schedule a background delta refresh; never waits on it.
+        """
+        self._maybe_schedule_refresh(sf)
+        missing = sorted({name_key(n) for n in names} - self._entries.keys())
+        if missing:
+            self._mark_started()
+            chunks = [
+                missing[i:i + RESOLVE_CHUNK_SIZE]
+                for i in range(0, len(missing), RESOLVE_CHUNK_SIZE)
+            ]
+            results = await asyncio.gather(*(
+                sf.query_all(
+                    SOQLBuilder()
+                    .select(INDEX_FIELDS)
+                    .from_object("Work_Item__c")
+                    .where_in("Name", chunk)
+                    .build()
+                )
+                for chunk in chunks
+            ))
+            for result in results:
+                self._store(result.get("records", []))
+        return {n: self._entries[name_key(n)] for n in names if name_key(n) in self._entries}
+
+    async def refresh(self, sf: Any) -> int:
+        """Re-read rows modified and drop rows deleted since the last refresh; returns rows read."""
+        if self._high_water is None:
+            return 0
+        now = datetime.datetime.now(datetime.timezone.utc)
+        started = now - CLOCK_SKEW
+        result, deleted = await asyncio.gather(
+            sf.query_all(
+                SOQLBuilder()
+                .select(INDEX_FIELDS)
+                .from_object("Work_Item__c")
+                .where_raw(f"SystemModstamp >= {_soql_datetime(self._high_water)}")
+                .build()
+            ),
+            sf.get_deleted("Work_Item__c", self._high_water, now),
+        )
+        records = result.get("records", [])
+        # Only refresh names we already track; unknown ones resolve lazily.
+        self._store(r for r in records if name_key(r["Name"]) in self._entries)
+        if deleted is None:
+            # Salesforce no longer reports deletions that far back.
+            self._entries.clear()
+        elif deleted:
+            gone = {d["id"] for d in deleted}
+            for key in [k for k, e in self._entries.items() if e["Id"] in gone]:
+                del self._entries[key]
+        self._high_water = started
+        self._last_refresh = time.monotonic()
+        return len(records)
+
+    def _maybe_schedule_refresh(self, sf: Any) -> None:
+        if self._high_water is None or not self._entries:
+            return
+        if time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        # Push the timer forward now so a failing refresh is not retried on
+        # every call.
+        self._last_refresh = time.monotonic()
+        self._refresh_task = asyncio.create_task(self.refresh(sf))
+        # Retrieve the exception so a failed refresh is not logged as
+        # "never retrieved"; the next interval simply tries again.
+        self._refresh_task.add_done_callback(
+            lambda task: task.cancelled() or task.exception()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"WorkItemIndex(entries={len(self._entries)})"